@@ -150,7 +150,8 @@ class CourseAssistantService:
         }
         
         # Add information about modules, contents and assignments
-        for module in course.modules.all().order_by('order'):
+        from courses.outline import get_course_outline
+        for module in get_course_outline(course):
             module_data = {
                 "title": module.title,
                 "description": module.description,
@@ -159,7 +160,7 @@ class CourseAssistantService:
             }
             
             # Add content items
-            for content in module.contents.all().order_by('order'):
+            for content in module.contents.all():
                 content_data = {
                     "title": content.title,
                     "type": "text" if content.content_text else "file" if content.content_file else "url"
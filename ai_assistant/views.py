@@ -8,6 +8,7 @@ import json
 import logging
 
 from courses.models import Course
+from courses.access import get_course_access
 from .models import AIAssistant, AIAssistantConversation, AIAssistantMessage
 from .forms import AIAssistantForm
 from .services import RetellAIService, CourseAssistantService
@@ -99,7 +100,8 @@ def assistant_detail(request, assistant_id):
     assistant = get_object_or_404(AIAssistant, id=assistant_id)
     
     # Check if user has access to this assistant
-    if assistant.course.instructor != request.user and request.user not in assistant.course.students.all():
+    access = get_course_access(request.user, assistant.course)
+    if not access.is_member:
         messages.error(request, "You don't have access to this assistant.")
         return redirect('ai_assistant:assistant_list')
     
@@ -112,7 +114,7 @@ def assistant_detail(request, assistant_id):
     context = {
         'assistant': assistant,
         'conversations': conversations,
-        'is_instructor': assistant.course.instructor == request.user,
+        'is_instructor': access.is_instructor,
     }
     return render(request, 'ai_assistant/assistant_detail.html', context)
 
@@ -267,7 +269,7 @@ def start_call(request, assistant_id):
     assistant = get_object_or_404(AIAssistant, id=assistant_id)
     
     # Check if user has access to this assistant
-    if assistant.course.instructor != request.user and request.user not in assistant.course.students.all():
+    if not get_course_access(request.user, assistant.course).is_member:
         messages.error(request, "You don't have access to this assistant.")
         return redirect('ai_assistant:assistant_list')
     
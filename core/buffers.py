@@ -0,0 +1,102 @@
+"""
+In-process write-behind buffers.
+
+A WriteBehindBuffer collects keyed values in memory (merging repeats of the
+same key) and hands everything collected so far to a flush function from a
+background thread every few seconds, or sooner once it holds ``max_size``
+keys. High-frequency, low-value writes such as page-view events then cost a
+dict update on the request path and one batched statement per interval.
+
+Each process (e.g. each gunicorn worker) has its own buffer, so flush
+functions must apply their batch additively (``x = x + n``, upserts) for
+totals to stay correct across processes. Whatever is buffered when a
+process dies without running its exit hook is lost; only use this for data
+that can tolerate that.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+def flush_interval():
+    """Seconds between background flushes; 0 or less flushes on every add"""
+    return getattr(settings, 'WRITE_BEHIND_FLUSH_INTERVAL', 5.0)
+
+
+class WriteBehindBuffer:
+    """Accumulate keyed values in memory and pass them to ``flush`` in batches"""
+
+    def __init__(self, name, flush, merge, interval=None, max_size=5000):
+        self.name = name
+        self.flush_function = flush
+        self.merge = merge
+        self.interval = interval
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        atexit.register(self.flush)
+
+    def add(self, key, value):
+        """Buffer ``value`` for ``key``, merging it with anything already pending"""
+        interval = flush_interval() if self.interval is None else self.interval
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked after the parent started buffering: the parent's
+                # thread and pending values do not belong to this process.
+                self._pending = {}
+                self._thread = None
+                self._pid = os.getpid()
+            pending = self._pending.get(key)
+            self._pending[key] = value if pending is None else self.merge(pending, value)
+            size = len(self._pending)
+            if interval > 0 and self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, args=(interval,), name=f'write-behind-{self.name}', daemon=True,
+                )
+                self._thread.start()
+
+        if interval <= 0:
+            self.flush()
+        elif size >= self.max_size:
+            self._wake.set()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def pending(self, key, default=None):
+        """The merged value buffered for ``key`` and not yet flushed"""
+        return self._pending.get(key, default)
+
+    def flush(self):
+        """Write out everything pending now; returns the number of keys flushed"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            self.flush_function(pending)
+        except Exception:
+            logger.exception("Flushing %s keys from the %s buffer failed; retrying later", len(pending), self.name)
+            with self._lock:
+                # Fold the batch back in so the next flush retries it
+                for key, value in pending.items():
+                    current = self._pending.get(key)
+                    self._pending[key] = value if current is None else self.merge(value, current)
+            return 0
+        return len(pending)
+
+    def _run(self, interval):
+        while True:
+            self._wake.wait(interval)
+            self._wake.clear()
+            self.flush()
+            close_old_connections()
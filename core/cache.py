@@ -0,0 +1,17 @@
+"""
+Cross-request caching helpers.
+
+Data cached between requests (course outlines, enrollment sets) is
+invalidated by deleting or bumping keys when it changes. That only reaches
+the other workers if they read the same cache. LocMemCache keeps a separate
+store in every process, so under it these caches are skipped and the data
+is loaded per request instead of being served stale by the workers that
+missed the invalidation.
+"""
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_shared_cache(alias='default'):
+    """Whether every worker process sees the same entries in this cache"""
+    return not isinstance(caches[alias], LocMemCache)
@@ -0,0 +1,18 @@
+from django.core.checks import Tags, Warning, register
+
+from .cache import is_shared_cache
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Warn when the default cache is per-process, which turns cross-request caching off"""
+    if is_shared_cache():
+        return []
+    return [
+        Warning(
+            "The default cache is LocMemCache, which each worker process keeps separately, "
+            "so course outlines and enrollments are not cached between requests.",
+            hint="Set CACHE_BACKEND and CACHE_LOCATION to a Redis or Memcached server.",
+            id='core.W001',
+        )
+    ]
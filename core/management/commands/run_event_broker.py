@@ -0,0 +1,31 @@
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.pubsub import parse_address, serve_relay
+
+
+class Command(BaseCommand):
+    help = "Relay real-time events between ASGI worker processes (see core.pubsub)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default=None,
+            help="unix:/path or tcp://host:port to listen on (default: REALTIME_BROKER_URL)",
+        )
+
+    def handle(self, *args, url=None, **options):
+        url = url or getattr(settings, 'REALTIME_BROKER_URL', '')
+        if not url:
+            raise CommandError("Set REALTIME_BROKER_URL or pass --url.")
+        try:
+            parse_address(url)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(f"Relaying events on {url}; press Ctrl+C to stop.")
+        try:
+            asyncio.run(serve_relay(url))
+        except KeyboardInterrupt:
+            pass
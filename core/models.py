@@ -1,4 +1,22 @@
 from django.db import models
 
-# Create your models here.
-# For core app-specific models
\ No newline at end of file
+
+class DerivedFieldsModel(models.Model):
+    """
+    Base for models with denormalized columns that are only written by UPDATE
+    statements elsewhere (counters, last-item pointers), listed in
+    ``DERIVED_FIELDS``. A full save() of an existing row leaves those columns
+    out, so it cannot overwrite them with the stale values it loaded.
+    """
+    DERIVED_FIELDS = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DERIVED_FIELDS
+            ]
+        super().save(*args, **kwargs)
@@ -0,0 +1,162 @@
+"""
+Keyset (cursor) pagination.
+
+Django's Paginator pages with ``LIMIT n OFFSET k``, so the database reads
+and throws away k rows to serve a deep page, and needs a COUNT(*) up front.
+KeysetPaginator instead remembers the ordering key of the last row shown
+(the cursor) and asks for the rows after it::
+
+    WHERE (created_at, id) > (:created_at, :id) ORDER BY created_at, id LIMIT n
+
+With an index on the filter columns plus the ordering key, every page -
+the thousandth as much as the first - is one short index range scan. The
+trade-off is that pages have no numbers: you can move to the next or
+previous page, the first or last page, or the page starting at a given row.
+
+The ordering must be unique (end it with the primary key), and its fields
+must be non-null, or rows will be skipped or repeated at page boundaries.
+"""
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder rounds times to milliseconds; a cursor must be exact
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator"""
+
+    def __init__(self, paginator, object_list, has_previous, has_next):
+        self.paginator = paginator
+        self.object_list = object_list
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+    def previous_cursor(self):
+        """Cursor for ``paginator.page(before=...)``, or None on the first page"""
+        if not self._has_previous or not self.object_list:
+            return None
+        return self.paginator.cursor_for(self.object_list[0])
+
+    def next_cursor(self):
+        """Cursor for ``paginator.page(after=...)``, or None on the last page"""
+        if not self._has_next or not self.object_list:
+            return None
+        return self.paginator.cursor_for(self.object_list[-1])
+
+
+class KeysetPaginator:
+    """
+    Page through ``queryset`` in the order given by ``ordering`` (field names,
+    '-' for descending), ``per_page`` rows at a time.
+    """
+
+    def __init__(self, queryset, ordering=('created_at', 'pk'), per_page=50):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self._keys = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    def _field(self, name):
+        meta = self.queryset.model._meta
+        return meta.pk if name == 'pk' else meta.get_field(name)
+
+    def _key(self, obj):
+        return [getattr(obj, 'pk' if name == 'pk' else self._field(name).attname) for name, _ in self._keys]
+
+    def cursor_for(self, obj):
+        """Opaque, URL-safe cursor for the position of ``obj``"""
+        data = json.dumps(self._key(obj), cls=_CursorEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Key values stored in a cursor; raises InvalidCursor if it is malformed"""
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            if not isinstance(values, list) or len(values) != len(self._keys):
+                raise ValueError(cursor)
+            return [self._field(name).to_python(value) for (name, _), value in zip(self._keys, values)]
+        except (ValueError, TypeError, binascii.Error, ValidationError) as exc:
+            raise InvalidCursor(cursor) from exc
+
+    def _beyond(self, key, forward, inclusive=False):
+        """Q for rows after ``key`` in page order (before it when not forward)"""
+        # Expand (a, b, c) > (x, y, z) into a > x OR (a = x AND (b > y OR ...)),
+        # flipping the comparison for descending fields
+        condition = None
+        for (name, descending), value in reversed(list(zip(self._keys, key))):
+            lookup = 'lt' if descending == forward else 'gt'
+            if condition is None:
+                condition = Q(**{f'{name}__{lookup}{"e" if inclusive else ""}': value})
+            else:
+                condition = Q(**{f'{name}__{lookup}': value}) | (Q(**{name: value}) & condition)
+        if len(self._keys) > 1:
+            # Redundant, but a plain range on the leading column is what lets
+            # the database seek into the index instead of filtering every row
+            condition &= Q(**{f'{name}__{lookup}e': value})
+        return condition
+
+    def _ordered(self, forward):
+        if forward:
+            return self.queryset.order_by(*self.ordering)
+        return self.queryset.order_by(*(name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering))
+
+    def _fetch(self, queryset):
+        rows = list(queryset[:self.per_page + 1])
+        return rows[:self.per_page], len(rows) > self.per_page
+
+    def page(self, after=None, before=None):
+        """
+        The page following the ``after`` cursor, the page preceding the
+        ``before`` cursor, or the first page when neither is given.
+        """
+        if before is not None:
+            key = self.decode_cursor(before)
+            rows, more = self._fetch(self._ordered(False).filter(self._beyond(key, forward=False)))
+            return KeysetPage(self, rows[::-1], has_previous=more, has_next=True)
+        queryset = self._ordered(True)
+        if after is not None:
+            queryset = queryset.filter(self._beyond(self.decode_cursor(after), forward=True))
+        rows, more = self._fetch(queryset)
+        return KeysetPage(self, rows, has_previous=after is not None, has_next=more)
+
+    def page_from(self, obj):
+        """The page starting at ``obj``"""
+        key = self._key(obj)
+        rows, more = self._fetch(self._ordered(True).filter(self._beyond(key, forward=True, inclusive=True)))
+        has_previous = self._ordered(False).filter(self._beyond(key, forward=False)).exists()
+        return KeysetPage(self, rows, has_previous=has_previous, has_next=more)
+
+    def last_page(self):
+        rows, more = self._fetch(self._ordered(False))
+        return KeysetPage(self, rows[::-1], has_previous=more, has_next=False)
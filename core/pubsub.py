@@ -0,0 +1,241 @@
+"""
+Publish/subscribe for pushing events to connected browsers.
+
+Publishers (views, signal handlers, worker threads: plain synchronous
+code) call ``get_broker().publish(channel, event)``. Subscribers are
+long-lived async responses (e.g. a server-sent events stream) that hold a
+``subscribe(channels)`` open on the server's event loop and receive every
+event published to those channels afterwards. Events are not stored: a
+client that is not connected when an event is published never sees it and
+should reload what it shows when it reconnects.
+
+LocalBroker delivers inside one process, which is all a single ASGI worker
+needs. With several workers, a publish in one must reach subscribers in
+the others, so set REALTIME_BROKER_URL (``unix:/path`` or
+``tcp://host:port``) and run ``manage.py run_event_broker``. It is a tiny
+relay that repeats every line a worker sends to all connected workers.
+SocketBroker then publishes through the relay and delivers what comes back
+to its local subscribers.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Events a slow subscriber may fall behind by before newer ones are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# First line a SocketBroker listener sends, so the relay knows to forward
+# events to it (publishing connections never read theirs)
+RELAY_SUBSCRIBE = b'SUBSCRIBE\n'
+
+
+class Subscription:
+    """Events for a set of channels, received on the event loop that created it"""
+
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = tuple(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, event):
+        # Runs on self.loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Dropping event for a slow subscriber to %s", ', '.join(self.channels))
+
+    async def get(self, timeout=None):
+        """The next event, or None if none arrives within ``timeout`` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+class LocalBroker:
+    """Deliver published events to subscribers in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, channels):
+        """Start receiving events for ``channels``; call from a coroutine"""
+        subscription = Subscription(self, channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def publish(self, channel, event):
+        """Send a JSON-serializable event to every subscriber of ``channel``; safe from any thread"""
+        self.deliver(channel, event)
+
+    def deliver(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # Its event loop has shut down
+                self.unsubscribe(subscription)
+
+
+def parse_address(url):
+    """(family, address) for a ``unix:/path`` or ``tcp://host:port`` broker URL"""
+    if url.startswith('unix:'):
+        return socket.AF_UNIX, '/' + url[len('unix:'):].lstrip('/')
+    if url.startswith('tcp://'):
+        host, _, port = url[len('tcp://'):].rpartition(':')
+        return socket.AF_INET, (host or '127.0.0.1', int(port))
+    raise ValueError(f"Unsupported broker URL {url!r}; use unix:/path or tcp://host:port")
+
+
+class SocketBroker(LocalBroker):
+    """Publish through a run_event_broker relay so every worker process receives each event"""
+
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, url):
+        super().__init__()
+        self.family, self.address = parse_address(url)
+        self._publish_lock = threading.Lock()
+        self._publish_socket = None
+        self._pid = None
+        self._listeners = {}
+
+    def _connect(self):
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        sock.settimeout(2)
+        sock.connect(self.address)
+        return sock
+
+    def publish(self, channel, event):
+        line = json.dumps({'channel': channel, 'event': event}, separators=(',', ':')).encode() + b'\n'
+        with self._publish_lock:
+            if self._pid != os.getpid():
+                # Never share the parent's socket after a fork
+                self._publish_socket, self._pid = None, os.getpid()
+            for _ in range(2):
+                try:
+                    if self._publish_socket is None:
+                        self._publish_socket = self._connect()
+                    self._publish_socket.sendall(line)
+                    return
+                except OSError:
+                    if self._publish_socket is not None:
+                        self._publish_socket.close()
+                    self._publish_socket = None
+        logger.warning("Event broker at %s is unreachable; delivering %s locally only", self.address, channel)
+        self.deliver(channel, event)
+
+    def subscribe(self, channels):
+        subscription = super().subscribe(channels)
+        loop = subscription.loop
+        listener = self._listeners.get(loop)
+        if listener is None or listener.done():
+            self._listeners[loop] = loop.create_task(self._listen())
+        return subscription
+
+    async def _open(self):
+        if self.family == socket.AF_UNIX:
+            return await asyncio.open_unix_connection(self.address)
+        return await asyncio.open_connection(*self.address)
+
+    async def _listen(self):
+        """Relay events from the broker to this process's subscribers, reconnecting as needed"""
+        while True:
+            try:
+                reader, writer = await self._open()
+            except OSError:
+                await asyncio.sleep(self.RECONNECT_DELAY)
+                continue
+            try:
+                writer.write(RELAY_SUBSCRIBE)
+                await writer.drain()
+                while line := await reader.readline():
+                    try:
+                        message = json.loads(line)
+                        self.deliver(message['channel'], message['event'])
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning("Ignoring malformed event from broker: %r", line[:200])
+            except OSError:
+                pass
+            finally:
+                writer.close()
+            await asyncio.sleep(self.RECONNECT_DELAY)
+
+
+async def serve_relay(url):
+    """Run the relay used by SocketBroker: repeat each published line to every listening connection"""
+    clients = set()
+
+    async def handle(reader, writer):
+        try:
+            while line := await reader.readline():
+                if line == RELAY_SUBSCRIBE:
+                    clients.add(writer)
+                    continue
+                for client in list(clients):
+                    if client.is_closing():
+                        clients.discard(client)
+                    else:
+                        client.write(line)
+        except ConnectionError:
+            pass
+        finally:
+            clients.discard(writer)
+            writer.close()
+
+    family, address = parse_address(url)
+    if family == socket.AF_UNIX:
+        if os.path.exists(address):
+            os.unlink(address)
+        server = await asyncio.start_unix_server(handle, address)
+    else:
+        server = await asyncio.start_server(handle, *address)
+    async with server:
+        await server.serve_forever()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The process-wide broker configured by REALTIME_BROKER_URL (in-process when unset)"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                url = getattr(settings, 'REALTIME_BROKER_URL', '')
+                _broker = SocketBroker(url) if url else LocalBroker()
+    return _broker
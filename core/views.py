@@ -1,7 +1,8 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.views.generic import TemplateView
-from courses.models import Course
+from django.utils import timezone
+from courses.models import Course, Assignment, Submission
 
 class HomeView(TemplateView):
     template_name = 'core/home.html'
@@ -16,10 +17,21 @@ class HomeView(TemplateView):
 def dashboard_view(request):
     # Get courses for the dashboard
     teaching_courses = Course.objects.filter(instructor=request.user, is_active=True)
-    enrolled_courses = Course.objects.filter(students=request.user, is_active=True)
+    enrolled_courses = Course.objects.filter(students=request.user, is_active=True).select_related('instructor')
+    
+    # Upcoming assignments in enrolled courses, with the user's submission status
+    upcoming = Assignment.objects.filter(module__course__in=enrolled_courses, due_date__gte=timezone.now())
+    upcoming_assignments = list(upcoming.select_related('module__course').order_by('due_date')[:10])
+    user_submissions = Submission.for_student(request.user, upcoming_assignments)
+    for assignment in upcoming_assignments:
+        assignment.user_submission = user_submissions.get(assignment.id)
+    # Counted over every upcoming assignment, not just the ten listed
+    assignments_due = upcoming.exclude(submissions__student=request.user).count()
     
     return render(request, 'core/dashboard.html', {
         'user': request.user,
         'teaching_courses': teaching_courses,
         'enrolled_courses': enrolled_courses,
-    })
\ No newline at end of file
+        'upcoming_assignments': upcoming_assignments,
+        'assignments_due': assignments_due,
+    })
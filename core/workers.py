@@ -0,0 +1,52 @@
+"""
+Background thread pools for work that should not hold up a request.
+
+A WorkerPool starts its ThreadPoolExecutor on first use, sized by a
+setting, so processes that never submit a job (e.g. most management
+commands) never start threads. Each job closes the database connections
+its worker thread opened once it finishes, since Django only cleans up
+connections at the end of a request. With the setting at 0, jobs run
+inline in the caller, which keeps tests synchronous.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+
+class WorkerPool:
+    """A lazily started thread pool whose size is read from ``setting``"""
+
+    def __init__(self, name, setting, default_workers):
+        self.name = name
+        self.setting = setting
+        self.default_workers = default_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def workers(self):
+        return getattr(settings, self.setting, self.default_workers)
+
+    def submit(self, function, *args):
+        """Run ``function(*args)`` on the pool, or inline without workers; returns a Future"""
+        if self.workers() <= 0:
+            future = Future()
+            try:
+                future.set_result(function(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self._get_executor().submit(self._run, function, args)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers(), thread_name_prefix=self.name)
+            return self._executor
+
+    def _run(self, function, args):
+        try:
+            return function(*args)
+        finally:
+            connections.close_all()
@@ -0,0 +1,102 @@
+"""
+Course membership checks.
+
+Answers "is this user the instructor / an enrolled student / staff" for a
+(user, course) pair without materialising ``Course.students``. Each user's
+set of enrolled course IDs is loaded with a single indexed lookup on the
+enrollment through-table and cached twice: on the user object for the rest
+of the request, and in the Django cache across requests. The cross-request
+entry is dropped by the ``m2m_changed`` receiver in ``courses.signals``,
+which only reaches other workers through a shared cache, so with a
+per-process one the set is loaded once per request instead.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import is_shared_cache
+
+from .models import Course
+
+ENROLLED_IDS_CACHE_KEY = 'courses:enrolled_ids:{user_id}'
+REQUEST_CACHE_ATTR = '_enrolled_course_ids'
+
+
+class CourseAccess:
+    """Access flags for a user on a single course"""
+
+    __slots__ = ('is_instructor', 'is_enrolled', 'is_staff')
+
+    def __init__(self, is_instructor=False, is_enrolled=False, is_staff=False):
+        self.is_instructor = is_instructor
+        self.is_enrolled = is_enrolled
+        self.is_staff = is_staff
+
+    def __repr__(self):
+        return (f"CourseAccess(is_instructor={self.is_instructor}, "
+                f"is_enrolled={self.is_enrolled}, is_staff={self.is_staff})")
+
+    @property
+    def is_member(self):
+        """Instructor or enrolled student"""
+        return self.is_instructor or self.is_enrolled
+
+    @property
+    def can_access(self):
+        """Instructor, enrolled student or staff"""
+        return self.is_member or self.is_staff
+
+
+def _cache_timeout():
+    return getattr(settings, 'COURSE_ACCESS_CACHE_TIMEOUT', 300)
+
+
+def get_enrolled_course_ids(user):
+    """Return the frozenset of course IDs the user is enrolled in"""
+    if not user.is_authenticated:
+        return frozenset()
+
+    course_ids = getattr(user, REQUEST_CACHE_ATTR, None)
+    if course_ids is not None:
+        return course_ids
+
+    shared = is_shared_cache()
+    key = ENROLLED_IDS_CACHE_KEY.format(user_id=user.pk)
+    course_ids = cache.get(key) if shared else None
+    if course_ids is None:
+        # Served by the through-table index on user_id
+        course_ids = frozenset(
+            Course.students.through.objects.filter(user_id=user.pk).values_list('course_id', flat=True)
+        )
+        if shared:
+            cache.set(key, course_ids, _cache_timeout())
+
+    setattr(user, REQUEST_CACHE_ATTR, course_ids)
+    return course_ids
+
+
+def invalidate_enrolled_course_ids(user_ids):
+    """Drop the cross-request enrollment cache for the given users"""
+    cache.delete_many([ENROLLED_IDS_CACHE_KEY.format(user_id=user_id) for user_id in user_ids])
+
+
+def clear_request_cache(user):
+    """Forget the per-request enrollment set held on a user object"""
+    if hasattr(user, REQUEST_CACHE_ATTR):
+        delattr(user, REQUEST_CACHE_ATTR)
+
+
+def is_enrolled(user, course):
+    """Check whether the user is an enrolled student of the course"""
+    return course.pk in get_enrolled_course_ids(user)
+
+
+def get_course_access(user, course):
+    """Return the CourseAccess flags for a user on a course"""
+    if not user.is_authenticated:
+        return CourseAccess()
+
+    return CourseAccess(
+        is_instructor=user.pk == course.instructor_id,
+        is_enrolled=is_enrolled(user, course),
+        is_staff=user.is_staff,
+    )
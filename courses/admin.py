@@ -1,13 +1,82 @@
-from django.contrib import admin
-from .models import Course, Module, Content, Assignment, Submission
+from datetime import timedelta
+
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.shortcuts import render
+from django.urls import reverse
+
+from search.admin import IndexedSearchMixin
+
+from .cloning import clone_course
+from .forms import CourseCloneForm, RosterImportForm
+from .models import Course, Module, Content, Assignment, AssignmentReminder, Submission, UploadSession
+from . import roster
 
 @admin.register(Course)
-class CourseAdmin(admin.ModelAdmin):
-    list_display = ('title', 'instructor', 'created_at', 'is_active')
+class CourseAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    list_display = ('title', 'instructor', 'student_count', 'created_at', 'is_active')
     list_filter = ('is_active', 'created_at')
     search_fields = ('title', 'description', 'instructor__username')
+    search_kind = 'course'
+    exact_search_fields = ('slug', 'instructor__username')
     prepopulated_fields = {'slug': ('title',)}
     filter_horizontal = ('students',)
+    readonly_fields = ('student_count', 'module_count', 'assignment_count')
+    actions = ['import_roster', 'clone_courses']
+    
+    @admin.action(description="Import roster from CSV")
+    def import_roster(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(request, "Select exactly one course to import a roster into.", messages.WARNING)
+            return None
+        course = queryset.get()
+        
+        form = RosterImportForm(request.POST, request.FILES) if 'apply' in request.POST else RosterImportForm()
+        if form.is_bound and form.is_valid():
+            result = roster.import_roster(
+                course, roster.read_roster(form.cleaned_data['csv_file']),
+                create_missing=form.cleaned_data['create_missing'],
+            )
+            self.message_user(request, f"Roster imported into {course.title}: {result}.", messages.SUCCESS)
+            if result.unknown:
+                self.message_user(
+                    request, "Unknown students: " + ", ".join(result.unknown)
+                    + ("…" if result.unknown_count > len(result.unknown) else ""),
+                    messages.WARNING,
+                )
+            return None
+        
+        return render(request, 'admin/courses/course/import_roster.html', {
+            **self.admin_site.each_context(request),
+            'title': "Import roster",
+            'opts': self.model._meta,
+            'course': course,
+            'form': form,
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        })
+    
+    @admin.action(description="Clone selected courses")
+    def clone_courses(self, request, queryset):
+        form = CourseCloneForm(request.POST) if 'apply' in request.POST else CourseCloneForm()
+        if form.is_bound and form.is_valid():
+            offset = timedelta(days=form.cleaned_data['due_date_offset_days'])
+            suffix = form.cleaned_data['title_suffix']
+            for course in queryset.select_related('instructor'):
+                clone = clone_course(
+                    course, title=f"{course.title}{suffix}"[:200],
+                    due_date_offset=offset, is_active=form.cleaned_data['activate'],
+                )
+                self.message_user(request, f"Cloned {course.title} as {clone.title} ({clone.slug}).", messages.SUCCESS)
+            return None
+        
+        return render(request, 'admin/courses/course/clone_courses.html', {
+            **self.admin_site.each_context(request),
+            'title': "Clone courses",
+            'opts': self.model._meta,
+            'courses': queryset,
+            'form': form,
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        })
 
 
 class ContentInline(admin.StackedInline):
@@ -29,10 +98,25 @@ class ModuleAdmin(admin.ModelAdmin):
 
 
 @admin.register(Content)
-class ContentAdmin(admin.ModelAdmin):
+class ContentAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ('title', 'module', 'order', 'created_at')
     list_filter = ('module__course', 'created_at')
     search_fields = ('title', 'content_text')
+    search_kind = 'content'
+    
+    class Media:
+        js = ('js/chunked_upload.js',)
+    
+    def get_form(self, request, obj=None, **kwargs):
+        form = super().get_form(request, obj, **kwargs)
+        # Existing content can take large files through the resumable upload API
+        if obj is not None and 'content_file' in form.base_fields:
+            form.base_fields['content_file'].widget.attrs.update({
+                'data-chunked-upload': 'content',
+                'data-upload-object': obj.pk,
+                'data-upload-url': reverse('upload_session_create'),
+            })
+        return form
 
 
 @admin.register(Assignment)
@@ -46,4 +130,21 @@ class AssignmentAdmin(admin.ModelAdmin):
 class SubmissionAdmin(admin.ModelAdmin):
     list_display = ('student', 'assignment', 'submitted_at', 'status', 'score')
     list_filter = ('status', 'submitted_at', 'assignment__module__course')
-    search_fields = ('student__username', 'assignment__title', 'feedback')
\ No newline at end of file
+    search_fields = ('student__username', 'assignment__title', 'feedback')
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'user', 'target', 'size', 'status', 'created_at', 'updated_at')
+    list_filter = ('target', 'status', 'created_at')
+    search_fields = ('filename', 'user__username')
+    raw_id_fields = ('user', 'assignment', 'content')
+    readonly_fields = ('id', 'created_at', 'updated_at')
+
+
+@admin.register(AssignmentReminder)
+class AssignmentReminderAdmin(admin.ModelAdmin):
+    list_display = ('assignment', 'offset_hours', 'due_date', 'recipient_count', 'sent_at')
+    list_filter = ('offset_hours', 'sent_at')
+    search_fields = ('assignment__title',)
+    raw_id_fields = ('assignment',)
@@ -0,0 +1,99 @@
+"""
+Deep course cloning.
+
+``clone_course`` copies a course with its modules, contents and assignments
+in a fixed number of queries regardless of course size: one read per level
+and one ``bulk_create`` per model. Students, submissions and reminders are
+not copied. File fields are copied by name, so the clone shares the stored
+files (content-addressed storage keeps them alive while any row refers to
+them) instead of duplicating bytes.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from .models import Assignment, Content, Course, Module
+from .signals import course_cloned
+
+
+def unique_course_slug(title):
+    """Return slugify(title), suffixed with -2, -3, ... if it is taken"""
+    base = slugify(title)[:190] or 'course'
+    taken = set(Course.objects.filter(slug__startswith=base).values_list('slug', flat=True))
+    if base not in taken:
+        return base
+    suffix = 2
+    while f"{base}-{suffix}" in taken:
+        suffix += 1
+    return f"{base}-{suffix}"
+
+
+def _bulk_create_with_pks(model, objs, parent_filter):
+    """bulk_create that guarantees primary keys on backends that cannot return them"""
+    created = model.objects.bulk_create(objs)
+    if created and created[0].pk is None:
+        # Rows were inserted in list order, so ascending PKs line up with objs
+        for obj, pk in zip(created, model.objects.filter(**parent_filter).order_by('pk').values_list('pk', flat=True)):
+            obj.pk = pk
+    return created
+
+
+def clone_course(course, title=None, due_date_offset=timedelta(0), instructor=None, is_active=False):
+    """
+    Copy ``course`` and its module/content/assignment tree.
+
+    Assignment due dates are shifted by ``due_date_offset``. The clone is
+    inactive by default so it can be reviewed before students see it.
+    Returns the new Course.
+    """
+    title = title or f"{course.title} (copy)"
+    modules = list(Module.objects.filter(course=course).order_by('order', 'pk'))
+    module_ids = [module.pk for module in modules]
+    contents = list(Content.objects.filter(module_id__in=module_ids).order_by('pk'))
+    assignments = list(Assignment.objects.filter(module_id__in=module_ids).order_by('pk'))
+
+    with transaction.atomic():
+        clone = Course.objects.create(
+            title=title,
+            slug=unique_course_slug(title),
+            description=course.description,
+            instructor=instructor or course.instructor,
+            is_active=is_active,
+            image=course.image.name or None,
+            image_variants=course.image_variants,
+            module_count=len(modules),
+            assignment_count=len(assignments),
+        )
+
+        new_modules = _bulk_create_with_pks(Module, [
+            Module(course=clone, title=module.title, description=module.description, order=module.order)
+            for module in modules
+        ], {'course': clone})
+        module_map = {old.pk: new.pk for old, new in zip(modules, new_modules)}
+
+        Content.objects.bulk_create([
+            Content(
+                module_id=module_map[content.module_id],
+                title=content.title,
+                content_text=content.content_text,
+                content_file=content.content_file.name or None,
+                content_url=content.content_url,
+                order=content.order,
+            )
+            for content in contents
+        ])
+        Assignment.objects.bulk_create([
+            Assignment(
+                module_id=module_map[assignment.module_id],
+                title=assignment.title,
+                description=assignment.description,
+                due_date=assignment.due_date + due_date_offset,
+                points=assignment.points,
+            )
+            for assignment in assignments
+        ])
+
+        course_cloned.send(sender=Course, source=course, clone=clone)
+
+    return clone
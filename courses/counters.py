@@ -0,0 +1,56 @@
+"""
+Maintenance of the denormalized counters on Course.
+
+Counters are always recomputed from the source tables with a single
+``UPDATE ... SET x = (SELECT COUNT(*) ...)`` statement rather than adjusted
+by +1/-1, so signal handlers stay correct when an m2m ``add`` or ``remove``
+names rows that were already (or never) present.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Assignment, Course, Module
+
+COUNTER_FIELDS = ('student_count', 'module_count', 'assignment_count')
+
+
+def _count_subquery(queryset, group_field):
+    counts = (
+        queryset.filter(**{group_field: OuterRef('pk')})
+        .order_by()
+        .values(group_field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def counter_expressions(fields=COUNTER_FIELDS):
+    """Return {field: expression} computing each counter from source rows"""
+    expressions = {
+        'student_count': _count_subquery(Course.students.through.objects.all(), 'course_id'),
+        'module_count': _count_subquery(Module.objects.all(), 'course_id'),
+        'assignment_count': _count_subquery(Assignment.objects.all(), 'module__course_id'),
+    }
+    return {field: expressions[field] for field in fields}
+
+
+def recount_courses(courses=None, fields=COUNTER_FIELDS):
+    """
+    Recompute counters for the given course IDs or queryset (all courses
+    when None). Returns the number of courses updated.
+    """
+    queryset = Course.objects.all()
+    if courses is not None:
+        queryset = queryset.filter(pk__in=courses)
+    return queryset.update(**counter_expressions(fields))
+
+
+def drifted_courses(fields=COUNTER_FIELDS):
+    """Return a queryset of courses whose stored counters are out of date"""
+    expressions = counter_expressions(fields)
+    annotations = {f'actual_{field}': expression for field, expression in expressions.items()}
+    drift = Q()
+    for field in fields:
+        drift |= ~Q(**{field: F(f'actual_{field}')})
+    return Course.objects.annotate(**annotations).filter(drift)
@@ -0,0 +1,116 @@
+"""
+Streaming export of assignment submissions.
+
+The archive is produced by a generator that writes into ``zipfile`` through
+a tell-only sink. Without ``seek`` zipfile switches to data descriptors, so
+each member can be written as its source file is read chunk by chunk and the
+bytes are handed to the response as soon as they are produced. Only one
+storage chunk (plus zipfile's own small buffers) is held at a time.
+"""
+import csv
+import io
+import os
+import zipfile
+
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+ZIP64_THRESHOLD = 2 ** 31 - 1
+MANIFEST_FIELDS = ('student', 'submitted_at', 'status', 'score', 'file')
+
+
+class _StreamSink:
+    """Write-only, tell-only file object that collects zip output"""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def export_filename(assignment):
+    """Return the download name for an assignment's submission archive"""
+    stamp = timezone.now().strftime('%Y%m%d-%H%M')
+    return f"{assignment.module.course.slug}-assignment-{assignment.pk}-submissions-{stamp}.zip"
+
+
+def stream_submissions_zip(assignment):
+    """Yield a ZIP of every submission file plus a manifest.csv, chunk by chunk"""
+    return (chunk for chunk in _generate_submissions_zip(assignment) if chunk)
+
+
+def _generate_submissions_zip(assignment):
+    sink = _StreamSink()
+    manifest = io.StringIO()
+    writer = csv.writer(manifest)
+    writer.writerow(MANIFEST_FIELDS)
+
+    submissions = (
+        assignment.submissions.select_related('student')
+        .order_by('student__username')
+        .iterator(chunk_size=200)
+    )
+
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for submission in submissions:
+            username = submission.student.username
+            archive_name = ''
+
+            if submission.file:
+                archive_name = f"{username}/{os.path.basename(submission.file.name)}"
+                info = zipfile.ZipInfo(archive_name, date_time=_zip_timestamp(submission.submitted_at))
+                info.compress_type = zipfile.ZIP_STORED
+                try:
+                    size = submission.file.size
+                    with submission.file.open('rb') as source, \
+                            archive.open(info, 'w', force_zip64=size >= ZIP64_THRESHOLD) as target:
+                        for chunk in source.chunks(EXPORT_CHUNK_SIZE):
+                            target.write(chunk)
+                            yield sink.drain()
+                except FileNotFoundError:
+                    archive_name = ''
+                finally:
+                    submission.file.close()
+
+            if submission.text:
+                text_name = f"{username}/submission.txt"
+                archive.writestr(
+                    zipfile.ZipInfo(text_name, date_time=_zip_timestamp(submission.submitted_at)),
+                    submission.text.encode('utf-8'),
+                    compress_type=zipfile.ZIP_DEFLATED,
+                )
+                archive_name = archive_name or text_name
+
+            writer.writerow((
+                username,
+                submission.submitted_at.isoformat(),
+                submission.status,
+                '' if submission.score is None else submission.score,
+                archive_name,
+            ))
+            yield sink.drain()
+
+        archive.writestr('manifest.csv', manifest.getvalue().encode('utf-8'), compress_type=zipfile.ZIP_DEFLATED)
+
+    # Closing the archive writes the central directory
+    yield sink.drain()
+
+
+def _zip_timestamp(value):
+    local = timezone.localtime(value) if timezone.is_aware(value) else value
+    return (max(local.year, 1980), local.month, local.day, local.hour, local.minute, local.second)
@@ -1,4 +1,5 @@
 from django import forms
+from django.urls import reverse_lazy
 from .models import Submission, Course, Module, Content, Assignment
 
 
@@ -8,7 +9,11 @@ class AssignmentSubmissionForm(forms.ModelForm):
         fields = ['file', 'text']
         widgets = {
             'text': forms.Textarea(attrs={'class': 'form-control', 'rows': 5}),
-            'file': forms.FileInput(attrs={'class': 'form-control'}),
+            'file': forms.FileInput(attrs={
+                'class': 'form-control',
+                'data-chunked-upload': 'submission',
+                'data-upload-url': reverse_lazy('upload_session_create'),
+            }),
         }
         labels = {
             'text': 'Your Answer',
@@ -66,4 +71,29 @@ class AssignmentForm(forms.ModelForm):
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 4}),
             'due_date': forms.DateTimeInput(attrs={'class': 'form-control', 'type': 'datetime-local'}),
             'points': forms.NumberInput(attrs={'class': 'form-control'}),
-        }
\ No newline at end of file
+        }
+
+class RosterImportForm(forms.Form):
+    csv_file = forms.FileField(
+        label='Roster CSV',
+        help_text='One username or email per row, or a header row with username, email, first_name and last_name columns.',
+    )
+    create_missing = forms.BooleanField(
+        required=False,
+        label='Create accounts for unknown students',
+        help_text='New accounts get an unusable password; students set one with the password reset flow.',
+    )
+
+
+class CourseCloneForm(forms.Form):
+    title_suffix = forms.CharField(
+        max_length=50, required=False, initial=' (copy)',
+        help_text='Appended to each cloned course title.',
+    )
+    due_date_offset_days = forms.IntegerField(
+        initial=0, label='Shift due dates by (days)',
+        help_text='E.g. 182 to move assignments forward one semester; negative values move them back.',
+    )
+    activate = forms.BooleanField(
+        required=False, label='Make clones active immediately',
+    )
@@ -0,0 +1,190 @@
+"""
+Course gradebook.
+
+All submission scores for a course are read in one ``values_list`` pass and
+scattered into a dense students x assignments NumPy matrix (NaN where there
+is no score). Every statistic is then a vectorized reduction over that
+matrix, so the cost is dominated by the single query rather than by the
+number of students or assignments.
+"""
+import warnings
+
+import numpy as np
+from django.db import connections
+from django.db.models import IntegerField, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Assignment, Submission
+
+HISTOGRAM_BINS = np.linspace(0, 100, 11)
+UNGRADED = -1
+
+
+class AssignmentStats:
+    """Summary statistics for one gradebook column"""
+
+    def __init__(self, assignment, submitted, graded, mean, median, stddev, histogram):
+        self.assignment = assignment
+        self.submitted = submitted
+        self.graded = graded
+        self.mean = mean
+        self.median = median
+        self.stddev = stddev
+        self.histogram = histogram
+
+
+class Gradebook:
+    """Students x assignments score matrix for a course"""
+
+    def __init__(self, course):
+        self.course = course
+        self.assignments = list(
+            Assignment.objects.filter(module__course=course)
+            .select_related('module')
+            .order_by('module__order', 'due_date', 'pk')
+        )
+        self.students = list(
+            course.students.order_by('last_name', 'first_name', 'username')
+            .only('id', 'username', 'first_name', 'last_name')
+        )
+
+        self.points = np.array([assignment.points for assignment in self.assignments], dtype=float)
+        self.due_dates = [assignment.due_date for assignment in self.assignments]
+        self.scores = np.full((len(self.students), len(self.assignments)), np.nan)
+        self.submitted = np.zeros(self.scores.shape, dtype=bool)
+        self._load()
+
+    def _load(self):
+        if not self.students or not self.assignments:
+            return
+
+        student_ids = np.array([student.id for student in self.students], dtype=np.int64)
+        assignment_ids = np.array([assignment.id for assignment in self.assignments], dtype=np.int64)
+        student_order = np.argsort(student_ids)
+        assignment_order = np.argsort(assignment_ids)
+
+        # Ungraded submissions come back as -1 so the rows can be streamed
+        # straight from the cursor into a float array; going through the raw
+        # cursor skips Django's per-row converters, which dominate at 1M rows.
+        rows = Submission.objects.filter(
+            assignment_id__in=assignment_ids.tolist()
+        ).values_list('student_id', 'assignment_id', Coalesce('score', Value(UNGRADED), output_field=IntegerField()))
+        sql, params = rows.query.sql_with_params()
+        with connections[rows.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            chunks = [np.array(chunk, dtype=np.float64) for chunk in _fetch_chunks(cursor)]
+        data = np.concatenate(chunks) if chunks else np.empty((0, 3))
+        if not len(data):
+            return
+        data[data[:, 2] == UNGRADED, 2] = np.nan
+
+        row_ids = data[:, 0].astype(np.int64)
+        col_ids = data[:, 1].astype(np.int64)
+
+        # Map database IDs to matrix positions with a binary search over the sorted IDs
+        row_pos = np.searchsorted(student_ids[student_order], row_ids)
+        col_pos = np.searchsorted(assignment_ids[assignment_order], col_ids)
+        row_pos = np.clip(row_pos, 0, len(student_ids) - 1)
+        col_pos = np.clip(col_pos, 0, len(assignment_ids) - 1)
+        rows_idx = student_order[row_pos]
+        cols_idx = assignment_order[col_pos]
+
+        # Drop submissions from students who are no longer enrolled
+        valid = (student_ids[rows_idx] == row_ids) & (assignment_ids[cols_idx] == col_ids)
+        rows_idx, cols_idx = rows_idx[valid], cols_idx[valid]
+
+        self.submitted[rows_idx, cols_idx] = True
+        self.scores[rows_idx, cols_idx] = data[valid, 2]
+
+    @property
+    def graded(self):
+        """Boolean mask of cells that have a score"""
+        return ~np.isnan(self.scores)
+
+    @property
+    def missing(self):
+        """Boolean mask of past-due assignments with no submission"""
+        now = timezone.now()
+        past_due = np.array([due_date <= now for due_date in self.due_dates], dtype=bool)
+        return ~self.submitted & past_due[np.newaxis, :]
+
+    def assignment_stats(self):
+        """Return an AssignmentStats per assignment column"""
+        percent = self.scores / np.where(self.points > 0, self.points, np.nan)[np.newaxis, :] * 100
+        graded_counts = self.graded.sum(axis=0)
+        submitted_counts = self.submitted.sum(axis=0)
+
+        with warnings.catch_warnings():
+            # Columns with no graded submissions reduce to NaN, which is what we want
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            means = np.nanmean(self.scores, axis=0)
+            medians = np.nanmedian(self.scores, axis=0)
+            stddevs = np.nanstd(self.scores, axis=0)
+
+        stats = []
+        for index, assignment in enumerate(self.assignments):
+            column = percent[:, index]
+            histogram, _ = np.histogram(np.clip(column[~np.isnan(column)], 0, 100), bins=HISTOGRAM_BINS)
+            stats.append(AssignmentStats(
+                assignment=assignment,
+                submitted=int(submitted_counts[index]),
+                graded=int(graded_counts[index]),
+                mean=_optional(means, index),
+                median=_optional(medians, index),
+                stddev=_optional(stddevs, index),
+                histogram=histogram.tolist(),
+            ))
+        return stats
+
+    def student_totals(self):
+        """
+        Return (earned, percent_of_total, percent_of_graded) arrays per student.
+
+        Totals are weighted by Assignment.points: the percentage is points
+        earned over points possible, not an average of per-assignment
+        percentages.
+        """
+        earned = np.nansum(self.scores, axis=1)
+        possible = self.points.sum()
+        graded_possible = (self.graded * self.points[np.newaxis, :]).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent_of_total = earned / possible * 100 if possible else np.full(earned.shape, np.nan)
+            percent_of_graded = np.where(graded_possible > 0, earned / graded_possible * 100, np.nan)
+        return earned, percent_of_total, percent_of_graded
+
+    def student_rows(self, start=0, stop=None):
+        """Return template-friendly rows for students[start:stop]"""
+        earned, percent_of_total, percent_of_graded = self.student_totals()
+        missing = self.missing
+        rows = []
+        for index in range(start, len(self.students) if stop is None else min(stop, len(self.students))):
+            cells = []
+            for column in range(len(self.assignments)):
+                cells.append({
+                    'score': _optional(self.scores[index], column),
+                    'submitted': bool(self.submitted[index, column]),
+                    'missing': bool(missing[index, column]),
+                })
+            rows.append({
+                'student': self.students[index],
+                'cells': cells,
+                'earned': float(earned[index]),
+                'percent_of_total': _optional(percent_of_total, index),
+                'percent_of_graded': _optional(percent_of_graded, index),
+                'missing_count': int(missing[index].sum()),
+            })
+        return rows
+
+
+def _fetch_chunks(cursor, size=20000):
+    while True:
+        chunk = cursor.fetchmany(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _optional(values, index):
+    value = values[index]
+    return None if np.isnan(value) else float(value)
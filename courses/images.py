@@ -0,0 +1,128 @@
+"""
+Resized variants of course images.
+
+After a course image is saved (and the transaction commits), the original
+is handed to a small thread pool that decodes it once, scales it down to
+each width in VARIANT_WIDTHS and writes a WebP and a JPEG copy next to the
+upload. Pillow releases the GIL while decoding, resizing and encoding, so
+threads overlap well and the request that saved the course never waits.
+
+Variant names are derived from the original's name and the variant spec,
+so they are stable (safe to cache forever: a new upload gets a new name)
+and a rerun skips files that already exist. The names are recorded in
+``Course.image_variants`` once all of them are written; until then
+templates fall back to the original.
+"""
+import hashlib
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from core.workers import WorkerPool
+
+from .models import Course
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1280)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+VARIANT_DIR = 'course_images/variants'
+# Bump to regenerate every variant after changing widths or encoder settings
+VARIANT_VERSION = 1
+
+_pool = WorkerPool('image-variants', 'IMAGE_VARIANT_WORKERS', 2)
+
+
+def variant_name(image_name, width, extension):
+    """Deterministic storage name of one variant of an image"""
+    key = hashlib.sha1(f"{image_name}:{width}:{extension}:{VARIANT_VERSION}".encode()).hexdigest()
+    stem = os.path.splitext(os.path.basename(image_name))[0][:40]
+    return f"{VARIANT_DIR}/{key[:2]}/{stem}-{key[2:12]}-{width}w.{extension}"
+
+
+def _open(storage, name, target_width):
+    with storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        # Let the JPEG decoder skip detail we are about to throw away
+        image.draft('RGB', (target_width, target_width * image.height // max(image.width, 1)))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    return image
+
+
+def generate_variants(storage, image_name):
+    """
+    Write every variant of an image that does not exist yet.
+
+    Returns {extension: {width: name}}. Images narrower than a variant
+    width are never upscaled: one variant at the original width stands in
+    for all the larger ones.
+    """
+    image = _open(storage, image_name, max(VARIANT_WIDTHS))
+    variants = {extension: {} for extension in VARIANT_FORMATS}
+    widths = {min(width, image.width) for width in VARIANT_WIDTHS}
+
+    # Largest first, each step resizing the previous (already smaller) result
+    current = image
+    for width in sorted(widths, reverse=True):
+        if current.width > width:
+            current = current.resize((width, max(1, round(current.height * width / current.width))), Image.LANCZOS)
+        for extension, (image_format, options) in VARIANT_FORMATS.items():
+            name = variant_name(image_name, width, extension)
+            if not storage.exists(name):
+                buffer = BytesIO()
+                output = current.convert('RGB') if image_format == 'JPEG' and current.mode != 'RGB' else current
+                output.save(buffer, image_format, **options)
+                saved = storage.save(name, ContentFile(buffer.getvalue()))
+                if saved != name:
+                    # A concurrent run wrote it first; keep theirs
+                    storage.delete(saved)
+            variants[extension][str(width)] = name
+    return variants
+
+
+def build_course_variants(course_id, image_name):
+    """Generate variants for a course image and record them if it is still the course's image"""
+    storage = Course._meta.get_field('image').storage
+    try:
+        variants = generate_variants(storage, image_name)
+    except (OSError, Image.DecompressionBombError):
+        logger.exception("Could not build variants of %s for course %s", image_name, course_id)
+        return None
+    Course.objects.filter(pk=course_id, image=image_name).update(image_variants=variants)
+    return variants
+
+
+def schedule_course_variants(course_id, image_name):
+    """Queue variant generation on the worker pool; returns a Future"""
+    return _pool.submit(build_course_variants, course_id, image_name)
+
+
+def remove_variants(variants, image_name):
+    """Delete the variant files of an image no course uses any more"""
+    if not variants or Course.objects.filter(image=image_name).exists():
+        return
+    storage = Course._meta.get_field('image').storage
+    for by_width in variants.values():
+        for name in by_width.values():
+            storage.delete(name)
+
+
+def pick_variant(variants, extension, width):
+    """Name of the smallest variant at least ``width`` wide (or the largest one)"""
+    by_width = (variants or {}).get(extension)
+    if not by_width:
+        return None
+    widths = sorted(by_width, key=int)
+    for candidate in widths:
+        if int(candidate) >= width:
+            return by_width[candidate]
+    return by_width[widths[-1]]
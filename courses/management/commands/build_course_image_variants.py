@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from courses.images import schedule_course_variants
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = "Build the resized WebP/JPEG variants of course images on the worker pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course', action='append', dest='slugs', metavar='SLUG',
+            help="Only build variants for this course (may be given more than once)",
+        )
+        parser.add_argument(
+            '--all', action='store_true', dest='rebuild',
+            help="Include courses that already have variants (e.g. after changing VARIANT_VERSION)",
+        )
+
+    def handle(self, *args, slugs=None, rebuild=False, **options):
+        courses = Course.objects.exclude(image='').exclude(image__isnull=True)
+        if slugs:
+            courses = courses.filter(slug__in=slugs)
+        if not rebuild:
+            courses = courses.filter(image_variants={})
+
+        futures = [
+            (slug, schedule_course_variants(pk, image))
+            for pk, slug, image in courses.values_list('pk', 'slug', 'image')
+        ]
+        built = 0
+        for slug, future in futures:
+            if future.result() is None:
+                self.stderr.write(f"{slug}: could not read the course image")
+            else:
+                built += 1
+        self.stdout.write(self.style.SUCCESS(f"Built variants for {built} course image(s)."))
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.cloning import clone_course
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = "Copy a course with its modules, contents and assignments (files are shared, not copied)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('course', metavar='SLUG', help="Slug of the course to clone")
+        parser.add_argument('--title', help="Title of the new course (default: '<title> (copy)')")
+        parser.add_argument('--days', type=int, default=0,
+                            help="Shift assignment due dates by this many days (may be negative)")
+        parser.add_argument('--instructor', metavar='USERNAME', help="Instructor of the new course (default: same)")
+        parser.add_argument('--activate', action='store_true', help="Make the clone active immediately")
+
+    def handle(self, *args, course, title=None, days=0, instructor=None, activate=False, **options):
+        try:
+            course = Course.objects.get(slug=course)
+        except Course.DoesNotExist:
+            raise CommandError(f"No course with slug '{course}'.")
+        if instructor:
+            try:
+                instructor = User.objects.get(username=instructor)
+            except User.DoesNotExist:
+                raise CommandError(f"No user named '{instructor}'.")
+
+        clone = clone_course(course, title=title, due_date_offset=timedelta(days=days),
+                             instructor=instructor, is_active=activate)
+        self.stdout.write(self.style.SUCCESS(
+            f"Cloned {course.slug} as {clone.slug}: {clone.module_count} modules, "
+            f"{clone.assignment_count} assignments"
+        ))
@@ -0,0 +1,97 @@
+import os
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from courses.storage import ContentAddressedStorage
+
+
+class Command(BaseCommand):
+    help = (
+        "Garbage-collect content-addressed storage: delete files no database row "
+        "references and blobs no file links to"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be deleted without deleting")
+        parser.add_argument('--min-age', type=float, default=24,
+                            help="Only delete files older than this many hours (default: 24), so uploads "
+                                 "whose database row has not been committed yet are left alone")
+        parser.add_argument('--adopt', action='store_true',
+                            help="Also move referenced files saved before deduplication into the blob store")
+
+    def handle(self, *args, dry_run=False, min_age=24, adopt=False, **options):
+        cutoff = time.time() - min_age * 3600
+        verb = "Would delete" if dry_run else "Deleted"
+
+        for storage, prefixes, referenced in self._collect():
+            orphans = adopted = blobs = freed = 0
+
+            for prefix in prefixes:
+                for name, path in _walk(storage, prefix):
+                    stat = os.stat(path)
+                    if name not in referenced:
+                        # A new upload of known bytes is a fresh hard link to an
+                        # old inode: its mtime is the blob's, but linking set ctime
+                        if stat.st_ctime < cutoff:
+                            orphans += 1
+                            if dry_run:
+                                self.stdout.write(f"  orphan {name}")
+                            else:
+                                storage.delete(name)
+                    elif adopt and stat.st_nlink == 1:
+                        adopted += 1
+                        if not dry_run:
+                            storage.adopt(name)
+
+            for digest, path in storage.iter_blobs():
+                stat = os.stat(path)
+                # Link count 1 means only the blob store itself still holds it.
+                # ctime moves whenever a link is added or removed.
+                if stat.st_nlink == 1 and stat.st_ctime < cutoff:
+                    blobs += 1
+                    freed += stat.st_size
+                    if not dry_run:
+                        os.remove(path)
+
+            staging = storage.path(f"{storage.blob_dir}/tmp")
+            if os.path.isdir(staging) and not dry_run:
+                for entry in os.scandir(staging):
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+
+            self.stdout.write(self.style.SUCCESS(
+                f"{storage.location}: {verb.lower()} {orphans} unreferenced file(s) and "
+                f"{blobs} blob(s) ({freed / 1024 / 1024:.1f} MiB)"
+                + (f"; adopted {adopted} file(s)" if adopt else "")
+            ))
+
+    def _collect(self):
+        """Group content-addressed file fields by storage location"""
+        groups = {}
+        for model in apps.get_models():
+            for field in model._meta.get_fields():
+                if not isinstance(field, models.FileField) or not isinstance(field.storage, ContentAddressedStorage):
+                    continue
+                storage, prefixes, referenced = groups.setdefault(
+                    field.storage.location, (field.storage, set(), set())
+                )
+                if isinstance(field.upload_to, str):
+                    prefixes.add(field.upload_to.split('%', 1)[0].rstrip('/'))
+                referenced.update(
+                    model._default_manager.exclude(**{field.name: ''})
+                    .exclude(**{f'{field.name}__isnull': True})
+                    .values_list(field.name, flat=True)
+                    .iterator()
+                )
+        return groups.values()
+
+
+def _walk(storage, prefix):
+    root = storage.path(prefix)
+    for directory, dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            yield os.path.relpath(path, storage.location).replace('\\', '/'), path
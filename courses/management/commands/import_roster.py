@@ -0,0 +1,39 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.models import Course
+from courses.roster import ROSTER_BATCH_SIZE, import_roster, read_roster
+
+
+class Command(BaseCommand):
+    help = "Enroll the students listed in a CSV file (usernames or emails) in a course"
+
+    def add_arguments(self, parser):
+        parser.add_argument('course', metavar='SLUG', help="Slug of the course to enroll students in")
+        parser.add_argument('csv_path', metavar='CSV', help="Roster file; use - for standard input")
+        parser.add_argument('--create-missing', action='store_true',
+                            help="Create accounts (with unusable passwords) for unknown students")
+        parser.add_argument('--batch-size', type=int, default=ROSTER_BATCH_SIZE,
+                            help=f"Rows resolved and inserted per query (default: {ROSTER_BATCH_SIZE})")
+
+    def handle(self, *args, course, csv_path, create_missing=False, batch_size=ROSTER_BATCH_SIZE, **options):
+        try:
+            course = Course.objects.get(slug=course)
+        except Course.DoesNotExist:
+            raise CommandError(f"No course with slug '{course}'.")
+
+        started = time.monotonic()
+        if csv_path == '-':
+            result = import_roster(course, read_roster(sys.stdin), create_missing, batch_size)
+        else:
+            with open(csv_path, newline='', encoding='utf-8-sig') as csv_file:
+                result = import_roster(course, read_roster(csv_file), create_missing, batch_size)
+        elapsed = time.monotonic() - started
+
+        for identifier in result.unknown:
+            self.stderr.write(f"unknown: {identifier}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{course.slug}: {result} ({result.rows} rows in {elapsed:.1f}s)"
+        ))
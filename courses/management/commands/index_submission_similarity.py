@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from courses.similarity import index_assignment_submissions
+
+
+class Command(BaseCommand):
+    help = "Rebuild the MinHash signatures and LSH buckets used to flag similar submissions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--assignment', action='append', type=int, dest='assignment_ids', metavar='ID',
+            help="Only index submissions to this assignment (may be given more than once)",
+        )
+
+    def handle(self, *args, assignment_ids=None, **options):
+        count = index_assignment_submissions(assignment_ids)
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} submission(s)."))
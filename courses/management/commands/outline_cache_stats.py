@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.cache import is_shared_cache
+from courses.outline import get_outline_stats, reset_outline_stats
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss counters for the course-outline cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Reset the counters after printing them")
+
+    def handle(self, *args, reset=False, **options):
+        if not is_shared_cache():
+            self.stdout.write(self.style.WARNING(
+                "Outline caching is off because the default cache is per-process (LocMemCache)."
+            ))
+            return
+        stats = get_outline_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0.0
+        self.stdout.write(f"hits: {stats['hits']}")
+        self.stdout.write(f"misses: {stats['misses']}")
+        self.stdout.write(f"hit ratio: {ratio:.1%}")
+        if reset:
+            reset_outline_stats()
+            self.stdout.write("Counters reset.")
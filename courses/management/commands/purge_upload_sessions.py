@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from courses.models import UploadSession
+from courses.uploads import discard_staging
+
+
+class Command(BaseCommand):
+    help = "Delete abandoned chunked-upload sessions and their staged chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=48,
+                            help="Purge sessions not touched for this many hours (default: 48)")
+
+    def handle(self, *args, hours=48, **options):
+        cutoff = timezone.now() - timedelta(hours=hours)
+        sessions = UploadSession.objects.filter(updated_at__lt=cutoff)
+        purged = 0
+        for session in sessions.iterator():
+            discard_staging(session)
+            purged += 1
+        sessions.delete()
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} upload session(s)."))
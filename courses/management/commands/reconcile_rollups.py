@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Course
+from courses.rollups import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recompute assignment, module and course submission rollups and repair any that have drifted"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course', action='append', dest='slugs', metavar='SLUG',
+            help="Only reconcile this course (may be given more than once)",
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Report how many rollups have drifted without fixing them",
+        )
+
+    def handle(self, *args, slugs=None, dry_run=False, **options):
+        course_ids = None
+        if slugs:
+            course_ids = list(Course.objects.filter(slug__in=slugs).values_list('pk', flat=True))
+
+        drifted = reconcile(course_ids, dry_run=dry_run)
+        summary = ", ".join(f"{count} {name}" for name, count in drifted.items())
+        if dry_run:
+            self.stdout.write(f"Drifted rows: {summary}.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Repaired rows: {summary}."))
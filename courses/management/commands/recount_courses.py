@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from courses.counters import drifted_courses, recount_courses
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized student/module/assignment counters on courses"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course', action='append', dest='slugs', metavar='SLUG',
+            help="Only recount this course (may be given more than once)",
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Report courses with drifted counters without fixing them",
+        )
+
+    def handle(self, *args, slugs=None, dry_run=False, **options):
+        drifted = drifted_courses()
+        if slugs:
+            drifted = drifted.filter(slug__in=slugs)
+
+        if dry_run:
+            count = 0
+            for course in drifted.only('slug', 'student_count', 'module_count', 'assignment_count'):
+                count += 1
+                self.stdout.write(
+                    f"{course.slug}: students {course.student_count}->{course.actual_student_count}, "
+                    f"modules {course.module_count}->{course.actual_module_count}, "
+                    f"assignments {course.assignment_count}->{course.actual_assignment_count}"
+                )
+            self.stdout.write(f"{count} course(s) have drifted counters.")
+            return
+
+        # A single UPDATE with correlated subqueries repairs every drifted row
+        updated = recount_courses(drifted.values('pk'))
+        self.stdout.write(self.style.SUCCESS(f"Recounted {updated} course(s)."))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from courses.reminders import ReminderScheduler, reminder_offsets
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the deadline reminder scheduler: notify students who have not submitted "
+        "at each configured offset before an assignment is due"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Send the reminders that are due now and exit (for cron)")
+        parser.add_argument('--offset', action='append', type=int, dest='offsets', metavar='HOURS',
+                            help="Reminder offset in hours before the deadline (may be given more than once; "
+                                 "defaults to ASSIGNMENT_REMINDER_OFFSETS)")
+
+    def handle(self, *args, once=False, offsets=None, **options):
+        scheduler = ReminderScheduler(offsets=sorted(set(offsets), reverse=True) if offsets else reminder_offsets())
+        self.stdout.write(f"Reminder offsets: {', '.join(f'{h}h' for h in scheduler.offsets)}")
+
+        while True:
+            reminders, notifications = scheduler.run_pending()
+            if reminders:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Sent {reminders} reminder(s), {notifications} notification(s)."
+                ))
+            if once:
+                break
+            time.sleep(scheduler.seconds_until_next())
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.16 on 2025-04-14 09:12
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Module = apps.get_model('courses', 'Module')
+    Assignment = apps.get_model('courses', 'Assignment')
+
+    def count_of(queryset, group_field):
+        counts = (
+            queryset.filter(**{group_field: OuterRef('pk')})
+            .order_by()
+            .values(group_field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+    Course.objects.update(
+        student_count=count_of(Course.students.through.objects.all(), 'course_id'),
+        module_count=count_of(Module.objects.all(), 'course_id'),
+        assignment_count=count_of(Assignment.objects.all(), 'module__course_id'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='assignment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='module_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='student_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
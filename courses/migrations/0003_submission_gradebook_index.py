@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_course_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['assignment', 'student', 'score'], name='courses_sub_gradebook_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:21
+
+import courses.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_upload_session'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='content',
+            name='content_file',
+            field=models.FileField(blank=True, null=True, storage=courses.storage.ContentAddressedStorage(), upload_to='content_files/'),
+        ),
+        migrations.AlterField(
+            model_name='submission',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=courses.storage.ContentAddressedStorage(), upload_to='submissions/'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='assignment',
+            name='due_date',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.CreateModel(
+            name='AssignmentReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offset_hours', models.PositiveIntegerField()),
+                ('due_date', models.DateTimeField()),
+                ('recipient_count', models.PositiveIntegerField(default=0)),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='courses.assignment')),
+            ],
+            options={
+                'ordering': ['-sent_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='assignmentreminder',
+            constraint=models.UniqueConstraint(fields=('assignment', 'offset_hours', 'due_date'), name='courses_reminder_unique_offset'),
+        ),
+    ]
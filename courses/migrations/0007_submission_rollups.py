@@ -0,0 +1,56 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_assignment_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssignmentRollup',
+            fields=[
+                ('submission_count', models.IntegerField(default=0)),
+                ('graded_count', models.IntegerField(default=0)),
+                ('late_count', models.IntegerField(default=0)),
+                ('score_total', models.BigIntegerField(default=0)),
+                ('points_total', models.BigIntegerField(default=0, help_text='Sum of possible points over graded submissions')),
+                ('assignment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rollup', serialize=False, to='courses.assignment')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='CourseRollup',
+            fields=[
+                ('submission_count', models.IntegerField(default=0)),
+                ('graded_count', models.IntegerField(default=0)),
+                ('late_count', models.IntegerField(default=0)),
+                ('score_total', models.BigIntegerField(default=0)),
+                ('points_total', models.BigIntegerField(default=0, help_text='Sum of possible points over graded submissions')),
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rollup', serialize=False, to='courses.course')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ModuleRollup',
+            fields=[
+                ('submission_count', models.IntegerField(default=0)),
+                ('graded_count', models.IntegerField(default=0)),
+                ('late_count', models.IntegerField(default=0)),
+                ('score_total', models.BigIntegerField(default=0)),
+                ('points_total', models.BigIntegerField(default=0, help_text='Sum of possible points over graded submissions')),
+                ('module', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rollup', serialize=False, to='courses.module')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
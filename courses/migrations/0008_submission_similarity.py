@@ -0,0 +1,36 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_submission_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionSignature',
+            fields=[
+                ('submission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='courses.submission')),
+                ('minhash', models.BinaryField()),
+                ('shingle_count', models.PositiveIntegerField()),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.assignment')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SimilarityBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.assignment')),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarity_buckets', to='courses.submission')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['assignment', 'band', 'bucket'], name='courses_similarity_bucket_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('courses', '0009_course_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_viewed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_viewed_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='courses.content')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='content_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'content progress',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='contentprogress',
+            constraint=models.UniqueConstraint(fields=('user', 'content'), name='courses_progress_unique_content'),
+        ),
+    ]
@@ -1,9 +1,15 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils.text import slugify
 
+from core.models import DerivedFieldsModel
+
+from .storage import content_storage
+
 
-class Course(models.Model):
+class Course(DerivedFieldsModel):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True)
     description = models.TextField()
@@ -13,6 +19,15 @@ class Course(models.Model):
     students = models.ManyToManyField(User, related_name='courses_enrolled', blank=True)
     is_active = models.BooleanField(default=True)
     image = models.ImageField(upload_to='course_images/', blank=True, null=True)
+    # Resized WebP/JPEG copies of image, written by courses.images
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    
+    # Denormalized counters, maintained by courses.signals
+    student_count = models.PositiveIntegerField(default=0, editable=False)
+    module_count = models.PositiveIntegerField(default=0, editable=False)
+    assignment_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    DERIVED_FIELDS = ('image_variants', 'student_count', 'module_count', 'assignment_count')
     
     class Meta:
         ordering = ['-created_at']
@@ -43,7 +58,7 @@ class Content(models.Model):
     module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name='contents')
     title = models.CharField(max_length=200)
     content_text = models.TextField(blank=True, null=True)
-    content_file = models.FileField(upload_to='content_files/', blank=True, null=True)
+    content_file = models.FileField(upload_to='content_files/', storage=content_storage, blank=True, null=True)
     content_url = models.URLField(blank=True, null=True)
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -55,11 +70,32 @@ class Content(models.Model):
         return self.title
 
 
+class ContentProgress(models.Model):
+    """
+    A student's progress through one content item. Views are recorded by
+    courses.progress through a write-behind buffer; completion is explicit.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='content_progress')
+    content = models.ForeignKey(Content, on_delete=models.CASCADE, related_name='progress')
+    first_viewed_at = models.DateTimeField(null=True, blank=True)
+    last_viewed_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name_plural = 'content progress'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'content'], name='courses_progress_unique_content'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.content.title}"
+
+
 class Assignment(models.Model):
     module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name='assignments')
     title = models.CharField(max_length=200)
     description = models.TextField()
-    due_date = models.DateTimeField()
+    due_date = models.DateTimeField(db_index=True)
     points = models.PositiveIntegerField(default=100)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -67,6 +103,30 @@ class Assignment(models.Model):
         return self.title
 
 
+class AssignmentReminder(models.Model):
+    """
+    Record of a deadline reminder sent for an assignment at one offset, so
+    the reminder scheduler never notifies the same students twice.
+    """
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='reminders')
+    offset_hours = models.PositiveIntegerField()
+    due_date = models.DateTimeField()
+    recipient_count = models.PositiveIntegerField(default=0)
+    sent_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-sent_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['assignment', 'offset_hours', 'due_date'],
+                name='courses_reminder_unique_offset',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.assignment.title}: {self.offset_hours}h reminder"
+
+
 class Submission(models.Model):
     STATUS_CHOICES = (
         ('submitted', 'Submitted'),
@@ -76,7 +136,7 @@ class Submission(models.Model):
     
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='submissions')
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='submissions')
-    file = models.FileField(upload_to='submissions/', blank=True, null=True)
+    file = models.FileField(upload_to='submissions/', storage=content_storage, blank=True, null=True)
     text = models.TextField(blank=True, null=True)
     submitted_at = models.DateTimeField(auto_now_add=True)
     score = models.PositiveIntegerField(blank=True, null=True)
@@ -85,6 +145,151 @@ class Submission(models.Model):
     
     class Meta:
         unique_together = ('assignment', 'student')
+        indexes = [
+            # Covers the gradebook's (student, assignment, score) scan of a course
+            models.Index(fields=['assignment', 'student', 'score'], name='courses_sub_gradebook_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.student.username} - {self.assignment.title}"
+    
+    @classmethod
+    def for_student(cls, user, assignments):
+        """Return the user's submissions for the given assignments as {assignment_id: submission}"""
+        assignment_ids = [getattr(assignment, 'pk', assignment) for assignment in assignments]
+        if not assignment_ids or not user.is_authenticated:
+            return {}
+        submissions = cls.objects.filter(student=user, assignment_id__in=assignment_ids)
+        return {submission.assignment_id: submission for submission in submissions}
+
+
+class SubmissionSignature(models.Model):
+    """MinHash signature of a submission's text, maintained by courses.similarity"""
+    submission = models.OneToOneField(Submission, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='+')
+    minhash = models.BinaryField()
+    shingle_count = models.PositiveIntegerField()
+    
+    def __str__(self):
+        return f"Signature for submission {self.submission_id}"
+
+
+class SimilarityBucket(models.Model):
+    """One LSH band of a submission signature; submissions sharing a bucket are candidate copies"""
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='+')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='similarity_buckets')
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['assignment', 'band', 'bucket'], name='courses_similarity_bucket_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.student.username} - {self.assignment.title}"
\ No newline at end of file
+        return f"Band {self.band} bucket {self.bucket}"
+
+
+class SubmissionRollup(models.Model):
+    """
+    Running submission totals, maintained incrementally by courses.signals
+    and repaired by the reconcile_rollups command. Counters are signed so a
+    decrement against a not-yet-reconciled row can never fail a save.
+    """
+    submission_count = models.IntegerField(default=0)
+    graded_count = models.IntegerField(default=0)
+    late_count = models.IntegerField(default=0)
+    score_total = models.BigIntegerField(default=0)
+    points_total = models.BigIntegerField(default=0, help_text="Sum of possible points over graded submissions")
+    
+    class Meta:
+        abstract = True
+    
+    @property
+    def average_percent(self):
+        if self.points_total <= 0:
+            return None
+        return 100 * self.score_total / self.points_total
+    
+    @property
+    def late_percent(self):
+        if self.submission_count <= 0:
+            return None
+        return 100 * self.late_count / self.submission_count
+    
+    def submission_rate(self, expected):
+        """Percentage of ``expected`` submissions received"""
+        if not expected:
+            return None
+        return 100 * self.submission_count / expected
+
+
+class AssignmentRollup(SubmissionRollup):
+    assignment = models.OneToOneField(Assignment, on_delete=models.CASCADE, primary_key=True, related_name='rollup')
+    
+    def __str__(self):
+        return f"Rollup for {self.assignment.title}"
+    
+    @property
+    def average_score(self):
+        if self.graded_count <= 0:
+            return None
+        return self.score_total / self.graded_count
+
+
+class ModuleRollup(SubmissionRollup):
+    module = models.OneToOneField(Module, on_delete=models.CASCADE, primary_key=True, related_name='rollup')
+    
+    def __str__(self):
+        return f"Rollup for {self.module}"
+
+
+class CourseRollup(SubmissionRollup):
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name='rollup')
+    
+    def __str__(self):
+        return f"Rollup for {self.course.title}"
+
+
+class UploadSession(models.Model):
+    """
+    A resumable, chunked upload of a submission or content file.
+    Chunks are staged on disk by courses.uploads until the session is completed.
+    """
+    TARGET_CHOICES = (
+        ('submission', 'Assignment submission'),
+        ('content', 'Course content'),
+    )
+    STATUS_CHOICES = (
+        ('active', 'Active'),
+        ('complete', 'Complete'),
+    )
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, null=True, blank=True, related_name='upload_sessions')
+    content = models.ForeignKey(Content, on_delete=models.CASCADE, null=True, blank=True, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    checksum = models.CharField(max_length=64, blank=True, help_text="Optional SHA-256 of the whole file")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.filename} ({self.get_status_display()})"
+    
+    @property
+    def chunk_count(self):
+        return max(1, -(-self.size // self.chunk_size))
+    
+    def expected_chunk_size(self, index):
+        """Byte length the chunk at this index must have"""
+        if index < self.chunk_count - 1:
+            return self.chunk_size
+        return self.size - self.chunk_size * (self.chunk_count - 1)
@@ -0,0 +1,126 @@
+"""
+Versioned course-outline snapshots.
+
+A course outline is the module -> contents/assignments tree rendered by
+``course_detail`` and ``module_detail`` and fed to the AI assistant prompt.
+It changes a few times per term, so it is cached under a per-course version
+number. The signal receivers in ``courses.signals`` bump the version whenever
+a Module, Content or Assignment is saved or deleted, which orphans the old
+snapshot instead of trying to patch it. A bump only reaches other workers
+through a shared cache, so with a per-process one the outline is loaded
+from the database on every request instead.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import is_shared_cache
+
+from .models import Module
+
+VERSION_CACHE_KEY = 'courses:outline:version:{course_id}'
+SNAPSHOT_CACHE_KEY = 'courses:outline:{course_id}:{version}'
+STATS_CACHE_KEY = 'courses:outline:stats:{name}'
+
+
+class CourseOutline:
+    """Snapshot of a course's modules with their contents and assignments"""
+
+    def __init__(self, course_id, version, modules):
+        self.course_id = course_id
+        self.version = version
+        self.modules = modules
+
+    def __iter__(self):
+        return iter(self.modules)
+
+    def __len__(self):
+        return len(self.modules)
+
+    def get_module(self, module_id):
+        """Return the module with this ID, or None if it is not in the course"""
+        for module in self.modules:
+            if module.pk == module_id:
+                return module
+        return None
+
+
+def _snapshot_timeout():
+    return getattr(settings, 'COURSE_OUTLINE_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def _new_version():
+    # Seeded from the clock so an evicted version key never reuses a number
+    # that may still have a snapshot cached under it.
+    return time.time_ns() // 1000
+
+
+def _incr_stat(name):
+    key = STATS_CACHE_KEY.format(name=name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_outline_version(course_id):
+    """Return the current outline version for a course"""
+    key = VERSION_CACHE_KEY.format(course_id=course_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_outline_version(course_id):
+    """Invalidate the cached outline of a course"""
+    if not is_shared_cache():
+        return
+    key = VERSION_CACHE_KEY.format(course_id=course_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def build_outline(course_id, version=None):
+    """Load a course's outline from the database"""
+    modules = list(
+        Module.objects.filter(course_id=course_id)
+        .order_by('order', 'pk')
+        .prefetch_related('contents', 'assignments')
+    )
+    return CourseOutline(course_id, version, modules)
+
+
+def get_course_outline(course):
+    """Return the course outline, from the cache when the version is current"""
+    if not is_shared_cache():
+        return build_outline(course.pk)
+
+    version = get_outline_version(course.pk)
+    key = SNAPSHOT_CACHE_KEY.format(course_id=course.pk, version=version)
+
+    outline = cache.get(key)
+    if outline is not None:
+        _incr_stat('hits')
+        return outline
+
+    _incr_stat('misses')
+    outline = build_outline(course.pk, version)
+    cache.set(key, outline, _snapshot_timeout())
+    return outline
+
+
+def get_outline_stats():
+    """Return {'hits': int, 'misses': int} across all workers sharing the cache"""
+    keys = {name: STATS_CACHE_KEY.format(name=name) for name in ('hits', 'misses')}
+    values = cache.get_many(keys.values())
+    return {name: values.get(key, 0) for name, key in keys.items()}
+
+
+def reset_outline_stats():
+    cache.delete_many([STATS_CACHE_KEY.format(name=name) for name in ('hits', 'misses')])
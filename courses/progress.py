@@ -0,0 +1,93 @@
+"""
+Per-student content progress.
+
+Opening a module page or downloading a content file records a view of each
+content item shown. Views go into an in-process write-behind buffer keyed by
+(user, content), so repeat views within a flush interval collapse into one
+entry, and each flush writes the whole batch as a single upsert that keeps
+the first view time and advances the last. Marking an item complete is a
+deliberate action and is written immediately. Module completion
+percentages come from one grouped query over the completed rows, against
+the content counts already in the cached course outline.
+"""
+from django.utils import timezone
+
+from core.buffers import WriteBehindBuffer
+
+from .models import Content, ContentProgress
+
+PROGRESS_BATCH_SIZE = 1000
+
+
+def _merge_views(first, second):
+    return (min(first[0], second[0]), max(first[1], second[1]))
+
+
+def _flush_views(pending):
+    # Skip content deleted since the view was buffered
+    content_ids = {content_id for _, content_id in pending}
+    existing = set(Content.objects.filter(pk__in=content_ids).values_list('pk', flat=True))
+    ContentProgress.objects.bulk_create(
+        [
+            ContentProgress(user_id=user_id, content_id=content_id, first_viewed_at=first, last_viewed_at=last)
+            for (user_id, content_id), (first, last) in pending.items()
+            if content_id in existing
+        ],
+        batch_size=PROGRESS_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['user', 'content'],
+        update_fields=['last_viewed_at'],
+    )
+
+
+view_buffer = WriteBehindBuffer('content-views', _flush_views, _merge_views)
+
+
+def record_views(user, contents):
+    """Buffer a view of each content item (or content ID) by an authenticated user"""
+    if not user.is_authenticated:
+        return
+    now = timezone.now()
+    for content in contents:
+        view_buffer.add((user.pk, getattr(content, 'pk', content)), (now, now))
+
+
+def set_completed(user, content, completed=True):
+    """Mark a content item complete (or not) for a user, creating the progress row if needed"""
+    now = timezone.now()
+    ContentProgress.objects.bulk_create(
+        [ContentProgress(
+            user=user, content=content, first_viewed_at=now, last_viewed_at=now,
+            completed_at=now if completed else None,
+        )],
+        update_conflicts=True,
+        unique_fields=['user', 'content'],
+        update_fields=['last_viewed_at', 'completed_at'],
+    )
+
+
+def completed_content_ids(user, course_id):
+    """Return {module_id: set of completed content IDs} for a user in one course"""
+    completed = {}
+    rows = ContentProgress.objects.filter(
+        user=user, completed_at__isnull=False, content__module__course_id=course_id,
+    ).values_list('content__module_id', 'content_id')
+    for module_id, content_id in rows:
+        completed.setdefault(module_id, set()).add(content_id)
+    return completed
+
+
+def attach_module_progress(user, outline):
+    """
+    Set ``completed_count`` and ``completion_percent`` on every module of a
+    course outline, and ``is_completed`` on its contents, for one user.
+    """
+    completed = completed_content_ids(user, outline.course_id)
+    for module in outline:
+        done = completed.get(module.pk, set())
+        contents = module.contents.all()
+        for content in contents:
+            content.is_completed = content.pk in done
+        module.completed_count = len(done)
+        module.completion_percent = round(100 * len(done) / len(contents)) if contents else None
+
@@ -0,0 +1,168 @@
+"""
+Deadline reminders.
+
+``ReminderScheduler`` keeps a min-heap of (fire_at, assignment, offset)
+entries for deadlines inside a look-ahead window, loaded by a range scan on
+the ``due_date`` index, and pops them as they come due. Each reminder finds
+the enrolled students with no Submission in one anti-join (NOT EXISTS)
+query, streamed from the database in chunks, and writes their notifications
+with messaging.dispatch.bulk_notify in batches, so memory stays flat however
+many students a course has.
+"""
+import heapq
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.timesince import timeuntil
+
+from messaging.dispatch import NOTIFICATION_BATCH_SIZE, bulk_notify
+
+from .models import Assignment, AssignmentReminder, Course, Submission
+
+logger = logging.getLogger(__name__)
+
+
+def reminder_offsets():
+    """Configured reminder offsets in hours before the deadline, largest first"""
+    return sorted(set(getattr(settings, 'ASSIGNMENT_REMINDER_OFFSETS', (48, 2))), reverse=True)
+
+
+def pending_recipient_ids(assignment):
+    """Yield IDs of students enrolled in the assignment's course who have not submitted"""
+    submitted = Submission.objects.filter(assignment_id=assignment.pk, student_id=OuterRef('user_id'))
+    return (
+        Course.students.through.objects
+        .filter(course_id=assignment.module.course_id)
+        .filter(~Exists(submitted))
+        .values_list('user_id', flat=True)
+        .iterator(chunk_size=NOTIFICATION_BATCH_SIZE)
+    )
+
+
+def send_reminder(assignment_id, offset_hours, due_date):
+    """
+    Notify every student without a submission that an assignment is due.
+
+    Returns the number of notifications created, or None if the reminder
+    was already sent, the deadline has moved, or it has passed.
+    """
+    assignment = (
+        Assignment.objects.select_related('module__course')
+        .filter(pk=assignment_id, due_date=due_date, module__course__is_active=True)
+        .first()
+    )
+    if assignment is None or assignment.due_date <= timezone.now():
+        return None
+
+    course = assignment.module.course
+    title = f"{assignment.title} is due in {timeuntil(assignment.due_date, depth=1)}"
+    message = (
+        f"{assignment.title} in {course.title} is due "
+        f"{timezone.localtime(assignment.due_date):%b %d, %Y %H:%M} and you have not submitted it yet."
+    )
+    link = reverse('assignment_detail', kwargs={'course_slug': course.slug, 'assignment_id': assignment.pk})
+
+    try:
+        with transaction.atomic():
+            # Claiming the reminder row first makes concurrent schedulers and
+            # re-runs skip it; a failure rolls back the claim with the batch.
+            reminder = AssignmentReminder.objects.create(
+                assignment=assignment, offset_hours=offset_hours, due_date=assignment.due_date,
+            )
+            sent = bulk_notify(
+                pending_recipient_ids(assignment),
+                notification_type='assignment',
+                title=title,
+                message=message,
+                related_link=link,
+            )
+            reminder.recipient_count = sent
+            reminder.save(update_fields=['recipient_count'])
+    except IntegrityError:
+        return None
+
+    return sent
+
+
+class ReminderScheduler:
+    """Min-heap of upcoming reminder times for deadlines inside a look-ahead window"""
+
+    def __init__(self, offsets=None, horizon=timedelta(minutes=10)):
+        self.offsets = offsets or reminder_offsets()
+        self.horizon = horizon
+        self.heap = []
+        self.loaded_until = None
+
+    def load(self, now=None):
+        """
+        Rebuild the heap with every reminder that fires before now + horizon.
+
+        Reminders whose time has already passed but whose deadline has not
+        (e.g. after downtime) fire immediately. Only deadlines inside
+        (now, now + horizon + largest offset] are read, using the due_date
+        index; the short horizon means new or moved deadlines are picked up
+        at the next reload.
+        """
+        now = now or timezone.now()
+        until = now + self.horizon
+        sent = set(
+            AssignmentReminder.objects.filter(due_date__gt=now)
+            .values_list('assignment_id', 'offset_hours', 'due_date')
+        )
+        heap = []
+        upcoming = (
+            Assignment.objects.filter(
+                due_date__gt=now,
+                due_date__lte=until + timedelta(hours=max(self.offsets)),
+                module__course__is_active=True,
+            )
+            .order_by('due_date')
+            .values_list('pk', 'due_date')
+            .iterator()
+        )
+        for assignment_id, due_date in upcoming:
+            # Offsets run largest first; once one is already due, the larger
+            # ones before it are stale and superseded by it.
+            due_now = [offset for offset in self.offsets if due_date - timedelta(hours=offset) <= now]
+            for offset in self.offsets:
+                if due_now and offset > due_now[-1]:
+                    continue
+                fire_at = due_date - timedelta(hours=offset)
+                if fire_at <= until and (assignment_id, offset, due_date) not in sent:
+                    heap.append((fire_at, assignment_id, offset, due_date))
+        heapq.heapify(heap)
+        self.heap = heap
+        self.loaded_until = until
+
+    def next_fire_time(self):
+        return self.heap[0][0] if self.heap else None
+
+    def run_pending(self, now=None):
+        """Send every reminder that is due; returns (reminders_sent, notifications_created)"""
+        now = now or timezone.now()
+        if self.loaded_until is None or now >= self.loaded_until:
+            self.load(now)
+
+        reminders = notifications = 0
+        while self.heap and self.heap[0][0] <= now:
+            fire_at, assignment_id, offset, due_date = heapq.heappop(self.heap)
+            count = send_reminder(assignment_id, offset, due_date)
+            if count is not None:
+                reminders += 1
+                notifications += count
+                logger.info("Sent %sh reminder for assignment %s to %s students", offset, assignment_id, count)
+        return reminders, notifications
+
+    def seconds_until_next(self, now=None, maximum=60):
+        """How long the loop can sleep before the next reminder or heap reload"""
+        now = now or timezone.now()
+        wake = self.loaded_until
+        next_fire = self.next_fire_time()
+        if next_fire is not None:
+            wake = min(wake, next_fire)
+        return max(0.0, min((wake - now).total_seconds(), maximum))
@@ -0,0 +1,212 @@
+"""
+Submission analytics rollups.
+
+AssignmentRollup, ModuleRollup and CourseRollup hold running totals
+(submissions, graded, late, score and possible points) so dashboards read
+one row per assignment, module or course instead of aggregating Submission.
+Signal handlers apply each change as a delta with ``UPDATE ... SET x = x + n``
+on the three rows, which is safe under concurrent saves. ``reconcile``
+recomputes the totals from the source tables and rewrites only rows that
+have drifted (bulk updates, raw SQL, or a crash between commits).
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Assignment, AssignmentRollup, Course, CourseRollup, Module, ModuleRollup
+
+ROLLUP_FIELDS = ('submission_count', 'graded_count', 'late_count', 'score_total', 'points_total')
+RECONCILE_BATCH_SIZE = 1000
+
+
+def submission_state(submission):
+    """The parts of a submission the rollups depend on, or None if unsaved"""
+    if submission.pk is None:
+        return None
+    return (submission.assignment_id, submission.score, submission.submitted_at)
+
+
+def _contribution(state, due_date, points, sign=1):
+    _, score, submitted_at = state
+    graded = score is not None
+    return {
+        'submission_count': sign,
+        'graded_count': sign if graded else 0,
+        'late_count': sign if submitted_at is not None and submitted_at > due_date else 0,
+        'score_total': sign * (score or 0),
+        'points_total': sign * points if graded else 0,
+    }
+
+
+def _add(total, delta):
+    for field, value in delta.items():
+        total[field] = total.get(field, 0) + value
+
+
+def _increment(model, pk, delta, create=True):
+    changes = {field: F(field) + value for field, value in delta.items() if value}
+    if not changes:
+        return
+    queryset = model.objects.filter(pk=pk)
+    if queryset.update(**changes) or not create:
+        return
+    # First change for this row: insert zeros (racing inserts are ignored)
+    # and apply the delta to whichever row won.
+    model.objects.bulk_create([model(pk=pk)], ignore_conflicts=True)
+    queryset.update(**changes)
+
+
+def apply_deltas(deltas, create=True):
+    """
+    Apply {assignment_id: delta} to the assignment rollups and to their
+    module and course rollups.
+    """
+    deltas = {assignment_id: delta for assignment_id, delta in deltas.items() if any(delta.values())}
+    if not deltas:
+        return
+    module_deltas = {}
+    course_deltas = {}
+    parents = Assignment.objects.filter(pk__in=deltas).values_list('pk', 'module_id', 'module__course_id')
+    for assignment_id, module_id, course_id in parents:
+        _add(module_deltas.setdefault(module_id, {}), deltas[assignment_id])
+        _add(course_deltas.setdefault(course_id, {}), deltas[assignment_id])
+
+    for assignment_id, delta in deltas.items():
+        _increment(AssignmentRollup, assignment_id, delta, create)
+    for module_id, delta in module_deltas.items():
+        _increment(ModuleRollup, module_id, delta, create)
+    for course_id, delta in course_deltas.items():
+        _increment(CourseRollup, course_id, delta, create)
+
+
+def submission_changed(old_state, new_state):
+    """
+    Fold one submission save (old_state -> new_state) or delete
+    (old_state -> None) into the rollups.
+    """
+    states = [state for state in (old_state, new_state) if state is not None]
+    if not states:
+        return
+    assignments = {
+        pk: (due_date, points) for pk, due_date, points in
+        Assignment.objects.filter(pk__in={state[0] for state in states}).values_list('pk', 'due_date', 'points')
+    }
+    deltas = {}
+    for state, sign in ((old_state, -1), (new_state, 1)):
+        if state is not None and state[0] in assignments:
+            _add(deltas.setdefault(state[0], {}), _contribution(state, *assignments[state[0]], sign=sign))
+    # Deletes never create rows: a cascading delete may already have removed them
+    apply_deltas(deltas, create=new_state is not None)
+
+
+def _assignment_totals(assignments):
+    graded = Q(submissions__score__isnull=False)
+    return assignments.order_by().annotate(
+        submission_count=Count('submissions'),
+        graded_count=Count('submissions', filter=graded),
+        late_count=Count('submissions', filter=Q(submissions__submitted_at__gt=F('due_date'))),
+        score_total=Coalesce(Sum('submissions__score'), 0),
+    ).values_list('pk', 'module_id', 'module__course_id', 'points', *ROLLUP_FIELDS[:4])
+
+
+def refresh_assignment(assignment_id, old_module_id):
+    """
+    Recompute one assignment's rollup from its submissions after its due
+    date, points or module changed, moving the difference between the old
+    and new totals up to the module and course rollups.
+    """
+    with transaction.atomic():
+        stored = AssignmentRollup.objects.select_for_update().filter(pk=assignment_id).first()
+        rows = list(_assignment_totals(Assignment.objects.filter(pk=assignment_id)))
+        if not rows:
+            return
+        _, module_id, course_id, points, *counts = rows[0]
+        fresh = dict(zip(ROLLUP_FIELDS, counts + [counts[1] * points]))
+        old = {field: getattr(stored, field) if stored else 0 for field in ROLLUP_FIELDS}
+
+        if old_module_id is not None:
+            # Take the stored totals off the old parents, then add the fresh ones
+            negated = {field: -value for field, value in old.items()}
+            old_course_id = Module.objects.filter(pk=old_module_id).values_list('course_id', flat=True).first()
+            _increment(ModuleRollup, old_module_id, negated)
+            if old_course_id is not None:
+                _increment(CourseRollup, old_course_id, negated)
+            delta = fresh
+        else:
+            delta = {field: fresh[field] - old[field] for field in ROLLUP_FIELDS}
+
+        AssignmentRollup.objects.update_or_create(pk=assignment_id, defaults=fresh)
+        _increment(ModuleRollup, module_id, delta)
+        _increment(CourseRollup, course_id, delta)
+
+
+def compute_rollups(course_ids=None):
+    """
+    Recompute every rollup from the source tables.
+
+    Returns three dicts (assignments, modules, courses) of
+    {pk: tuple of ROLLUP_FIELDS values}. Modules and courses are summed from
+    the assignment totals, so only Submission is aggregated.
+    """
+    courses = Course.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(pk__in=course_ids)
+    zero = (0,) * len(ROLLUP_FIELDS)
+    course_totals = {pk: zero for pk in courses.values_list('pk', flat=True)}
+    module_totals = {
+        pk: zero for pk in Module.objects.filter(course_id__in=courses.values('pk')).values_list('pk', flat=True)
+    }
+    assignment_totals = {}
+
+    assignments = Assignment.objects.filter(module__course_id__in=courses.values('pk'))
+    for pk, module_id, course_id, points, *counts in _assignment_totals(assignments).iterator(
+        chunk_size=RECONCILE_BATCH_SIZE
+    ):
+        totals = tuple(counts) + (counts[1] * points,)
+        assignment_totals[pk] = totals
+        module_totals[module_id] = tuple(map(sum, zip(module_totals[module_id], totals)))
+        course_totals[course_id] = tuple(map(sum, zip(course_totals[course_id], totals)))
+    return assignment_totals, module_totals, course_totals
+
+
+def _drifted(model, stored, totals):
+    stored = dict((pk, tuple(values)) for pk, *values in stored.values_list('pk', *ROLLUP_FIELDS))
+    key = model._meta.pk.attname
+    # A missing row reads as all zeros, so it has only drifted if the totals are not
+    zero = (0,) * len(ROLLUP_FIELDS)
+    return [
+        model(**{key: pk}, **dict(zip(ROLLUP_FIELDS, values)))
+        for pk, values in totals.items() if stored.get(pk, zero) != values
+    ]
+
+
+def reconcile(course_ids=None, dry_run=False):
+    """
+    Rewrite rollups that differ from the source tables.
+
+    Returns {model name: number of drifted rows}. A change committed while
+    this runs can be overwritten; the next run picks it up again.
+    """
+    assignment_totals, module_totals, course_totals = compute_rollups(course_ids)
+    stored = {
+        AssignmentRollup: AssignmentRollup.objects.all(),
+        ModuleRollup: ModuleRollup.objects.all(),
+        CourseRollup: CourseRollup.objects.all(),
+    }
+    if course_ids is not None:
+        stored[AssignmentRollup] = stored[AssignmentRollup].filter(assignment__module__course_id__in=course_ids)
+        stored[ModuleRollup] = stored[ModuleRollup].filter(module__course_id__in=course_ids)
+        stored[CourseRollup] = stored[CourseRollup].filter(course_id__in=course_ids)
+    drifted = {
+        AssignmentRollup: _drifted(AssignmentRollup, stored[AssignmentRollup], assignment_totals),
+        ModuleRollup: _drifted(ModuleRollup, stored[ModuleRollup], module_totals),
+        CourseRollup: _drifted(CourseRollup, stored[CourseRollup], course_totals),
+    }
+    if not dry_run:
+        with transaction.atomic():
+            for model, rows in drifted.items():
+                model.objects.bulk_create(
+                    rows, batch_size=RECONCILE_BATCH_SIZE, update_conflicts=True,
+                    unique_fields=[model._meta.pk.name], update_fields=ROLLUP_FIELDS,
+                )
+    return {model.__name__: len(rows) for model, rows in drifted.items()}
@@ -0,0 +1,205 @@
+"""
+Bulk roster import.
+
+A roster is a CSV with one student per row: either a single column of
+usernames or email addresses, or a header row naming any of ``username``,
+``email``, ``first_name`` and ``last_name``. Rows are streamed and handled
+in batches: each batch is resolved with one ``IN`` lookup, missing users
+are optionally created with ``bulk_create`` (plus their UserProfile rows,
+since bulk_create skips the post_save signal that normally creates them),
+and enrollments are inserted straight into the ``Course.students`` through
+table with ``bulk_create(ignore_conflicts=True)``.
+"""
+import csv
+import io
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from accounts.models import UserProfile
+
+from .access import invalidate_enrolled_course_ids
+from .counters import recount_courses
+from .models import Course
+
+ROSTER_BATCH_SIZE = 2000
+ROSTER_COLUMNS = ('username', 'email', 'first_name', 'last_name')
+MAX_REPORTED_UNKNOWN = 50
+
+
+class RosterResult:
+    """Counts from a roster import"""
+
+    def __init__(self):
+        self.rows = 0
+        self.enrolled = 0
+        self.already_enrolled = 0
+        self.created_users = 0
+        self.skipped = 0
+        self.unknown = []
+        self.unknown_count = 0
+
+    def __str__(self):
+        return (f"{self.enrolled} enrolled, {self.already_enrolled} already enrolled, "
+                f"{self.created_users} users created, {self.unknown_count} unknown, "
+                f"{self.skipped} skipped")
+
+
+def read_roster(csv_file):
+    """
+    Yield one dict per roster row with the keys in ROSTER_COLUMNS.
+
+    ``csv_file`` may be a text or binary file object (e.g. an admin upload).
+    """
+    if isinstance(csv_file.read(0), bytes):
+        # Wrap the underlying file of Django's UploadedFile proxies
+        csv_file = io.TextIOWrapper(getattr(csv_file, 'file', csv_file), encoding='utf-8-sig', newline='')
+    reader = csv.reader(csv_file)
+
+    first = next(reader, None)
+    if first is None:
+        return
+    header = [column.strip().lower() for column in first]
+    if any(column in ROSTER_COLUMNS for column in header):
+        columns = header
+    else:
+        # Headerless: a single column of usernames or emails
+        columns = None
+        reader = _prepend(first, reader)
+
+    for values in reader:
+        if columns is None:
+            identifier = values[0].strip() if values else ''
+            row = {'email': identifier} if '@' in identifier else {'username': identifier}
+        else:
+            row = {column: value.strip() for column, value in zip(columns, values) if column in ROSTER_COLUMNS}
+        if row.get('email'):
+            row['email'] = row['email'].lower()
+        yield row
+
+
+def _prepend(first, rows):
+    yield first
+    yield from rows
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def import_roster(course, rows, create_missing=False, batch_size=ROSTER_BATCH_SIZE):
+    """Enroll every roster row in ``course``; returns a RosterResult"""
+    result = RosterResult()
+    through = Course.students.through
+
+    for batch in _batches(rows, batch_size):
+        result.rows += len(batch)
+        with transaction.atomic():
+            user_ids = _resolve_batch(batch, result, create_missing)
+            user_ids.discard(course.instructor_id)
+
+            existing = set(
+                through.objects.filter(course_id=course.pk, user_id__in=user_ids)
+                .values_list('user_id', flat=True)
+            )
+            new_ids = user_ids - existing
+            through.objects.bulk_create(
+                [through(course_id=course.pk, user_id=user_id) for user_id in new_ids],
+                ignore_conflicts=True,
+            )
+            result.already_enrolled += len(existing)
+            result.enrolled += len(new_ids)
+
+        # bulk_create bypasses m2m_changed, so do what its handler would
+        invalidate_enrolled_course_ids(new_ids)
+
+    recount_courses([course.pk], fields=('student_count',))
+    return result
+
+
+def _resolve_batch(batch, result, create_missing):
+    """Return the user IDs for a batch of rows, creating missing users if asked"""
+    usernames = {row['username'] for row in batch if row.get('username')}
+    emails = {row['email'] for row in batch if row.get('email') and not row.get('username')}
+
+    by_username = {}
+    by_email = {}
+    if usernames or emails:
+        # Roster emails are lowercased; stored ones keep whatever case they were entered in
+        for user_id, username, email in User.objects.annotate(email_lower=Lower('email')).filter(
+            Q(username__in=usernames) | Q(email_lower__in=emails)
+        ).values_list('id', 'username', 'email'):
+            by_username[username] = user_id
+            if email:
+                by_email.setdefault(email.lower(), user_id)
+
+    user_ids = set()
+    missing = {}
+    for row in batch:
+        username, email = row.get('username'), row.get('email')
+        if username:
+            user_id = by_username.get(username)
+        elif email:
+            user_id = by_email.get(email)
+        else:
+            result.skipped += 1
+            continue
+
+        if user_id is not None:
+            user_ids.add(user_id)
+        elif create_missing:
+            # Email-only rows use the address as the username
+            missing.setdefault(username or email, row)
+        else:
+            result.unknown_count += 1
+            if len(result.unknown) < MAX_REPORTED_UNKNOWN:
+                result.unknown.append(username or email)
+
+    if missing:
+        user_ids.update(_create_users(missing, result))
+    return user_ids
+
+
+def _create_users(missing, result):
+    """Bulk-create users (with unusable passwords) and their profiles; returns the new IDs"""
+    users = [
+        User(
+            username=username[:150],
+            email=row.get('email', ''),
+            first_name=row.get('first_name', '')[:150],
+            last_name=row.get('last_name', '')[:150],
+            password=make_password(None),
+        )
+        for username, row in missing.items()
+    ]
+    User.objects.bulk_create(users, ignore_conflicts=True)
+
+    # ignore_conflicts does not return primary keys on every backend, and a
+    # conflicting row belongs to someone else. Each unusable password is a
+    # random string, so it tells the rows inserted here from existing ones.
+    passwords = {user.username: user.password for user in users}
+    created = {
+        username: user_id
+        for user_id, username, password in User.objects.filter(username__in=passwords)
+        .values_list('id', 'username', 'password')
+        if passwords[username] == password
+    }
+    UserProfile.objects.bulk_create(
+        [UserProfile(user_id=user_id) for user_id in created.values()],
+        ignore_conflicts=True,
+    )
+    result.created_users += len(created)
+
+    # A username that was already taken (e.g. an email-only row whose address
+    # is another account's username) cannot be matched to the row safely
+    for username in passwords.keys() - created.keys():
+        result.unknown_count += 1
+        if len(result.unknown) < MAX_REPORTED_UNKNOWN:
+            result.unknown.append(username)
+    return created.values()
@@ -0,0 +1,165 @@
+"""
+Protected file serving for course content and submissions.
+
+Views check course membership and then hand the file to ``serve_file``,
+which answers conditional requests (ETag / Last-Modified) and single byte
+ranges. With ``MEDIA_SENDFILE_BACKEND`` set, the response carries only
+headers and the front-end server streams the bytes itself:
+
+* ``'xsendfile'``: ``X-Sendfile: <absolute path>`` (Apache mod_xsendfile,
+  lighttpd)
+* ``'xaccel'``: ``X-Accel-Redirect: <MEDIA_ACCEL_REDIRECT_PREFIX><name>``
+  (nginx, with an ``internal`` location aliased to MEDIA_ROOT)
+
+Only types a browser renders as passive content are served inline; anything
+else (HTML, SVG, XML...) could run script on the site's origin, so it is
+always sent as an attachment.
+
+Without a backend, FileResponse hands the open file to the WSGI server's
+``wsgi.file_wrapper``, which uses sendfile(2) where available, so ranges
+are still served without Python copying the bytes.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Content types safe to display inline; everything else is downloaded
+INLINE_CONTENT_TYPES = frozenset({
+    'application/pdf',
+    'text/plain',
+    'image/png', 'image/jpeg', 'image/gif', 'image/webp',
+    'audio/mpeg', 'audio/ogg', 'audio/wav',
+    'video/mp4', 'video/webm', 'video/ogg',
+})
+
+
+class _FileRange:
+    """File-like view of ``length`` bytes of an open file starting at ``start``"""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        # Lets wsgi.file_wrapper sendfile() from the current offset; the
+        # server stops at Content-Length.
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def file_etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) inclusive for a single satisfiable byte range, None
+    if the header should be ignored, or raise ValueError if unsatisfiable.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match:
+        # Malformed or multipart ranges: serve the whole file
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError
+    return start, end
+
+
+def serve_file(request, field_file, as_attachment=False):
+    """Return a response for a stored file, honouring Range and conditional headers"""
+    name = field_file.name
+    try:
+        path = field_file.path
+        stat = os.stat(path)
+    except (FileNotFoundError, NotImplementedError):
+        raise Http404("File not found.")
+
+    etag = file_etag(stat)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        return not_modified
+
+    size = stat.st_size
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if range_header and request.method == 'GET' and (not if_range or etag in parse_etags(if_range)):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    filename = os.path.basename(name)
+    content_type, encoding = mimetypes.guess_type(filename)
+    if encoding or content_type not in INLINE_CONTENT_TYPES:
+        as_attachment = True
+
+    backend = getattr(settings, 'MEDIA_SENDFILE_BACKEND', '')
+    if backend:
+        # The front-end server handles Range and the body itself
+        response = HttpResponse()
+        if backend == 'xaccel':
+            prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+            response['X-Accel-Redirect'] = quote(prefix + name)
+        else:
+            response['X-Sendfile'] = path
+        response['Content-Type'] = content_type or 'application/octet-stream'
+        _set_disposition(response, filename, as_attachment)
+    else:
+        handle = open(path, 'rb')
+        if byte_range:
+            start, end = byte_range
+            response = FileResponse(_FileRange(handle, start, end - start + 1), status=206,
+                                    as_attachment=as_attachment, filename=filename)
+            response['Content-Length'] = end - start + 1
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        else:
+            response = FileResponse(handle, as_attachment=as_attachment, filename=filename)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = 'private, no-cache'
+    response['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+
+def _set_disposition(response, filename, as_attachment):
+    disposition = 'attachment' if as_attachment else 'inline'
+    try:
+        filename.encode('ascii')
+        response['Content-Disposition'] = f'{disposition}; filename="{filename}"'
+    except UnicodeEncodeError:
+        response['Content-Disposition'] = f"{disposition}; filename*=utf-8''{quote(filename)}"
@@ -0,0 +1,243 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .access import clear_request_cache, invalidate_enrolled_course_ids
+from .counters import recount_courses
+from .images import remove_variants, schedule_course_variants
+from .models import Assignment, Content, Course, Module, Submission
+from .outline import bump_outline_version
+from .rollups import refresh_assignment, submission_changed, submission_state
+from .similarity import index_submissions
+
+# Sent by courses.cloning.clone_course with source= and clone=; the clone's
+# tree is created with bulk_create, so per-row post_save signals never fire.
+course_cloned = Signal()
+
+
+def _course_id_for_module(module_id):
+    return Module.objects.filter(pk=module_id).values_list('course_id', flat=True).first()
+
+
+def _bump_outline_on_commit(course_id):
+    # Bumping after commit keeps a concurrent reader from caching the
+    # pre-commit tree under the new version.
+    if course_id is not None:
+        transaction.on_commit(lambda: bump_outline_version(course_id))
+
+
+@receiver(m2m_changed, sender=Course.students.through)
+def enrollment_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate cached enrollment sets and recount students when Course.students changes"""
+    if action == 'pre_clear':
+        # pk_set is not provided for clears, so capture the affected rows first
+        if reverse:
+            instance._cleared_enrollment_user_ids = [instance.pk]
+            instance._cleared_enrollment_course_ids = list(
+                sender.objects.filter(user_id=instance.pk).values_list('course_id', flat=True)
+            )
+        else:
+            instance._cleared_enrollment_user_ids = list(
+                sender.objects.filter(course_id=instance.pk).values_list('user_id', flat=True)
+            )
+            instance._cleared_enrollment_course_ids = [instance.pk]
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if action == 'post_clear':
+        user_ids = getattr(instance, '_cleared_enrollment_user_ids', [])
+        course_ids = getattr(instance, '_cleared_enrollment_course_ids', [])
+    elif reverse:
+        # user.courses_enrolled.add(...): the instance is the user
+        user_ids = [instance.pk]
+        course_ids = pk_set or []
+    else:
+        user_ids = pk_set or []
+        course_ids = [instance.pk]
+
+    if reverse:
+        clear_request_cache(instance)
+    invalidate_enrolled_course_ids(user_ids)
+    if course_ids:
+        recount_courses(course_ids, fields=('student_count',))
+
+
+@receiver(post_init, sender=Course)
+def remember_course_image(sender, instance, **kwargs):
+    """Record the stored image name so replacing the image can be detected"""
+    if instance.pk is not None and 'image' not in instance.get_deferred_fields():
+        instance._saved_image = instance.image.name or ''
+
+
+@receiver(pre_save, sender=Course)
+def course_image_changing(sender, instance, raw=False, **kwargs):
+    """Drop the variants of a replaced image so templates fall back to the new original"""
+    if raw:
+        return
+    name = instance.image.name or ''
+    if instance._state.adding:
+        # A clone arrives with the variants of the image it shares
+        changed = bool(name) and not instance.image_variants
+    else:
+        changed = getattr(instance, '_saved_image', name) != name
+    if changed:
+        instance._replaced_image = (getattr(instance, '_saved_image', ''), instance.image_variants)
+        instance.image_variants = {}
+
+
+@receiver(post_save, sender=Course)
+def course_image_saved(sender, instance, created, raw=False, **kwargs):
+    """Build variants of a new image in the background once the save commits"""
+    replaced = instance.__dict__.pop('_replaced_image', None)
+    name = instance.image.name or ''
+    instance._saved_image = name
+    if raw or replaced is None:
+        return
+    old_name, old_variants = replaced
+    course_id = instance.pk
+    if not created:
+        # image_variants is left out of full saves, so clear it explicitly
+        Course.objects.filter(pk=course_id).update(image_variants={})
+
+    def after_commit():
+        if name:
+            schedule_course_variants(course_id, name)
+        if old_name:
+            remove_variants(old_variants, old_name)
+
+    transaction.on_commit(after_commit)
+
+
+@receiver(post_delete, sender=Course)
+def course_image_deleted(sender, instance, **kwargs):
+    """Remove the image variants once no remaining course uses the image"""
+    if instance.image and instance.image_variants:
+        name, variants = instance.image.name, instance.image_variants
+        transaction.on_commit(lambda: remove_variants(variants, name))
+
+
+@receiver(post_init, sender=Module)
+def remember_module_course(sender, instance, **kwargs):
+    # __dict__ so a deferred course_id is not fetched just to be remembered
+    instance._counted_course_id = instance.__dict__.get('course_id')
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def module_changed(sender, instance, **kwargs):
+    """Keep Course.module_count and assignment_count current and expire the outline"""
+    # A module moved to another course changes the counts and outline of both
+    course_ids = {instance.course_id, getattr(instance, '_counted_course_id', None)} - {None}
+    instance._counted_course_id = instance.course_id
+    recount_courses(course_ids, fields=('module_count', 'assignment_count'))
+    for course_id in course_ids:
+        _bump_outline_on_commit(course_id)
+
+
+@receiver(post_save, sender=Content)
+@receiver(post_delete, sender=Content)
+def content_changed(sender, instance, **kwargs):
+    """Expire the outline of the content's course"""
+    _bump_outline_on_commit(_course_id_for_module(instance.module_id))
+
+
+def _assignment_state(assignment):
+    return (assignment.module_id, assignment.due_date, assignment.points)
+
+
+ROLLUP_STATE_FIELDS = {
+    Submission: ({'assignment_id', 'score', 'submitted_at'}, submission_state),
+    Assignment: ({'module_id', 'due_date', 'points'}, _assignment_state),
+}
+
+
+@receiver(post_init, sender=Submission)
+@receiver(post_init, sender=Assignment)
+def remember_rollup_state(sender, instance, **kwargs):
+    """Record the loaded values the rollups depend on, to diff against on save"""
+    fields, state = ROLLUP_STATE_FIELDS[sender]
+    if instance.pk is None:
+        instance._rollup_state = None
+    elif not fields & instance.get_deferred_fields():
+        instance._rollup_state = state(instance)
+
+
+@receiver(pre_save, sender=Submission)
+@receiver(pre_save, sender=Assignment)
+def load_rollup_state(sender, instance, raw=False, **kwargs):
+    """Fetch the stored values for instances loaded with those fields deferred"""
+    if raw or hasattr(instance, '_rollup_state'):
+        return
+    stored = sender.objects.filter(pk=instance.pk).first() if instance.pk is not None else None
+    instance._rollup_state = stored._rollup_state if stored is not None else None
+
+
+@receiver(post_save, sender=Submission)
+def submission_saved(sender, instance, raw=False, **kwargs):
+    """Fold the change into the assignment, module and course rollups"""
+    if raw:
+        return
+    new_state = submission_state(instance)
+    submission_changed(getattr(instance, '_rollup_state', None), new_state)
+    instance._rollup_state = new_state
+
+
+_UNKNOWN_TEXT = object()
+
+
+@receiver(post_init, sender=Submission)
+def remember_submission_text(sender, instance, **kwargs):
+    """Keep the loaded text so saves that do not touch it skip re-shingling"""
+    if instance.pk is not None and 'text' not in instance.get_deferred_fields():
+        instance._indexed_text = instance.text
+
+
+@receiver(post_save, sender=Submission)
+def submission_text_saved(sender, instance, created, raw=False, **kwargs):
+    """Refresh the submission's MinHash signature and LSH buckets when its text changes"""
+    if raw or (not created and getattr(instance, '_indexed_text', _UNKNOWN_TEXT) == instance.text):
+        return
+    index_submissions([instance])
+    instance._indexed_text = instance.text
+
+
+@receiver(post_delete, sender=Submission)
+def submission_deleted(sender, instance, **kwargs):
+    """Take the deleted submission out of the rollups"""
+    old_state = getattr(instance, '_rollup_state', None) or submission_state(instance)
+    submission_changed(old_state, None)
+    instance._rollup_state = None
+
+
+@receiver(post_init, sender=Assignment)
+def remember_assignment_module(sender, instance, **kwargs):
+    instance._counted_module_id = instance.__dict__.get('module_id')
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+def assignment_changed(sender, instance, **kwargs):
+    """Keep Course.assignment_count current and expire the outline"""
+    # An assignment moved to another module may also have changed course
+    module_ids = {instance.module_id, getattr(instance, '_counted_module_id', None)} - {None}
+    instance._counted_module_id = instance.module_id
+    course_ids = set(Module.objects.filter(pk__in=module_ids).values_list('course_id', flat=True))
+    if not course_ids:
+        return
+    recount_courses(course_ids, fields=('assignment_count',))
+    for course_id in course_ids:
+        _bump_outline_on_commit(course_id)
+
+
+@receiver(post_save, sender=Assignment)
+def assignment_rollup_changed(sender, instance, created, raw=False, **kwargs):
+    """Recompute the assignment's rollup when its lateness, points or module change"""
+    old_state = getattr(instance, '_rollup_state', None)
+    new_state = _assignment_state(instance)
+    instance._rollup_state = new_state
+    if raw or created or old_state is None or old_state == new_state:
+        return
+    old_module_id = old_state[0] if old_state[0] != instance.module_id else None
+    refresh_assignment(instance.pk, old_module_id)
@@ -0,0 +1,184 @@
+"""
+Near-duplicate detection for submission text.
+
+Each submission's text is reduced to its set of word 5-shingles and then to
+a 128-value MinHash signature (multiply-shift hashing over 32-bit shingle
+hashes, vectorized with NumPy), stored in SubmissionSignature. The signature
+is cut into 32 bands of 4 values; each band is hashed into a
+SimilarityBucket row. Two submissions become candidates only if they share
+a bucket in some band, which happens with high probability above roughly
+50% Jaccard similarity and almost never for unrelated text, so finding
+copies in an assignment is one indexed scan of its buckets instead of a
+comparison of every pair. Candidates are then confirmed by comparing
+signatures, whose agreement rate estimates the Jaccard similarity.
+
+A bucket shared by more than SUBMISSION_SIMILARITY_MAX_BUCKET_SIZE
+submissions is not expanded into pairs, since that grows quadratically.
+It is reported as a crowded group instead. Such a group is either shared
+boilerplate (e.g. a pasted prompt) or mass copying, and an instructor has
+to look at it to tell which.
+"""
+import hashlib
+import re
+from itertools import combinations, groupby
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .models import SimilarityBucket, Submission, SubmissionSignature
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+INDEX_BATCH_SIZE = 500
+
+WORD_RE = re.compile(r'\w+')
+
+# Fixed seed: signatures must be comparable across processes and releases
+_rng = np.random.default_rng(0x5EED)
+_MULTIPLIERS = _rng.integers(1, 2 ** 63, size=NUM_PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_OFFSETS = _rng.integers(0, 2 ** 63, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def similarity_threshold():
+    return getattr(settings, 'SUBMISSION_SIMILARITY_THRESHOLD', 0.5)
+
+
+def max_bucket_size():
+    return getattr(settings, 'SUBMISSION_SIMILARITY_MAX_BUCKET_SIZE', 100)
+
+
+def shingles(text):
+    """Return the set of overlapping SHINGLE_SIZE-word sequences in text"""
+    words = WORD_RE.findall((text or '').lower())
+    if len(words) <= SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set):
+    """Return the MinHash signature of a non-empty shingle set as a uint32 array"""
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=4).digest(), 'little')
+         for shingle in shingle_set),
+        dtype=np.uint64, count=len(shingle_set),
+    )
+    # Multiply-shift: (a * x + b) mod 2**64, keeping the high 32 bits
+    values = (np.outer(_MULTIPLIERS, hashes) + _OFFSETS[:, None]) >> np.uint64(32)
+    return values.min(axis=1).astype(np.uint32)
+
+
+def band_buckets(signature):
+    """Yield (band, bucket) pairs for a signature"""
+    for band, rows in enumerate(signature.reshape(BANDS, ROWS_PER_BAND)):
+        digest = hashlib.blake2b(rows.tobytes(), digest_size=8).digest()
+        yield band, int.from_bytes(digest, 'little', signed=True)
+
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity: the fraction of MinHash values that agree"""
+    return float(np.count_nonzero(signature_a == signature_b)) / NUM_PERMUTATIONS
+
+
+def _load_signature(data):
+    return np.frombuffer(bytes(data), dtype=np.uint32)
+
+
+def _index_rows(submissions):
+    signatures = []
+    buckets = []
+    for submission in submissions:
+        shingle_set = shingles(submission.text)
+        if not shingle_set:
+            continue
+        signature = minhash(shingle_set)
+        signatures.append(SubmissionSignature(
+            submission_id=submission.pk, assignment_id=submission.assignment_id,
+            minhash=signature.tobytes(), shingle_count=len(shingle_set),
+        ))
+        buckets += [
+            SimilarityBucket(assignment_id=submission.assignment_id, band=band, bucket=bucket, submission_id=submission.pk)
+            for band, bucket in band_buckets(signature)
+        ]
+    return signatures, buckets
+
+
+@transaction.atomic
+def index_submissions(submissions):
+    """(Re)index the text of the given submissions; returns how many have a signature"""
+    submissions = list(submissions)
+    ids = [submission.pk for submission in submissions]
+    signatures, buckets = _index_rows(submissions)
+    SimilarityBucket.objects.filter(submission_id__in=ids).delete()
+    SubmissionSignature.objects.filter(submission_id__in=ids).delete()
+    SubmissionSignature.objects.bulk_create(signatures)
+    SimilarityBucket.objects.bulk_create(buckets, batch_size=2000)
+    return len(signatures)
+
+
+def index_assignment_submissions(assignment_ids=None):
+    """Rebuild the index for every submission (of the given assignments); returns the count indexed"""
+    submissions = Submission.objects.only('id', 'assignment_id', 'text').order_by('pk')
+    if assignment_ids is not None:
+        submissions = submissions.filter(assignment_id__in=assignment_ids)
+    total = 0
+    batch = []
+    for submission in submissions.iterator(chunk_size=INDEX_BATCH_SIZE):
+        batch.append(submission)
+        if len(batch) >= INDEX_BATCH_SIZE:
+            total += index_submissions(batch)
+            batch = []
+    if batch:
+        total += index_submissions(batch)
+    return total
+
+
+def candidate_pairs(assignment_id):
+    """
+    Return (pairs, crowded): the set of (submission_id, submission_id) pairs
+    sharing at least one LSH bucket, and the set of sorted submission-ID
+    tuples of buckets too large to expand into pairs.
+    """
+    limit = max_bucket_size()
+    rows = (
+        SimilarityBucket.objects.filter(assignment_id=assignment_id)
+        .order_by('band', 'bucket')
+        .values_list('band', 'bucket', 'submission_id')
+    )
+    pairs = set()
+    crowded = set()
+    for _, members in groupby(rows.iterator(chunk_size=5000), key=lambda row: row[:2]):
+        submission_ids = tuple(sorted({row[2] for row in members}))
+        if len(submission_ids) > limit:
+            crowded.add(submission_ids)
+        elif len(submission_ids) > 1:
+            pairs.update(combinations(submission_ids, 2))
+    return pairs, crowded
+
+
+def flagged_pairs(assignment_id, threshold=None):
+    """
+    Return (flagged, crowded) for an assignment: flagged is
+    [(submission_id, submission_id, estimated Jaccard)] for likely copies,
+    most similar first, and crowded lists the submission-ID tuples of
+    buckets too large to compare pairwise, largest first.
+    """
+    threshold = similarity_threshold() if threshold is None else threshold
+    pairs, crowded = candidate_pairs(assignment_id)
+    crowded = sorted(crowded, key=lambda group: (-len(group), group))
+    if not pairs:
+        return [], crowded
+    involved = {submission_id for pair in pairs for submission_id in pair}
+    signatures = {
+        submission_id: _load_signature(data) for submission_id, data in
+        SubmissionSignature.objects.filter(submission_id__in=involved).values_list('submission_id', 'minhash')
+    }
+    flagged = []
+    for first, second in pairs:
+        similarity = estimate_similarity(signatures[first], signatures[second])
+        if similarity >= threshold:
+            flagged.append((first, second, similarity))
+    flagged.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+    return flagged, crowded
@@ -0,0 +1,217 @@
+"""
+Content-addressed storage for course content and submission files.
+
+Every saved file is hashed (SHA-256) and its bytes are kept once, as a blob
+under ``blobs/ab/cd/<digest>``. The logical name Django stores in the
+database (``submissions/report.pdf``, ``content_files/syllabus.pdf``) is a
+hard link to that blob, so URLs, ``.path`` and ``.open()`` behave exactly as
+with FileSystemStorage while identical uploads share one inode on disk.
+
+A blob's link count doubles as its reference count: deleting a logical file
+only drops one link, and a blob whose link count is back to 1 is referenced
+by nothing but the blob store itself. ``manage.py gc_blobs`` removes those
+blobs, along with logical files no database row points to.
+
+The digest is computed while the upload streams: the upload handlers below
+hash each chunk as Django writes it, and chunked uploads carry the digest
+computed during assembly, so a duplicate is detected without reading the
+file a second time and is never written to the blob store at all.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.utils.deconstruct import deconstructible
+
+HASH_BLOCK_SIZE = 64 * 1024
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that deduplicates file contents by SHA-256"""
+
+    def __init__(self, *args, blob_dir='blobs', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.blob_dir = blob_dir
+
+    def blob_name(self, digest):
+        return f"{self.blob_dir}/{digest[:2]}/{digest[2:4]}/{digest}"
+
+    def blob_path(self, digest):
+        return self.path(self.blob_name(digest))
+
+    def _makedirs(self, directory):
+        try:
+            if self.directory_permissions_mode is not None:
+                old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+                try:
+                    os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+                finally:
+                    os.umask(old_umask)
+            else:
+                os.makedirs(directory, exist_ok=True)
+        except FileExistsError:
+            raise FileExistsError("%s exists and is not a directory." % directory)
+
+    def _stage(self, content):
+        """Copy content into a temporary file in the blob store, hashing as it is written"""
+        staging = self.path(f"{self.blob_dir}/tmp")
+        self._makedirs(staging)
+        fd, path = tempfile.mkstemp(dir=staging)
+        hasher = hashlib.sha256()
+        try:
+            with os.fdopen(fd, 'wb') as staged:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    hasher.update(chunk)
+                    staged.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return hasher.hexdigest(), path
+
+    def _store_blob(self, digest, source_path, owned):
+        blob_path = self.blob_path(digest)
+        self._makedirs(os.path.dirname(blob_path))
+        if owned:
+            # Same filesystem, so this is an atomic rename; a concurrent
+            # writer of the same digest just replaces identical bytes.
+            os.replace(source_path, blob_path)
+        else:
+            file_move_safe(source_path, blob_path, allow_overwrite=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(blob_path, self.file_permissions_mode)
+
+    def _link(self, digest, name, source):
+        """
+        Hard-link the blob for ``digest`` to ``name``, creating the blob from
+        ``source()`` -> (path, owned) only if it does not exist yet. Returns
+        the full path of the logical file.
+        """
+        full_path = self.path(name)
+        self._makedirs(os.path.dirname(full_path))
+        blob_path = self.blob_path(digest)
+        staged = None
+
+        try:
+            while True:
+                try:
+                    os.link(blob_path, full_path)
+                except FileNotFoundError:
+                    # First copy of these bytes (or the blob was just
+                    # collected): move the content into the blob store.
+                    staged = staged or source()
+                    self._store_blob(digest, *staged)
+                    staged = None
+                except FileExistsError:
+                    name = self.get_available_name(name)
+                    full_path = self.path(name)
+                except OSError:
+                    # Hard links unsupported (e.g. across devices): fall back
+                    # to an independent copy, which the collector leaves alone.
+                    shutil.copyfile(staged[0] if staged else blob_path, full_path)
+                    break
+                else:
+                    break
+        finally:
+            if staged and staged[1] and os.path.exists(staged[0]):
+                os.remove(staged[0])
+        return full_path
+
+    def _save(self, name, content):
+        digest = getattr(content, 'sha256', None)
+        staged = None
+        if hasattr(content, 'temporary_file_path'):
+            path = content.temporary_file_path()
+            digest = digest or file_digest(path)
+            source = lambda: (path, False)
+        elif digest is None:
+            digest, staged = self._stage(content)
+            source = lambda: (staged, True)
+        else:
+            # Digest computed during the upload: the bytes are only written
+            # out if this is the first copy of them.
+            source = lambda: (self._stage(content)[1], True)
+
+        try:
+            full_path = self._link(digest, name, source)
+        finally:
+            if staged and os.path.exists(staged):
+                os.remove(staged)
+
+        name = os.path.relpath(full_path, self.location)
+        self._ensure_location_group_id(full_path)
+        return str(name).replace('\\', '/')
+
+    def is_shared(self, name):
+        """Return True if the stored file is a hard link into the blob store"""
+        return os.stat(self.path(name)).st_nlink > 1
+
+    def adopt(self, name):
+        """
+        Move an existing plain file into the blob store and replace it with a
+        hard link, freeing its space if the same bytes are already stored.
+        Returns the file's digest.
+        """
+        full_path = self.path(name)
+        digest = file_digest(full_path)
+        blob_path = self.blob_path(digest)
+        if not os.path.exists(blob_path):
+            self._makedirs(os.path.dirname(blob_path))
+            os.link(full_path, blob_path)
+        else:
+            temp_path = f"{full_path}.{digest[:8]}.tmp"
+            os.link(blob_path, temp_path)
+            os.replace(temp_path, full_path)
+        return digest
+
+    def iter_blobs(self):
+        """Yield (digest, path) for every blob in the store"""
+        root = self.path(self.blob_dir)
+        for directory, dirnames, filenames in os.walk(root):
+            if directory == root:
+                dirnames[:] = [d for d in dirnames if d != 'tmp']
+            for filename in filenames:
+                yield filename, os.path.join(directory, filename)
+
+
+content_storage = ContentAddressedStorage()
+
+
+def file_digest(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(HASH_BLOCK_SIZE), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+class _HashingUploadHandlerMixin:
+    """Hash each chunk as it streams in and attach the digest to the uploaded file"""
+
+    def new_file(self, *args, **kwargs):
+        self._sha256 = hashlib.sha256()
+        return super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        if uploaded is not None:
+            uploaded.sha256 = self._sha256.hexdigest()
+        return uploaded
+
+
+class HashingMemoryFileUploadHandler(_HashingUploadHandlerMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(_HashingUploadHandlerMixin, TemporaryFileUploadHandler):
+    pass
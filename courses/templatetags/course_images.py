@@ -0,0 +1,37 @@
+from django import template
+from django.utils.html import format_html
+
+from courses.images import pick_variant
+
+register = template.Library()
+
+
+def _srcset(storage, by_width):
+    return ', '.join(f"{storage.url(name)} {width}w" for width, name in sorted(by_width.items(), key=lambda item: int(item[0])))
+
+
+@register.simple_tag
+def course_picture(course, width=640, css_class='', sizes=None):
+    """
+    Render a course image as a <picture> with WebP and JPEG srcsets of its
+    resized variants, falling back to the original until they are built.
+    """
+    if not course.image:
+        return ''
+    variants = course.image_variants or {}
+    storage = course.image.storage
+    if not variants.get('jpeg'):
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" loading="lazy" decoding="async">',
+            course.image.url, css_class, course.title,
+        )
+    sizes = sizes or f"(max-width: {width}px) 100vw, {width}px"
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" class="{}" alt="{}" loading="lazy" decoding="async">'
+        '</picture>',
+        _srcset(storage, variants.get('webp', {})), sizes,
+        storage.url(pick_variant(variants, 'jpeg', width)), _srcset(storage, variants['jpeg']), sizes,
+        css_class, course.title,
+    )
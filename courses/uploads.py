@@ -0,0 +1,204 @@
+"""
+Resumable chunked uploads.
+
+Protocol (all endpoints live in ``courses.views``):
+
+1. ``POST uploads/`` creates an UploadSession and returns its chunk size.
+2. ``PUT uploads/<id>/chunks/<n>/`` sends chunk ``n`` as the raw request body
+   with its SHA-256 in the ``X-Chunk-Checksum`` header. Chunks may arrive in
+   any order, in parallel, and may be re-sent.
+3. ``GET uploads/<id>/`` lists the chunks already received, so a client can
+   resume after a dropped connection.
+4. ``POST uploads/<id>/complete/`` assembles the chunks and attaches the file
+   to the Submission or Content row.
+
+Each chunk is streamed from the request to its own part file in small blocks
+and renamed into place only once its checksum matches, so a worker never
+holds more than one block in memory and a half-written chunk is never seen
+as received.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .access import get_course_access
+from .models import Submission, UploadSession
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Raised when a chunk or a completed upload fails validation"""
+
+
+class UploadDenied(UploadError):
+    """Raised when the uploader may no longer attach the file to its target"""
+
+
+class AssembledUpload(File):
+    """
+    An assembled upload on local disk. Exposing temporary_file_path lets
+    FileSystemStorage move the file into place instead of copying it.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def staging_dir(session):
+    return os.path.join(settings.CHUNKED_UPLOAD_DIR, str(session.pk))
+
+
+def _chunk_path(session, index):
+    return os.path.join(staging_dir(session), f'{index:06d}.part')
+
+
+def received_chunks(session):
+    """Return the sorted indexes of chunks that have been stored"""
+    try:
+        names = os.listdir(staging_dir(session))
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[:-5]) for name in names if name.endswith('.part'))
+
+
+def write_chunk(session, index, stream, checksum):
+    """
+    Stream one chunk from a file-like object into the staging area.
+    Returns the chunk's SHA-256 hex digest.
+    """
+    if not 0 <= index < session.chunk_count:
+        raise UploadError(f"Chunk index {index} is out of range.")
+    if not checksum:
+        raise UploadError("A SHA-256 checksum is required for every chunk.")
+
+    expected = session.expected_chunk_size(index)
+    directory = staging_dir(session)
+    os.makedirs(directory, exist_ok=True)
+
+    digest = hashlib.sha256()
+    written = 0
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as part:
+            while True:
+                block = stream.read(min(READ_BLOCK_SIZE, expected - written + 1))
+                if not block:
+                    break
+                written += len(block)
+                if written > expected:
+                    raise UploadError(f"Chunk {index} is larger than {expected} bytes.")
+                digest.update(block)
+                part.write(block)
+
+        if written != expected:
+            raise UploadError(f"Chunk {index} has {written} bytes, expected {expected}.")
+        if digest.hexdigest() != checksum.lower():
+            raise UploadError(f"Checksum mismatch for chunk {index}.")
+
+        os.replace(temp_path, _chunk_path(session, index))
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return digest.hexdigest()
+
+
+def assemble(session):
+    """Concatenate all chunks into one staged file and return (path, sha256)"""
+    missing = set(range(session.chunk_count)) - set(received_chunks(session))
+    if missing:
+        raise UploadError(f"{len(missing)} chunk(s) have not been uploaded yet.")
+
+    # A file per call, so concurrent completes of one session never share it
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(dir=staging_dir(session), suffix='.assembled', delete=False) as assembled:
+        path = assembled.name
+        for index in range(session.chunk_count):
+            with open(_chunk_path(session, index), 'rb') as part:
+                while True:
+                    block = part.read(READ_BLOCK_SIZE)
+                    if not block:
+                        break
+                    digest.update(block)
+                    assembled.write(block)
+
+    if session.checksum and digest.hexdigest() != session.checksum.lower():
+        os.remove(path)
+        raise UploadError("Checksum mismatch for the assembled file.")
+    return path, digest.hexdigest()
+
+
+def complete_upload(session, text=None):
+    """
+    Assemble a session's chunks, attach the file to its target row and
+    discard the staging area. Returns the Submission or Content updated.
+
+    The permission checks made when the session was opened are repeated
+    here with the rows locked, since the submission may have been graded or
+    the enrollment dropped while the chunks were uploading.
+    """
+    path, digest = assemble(session)
+
+    try:
+        with transaction.atomic(), open(path, 'rb') as handle:
+            if not UploadSession.objects.select_for_update().filter(pk=session.pk, status='active').exists():
+                raise UploadError("This upload has already been completed.")
+
+            upload = AssembledUpload(handle, name=session.filename)
+            # Lets content-addressed storage skip rehashing the assembled file
+            upload.sha256 = digest
+            if session.target == 'submission':
+                target = _lock_submission(session)
+                if text is not None:
+                    target.text = text
+                target.file.save(session.filename, upload, save=False)
+                target.save()
+            else:
+                target = session.content
+                access = get_course_access(session.user, target.module.course)
+                if not (access.is_instructor or access.is_staff):
+                    raise UploadDenied("Only the course instructor can upload content files.")
+                target.content_file.save(session.filename, upload, save=True)
+
+            session.status = 'complete'
+            session.save(update_fields=['status', 'updated_at'])
+    finally:
+        # Storage usually moves the file into place; remove it if not
+        if os.path.exists(path):
+            os.remove(path)
+
+    discard_staging(session)
+    return target
+
+
+def _lock_submission(session):
+    """Return the session user's submission to its assignment, locked, if they may still submit"""
+    access = get_course_access(session.user, session.assignment.module.course)
+    if not access.is_enrolled or access.is_instructor:
+        raise UploadDenied("You cannot submit to this assignment.")
+
+    target = (
+        Submission.objects.select_for_update()
+        .filter(assignment=session.assignment, student=session.user)
+        .first()
+    )
+    if target is None:
+        return Submission(assignment=session.assignment, student=session.user)
+    if target.status != 'returned':
+        raise UploadDenied("This assignment has already been submitted.")
+    target.submitted_at = timezone.now()
+    target.status = 'submitted'
+    return target
+
+
+def discard_staging(session):
+    """Remove a session's staged chunks"""
+    shutil.rmtree(staging_dir(session), ignore_errors=True)
@@ -3,9 +3,23 @@ from . import views
 
 urlpatterns = [
     path('', views.course_list, name='course_list'),
+    
+    # Resumable chunked uploads (before the slug patterns so 'uploads' is not taken as a course)
+    path('uploads/', views.upload_session_create, name='upload_session_create'),
+    path('uploads/<uuid:session_id>/', views.upload_session_detail, name='upload_session_detail'),
+    path('uploads/<uuid:session_id>/chunks/<int:index>/', views.upload_chunk, name='upload_chunk'),
+    path('uploads/<uuid:session_id>/complete/', views.upload_session_complete, name='upload_session_complete'),
+    
     path('<slug:slug>/', views.course_detail, name='course_detail'),
     path('<slug:slug>/enroll/', views.enroll_course, name='enroll_course'),
+    path('<slug:slug>/gradebook/', views.gradebook, name='gradebook'),
+    path('<slug:slug>/analytics/', views.course_analytics, name='course_analytics'),
     path('<slug:course_slug>/module/<int:module_id>/', views.module_detail, name='module_detail'),
     path('<slug:course_slug>/assignment/<int:assignment_id>/', views.assignment_detail, name='assignment_detail'),
+    path('<slug:course_slug>/assignment/<int:assignment_id>/export/', views.export_submissions, name='export_submissions'),
+    path('<slug:course_slug>/assignment/<int:assignment_id>/similarity/', views.similarity_report, name='similarity_report'),
     path('<slug:course_slug>/submission/<int:submission_id>/grade/', views.grade_submission, name='grade_submission'),
+    path('<slug:course_slug>/content/<int:content_id>/file/', views.content_file, name='content_file'),
+    path('<slug:course_slug>/content/<int:content_id>/complete/', views.content_complete, name='content_complete'),
+    path('<slug:course_slug>/submission/<int:submission_id>/file/', views.submission_file, name='submission_file'),
 ]
\ No newline at end of file
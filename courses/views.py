@@ -1,11 +1,25 @@
+import json
+
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponseForbidden
+from django.http import Http404, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods, require_POST, require_safe
 from django.utils import timezone
 from django.db.models import Q
-from .models import Course, Module, Content, Assignment, Submission
+from django.core.paginator import Paginator
+from .models import Course, Content, Assignment, Submission, UploadSession, AssignmentRollup, ModuleRollup, CourseRollup
 from .forms import AssignmentSubmissionForm
+from .access import get_course_access
+from .outline import get_course_outline
+from .progress import attach_module_progress, record_views, set_completed
+from .gradebook import Gradebook
+from .exports import export_filename, stream_submissions_zip
+from .serving import serve_file
+from .similarity import flagged_pairs, similarity_threshold
+from .uploads import UploadDenied, UploadError, complete_upload, discard_staging, received_chunks, write_chunk
 
 
 def course_list(request):
@@ -36,14 +50,23 @@ def course_detail(request, slug):
     course = get_object_or_404(Course, slug=slug, is_active=True)
     
     # Check if user is instructor or enrolled student
-    is_instructor = request.user == course.instructor
-    is_enrolled = request.user in course.students.all()
-    can_access = is_instructor or is_enrolled
+    access = get_course_access(request.user, course)
+    is_instructor = access.is_instructor
+    is_enrolled = access.is_enrolled
+    can_access = access.is_member
     
     # Get modules if user can access the course
     modules = None
     if can_access:
-        modules = course.modules.all().prefetch_related('contents', 'assignments')
+        modules = get_course_outline(course)
+        
+        # Attach the student's submission to each assignment for status badges
+        if is_enrolled:
+            assignments = [assignment for module in modules for assignment in module.assignments.all()]
+            user_submissions = Submission.for_student(request.user, assignments)
+            for assignment in assignments:
+                assignment.user_submission = user_submissions.get(assignment.id)
+            attach_module_progress(request.user, modules)
     
     # Check if course has an AI assistant
     has_assistant = False
@@ -69,11 +92,12 @@ def enroll_course(request, slug):
     """Enroll a student in a course"""
     course = get_object_or_404(Course, slug=slug, is_active=True)
     
-    if request.user == course.instructor:
+    access = get_course_access(request.user, course)
+    if access.is_instructor:
         messages.error(request, "You cannot enroll in your own course!")
         return redirect('course_detail', slug=slug)
     
-    if request.user in course.students.all():
+    if access.is_enrolled:
         messages.info(request, "You are already enrolled in this course.")
     else:
         course.students.add(request.user)
@@ -86,26 +110,37 @@ def enroll_course(request, slug):
 def module_detail(request, course_slug, module_id):
     """Display details of a specific module"""
     course = get_object_or_404(Course, slug=course_slug, is_active=True)
-    module = get_object_or_404(Module, id=module_id, course=course)
+    outline = get_course_outline(course)
+    module = outline.get_module(module_id)
+    if module is None:
+        raise Http404("No Module matches the given query.")
     
     # Check if user is instructor or enrolled student
-    if not (request.user == course.instructor or request.user in course.students.all()):
+    access = get_course_access(request.user, course)
+    if not access.is_member:
         return HttpResponseForbidden("You do not have access to this module.")
     
-    contents = module.contents.all().order_by('order')
+    # Contents and assignments are prefetched in the outline snapshot
+    contents = module.contents.all()
     assignments = module.assignments.all()
     
     # For each assignment, check if the current user has submitted
-    if request.user != course.instructor:
+    if not access.is_instructor:
+        user_submissions = Submission.for_student(request.user, assignments)
         for assignment in assignments:
-            assignment.user_submission = assignment.submissions.filter(student=request.user).first()
+            assignment.user_submission = user_submissions.get(assignment.id)
+    if access.is_enrolled:
+        record_views(request.user, contents)
+        attach_module_progress(request.user, outline)
     
     context = {
         'course': course,
         'module': module,
+        'modules': outline,
         'contents': contents,
         'assignments': assignments,
-        'is_instructor': request.user == course.instructor,
+        'is_instructor': access.is_instructor,
+        'is_enrolled': access.is_enrolled,
     }
     
     return render(request, 'courses/module_detail.html', context)
@@ -118,14 +153,15 @@ def assignment_detail(request, course_slug, assignment_id):
     assignment = get_object_or_404(Assignment, id=assignment_id, module__course=course)
     
     # Check if user is instructor or enrolled student
-    if not (request.user == course.instructor or request.user in course.students.all()):
+    access = get_course_access(request.user, course)
+    if not access.is_member:
         return HttpResponseForbidden("You do not have access to this assignment.")
     
     # Handle assignment submission (students only)
     submission = None
     form = None
     
-    if request.user != course.instructor:
+    if not access.is_instructor:
         submission = Submission.objects.filter(assignment=assignment, student=request.user).first()
         
         if request.method == 'POST' and (not submission or submission.status == 'returned'):
@@ -171,6 +207,100 @@ def assignment_detail(request, course_slug, assignment_id):
     return render(request, 'courses/assignment_detail.html', context)
 
 
+@login_required
+def export_submissions(request, course_slug, assignment_id):
+    """Stream a ZIP of all submissions for an assignment to the instructor"""
+    course = get_object_or_404(Course, slug=course_slug, is_active=True)
+    assignment = get_object_or_404(Assignment.objects.select_related('module__course'), id=assignment_id, module__course=course)
+    
+    if not get_course_access(request.user, course).is_instructor:
+        return HttpResponseForbidden("Only the course instructor can export submissions.")
+    
+    response = StreamingHttpResponse(stream_submissions_zip(assignment), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(assignment)}"'
+    return response
+
+
+@login_required
+def similarity_report(request, course_slug, assignment_id):
+    """List pairs of submissions whose text is suspiciously similar"""
+    course = get_object_or_404(Course, slug=course_slug, is_active=True)
+    assignment = get_object_or_404(Assignment.objects.select_related('module'), id=assignment_id, module__course=course)
+    
+    if not get_course_access(request.user, course).is_instructor:
+        return HttpResponseForbidden("Only the course instructor can view the similarity report.")
+    
+    flagged, crowded = flagged_pairs(assignment.pk)
+    submission_ids = {submission_id for first, second, _ in flagged for submission_id in (first, second)}
+    submission_ids.update(submission_id for group in crowded for submission_id in group)
+    submissions = Submission.objects.select_related('student').in_bulk(submission_ids)
+    pairs = [
+        {'first': submissions[first], 'second': submissions[second], 'similarity': similarity * 100}
+        for first, second, similarity in flagged
+    ]
+    crowded_groups = [[submissions[submission_id] for submission_id in group] for group in crowded]
+    
+    context = {
+        'course': course,
+        'assignment': assignment,
+        'pairs': pairs,
+        'crowded_groups': crowded_groups,
+        'threshold': similarity_threshold() * 100,
+    }
+    
+    return render(request, 'courses/similarity_report.html', context)
+
+
+@login_required
+@require_safe
+def content_file(request, course_slug, content_id):
+    """Serve a content file to course members"""
+    course = get_object_or_404(Course, slug=course_slug, is_active=True)
+    content = get_object_or_404(Content, id=content_id, module__course=course)
+    
+    access = get_course_access(request.user, course)
+    if not access.is_member:
+        return HttpResponseForbidden("You do not have access to this file.")
+    if not content.content_file:
+        raise Http404("This content has no file.")
+    
+    if access.is_enrolled:
+        record_views(request.user, [content])
+    return serve_file(request, content.content_file)
+
+
+@login_required
+@require_POST
+def content_complete(request, course_slug, content_id):
+    """Mark a content item complete (or, with completed=0, not complete) for the student"""
+    course = get_object_or_404(Course, slug=course_slug, is_active=True)
+    content = get_object_or_404(Content, id=content_id, module__course=course)
+    
+    if not get_course_access(request.user, course).is_enrolled:
+        return HttpResponseForbidden("Only enrolled students can track their progress.")
+    
+    set_completed(request.user, content, completed=request.POST.get('completed', '1') != '0')
+    url = reverse('module_detail', kwargs={'course_slug': course_slug, 'module_id': content.module_id})
+    return redirect(f"{url}#content-{content.pk}")
+
+
+@login_required
+@require_safe
+def submission_file(request, course_slug, submission_id):
+    """Serve a submission file to its student and the course instructor"""
+    course = get_object_or_404(Course, slug=course_slug, is_active=True)
+    submission = get_object_or_404(Submission, id=submission_id, assignment__module__course=course)
+    
+    access = get_course_access(request.user, course)
+    if submission.student_id != request.user.id and not (access.is_instructor or access.is_staff):
+        return HttpResponseForbidden("You do not have access to this file.")
+    if not submission.file:
+        raise Http404("This submission has no file.")
+    
+    # Student uploads are always downloaded, never rendered on our origin
+    return serve_file(request, submission.file, as_attachment=True)
+
+
 @login_required
 def grade_submission(request, course_slug, submission_id):
     """Allow instructors to grade student submissions"""
@@ -178,7 +308,7 @@ def grade_submission(request, course_slug, submission_id):
     submission = get_object_or_404(Submission, id=submission_id, assignment__module__course=course)
     
     # Only the course instructor can grade submissions
-    if request.user != course.instructor:
+    if not get_course_access(request.user, course).is_instructor:
         return HttpResponseForbidden("You do not have permission to grade this submission.")
     
     if request.method == 'POST':
@@ -202,4 +332,198 @@ def grade_submission(request, course_slug, submission_id):
         'submission': submission,
     }
     
-    return render(request, 'courses/grade_submission.html', context)
\ No newline at end of file
+    return render(request, 'courses/grade_submission.html', context)
+
+
+@login_required
+def gradebook(request, slug):
+    """Course-wide gradebook with per-assignment statistics for instructors"""
+    course = get_object_or_404(Course, slug=slug, is_active=True)
+    
+    if not get_course_access(request.user, course).is_instructor:
+        return HttpResponseForbidden("Only the course instructor can view the gradebook.")
+    
+    book = Gradebook(course)
+    
+    # Statistics cover every student; only one page of rows is rendered
+    paginator = Paginator(range(len(book.students)), 50)
+    page = paginator.get_page(request.GET.get('page'))
+    rows = book.student_rows(page.start_index() - 1, page.end_index()) if book.students else []
+    
+    context = {
+        'course': course,
+        'assignments': book.assignments,
+        'assignment_stats': book.assignment_stats(),
+        'rows': rows,
+        'page': page,
+        'student_total': len(book.students),
+    }
+    
+    return render(request, 'courses/gradebook.html', context)
+
+
+@login_required
+def course_analytics(request, slug):
+    """Submission rates, average scores and late percentages from the precomputed rollups"""
+    course = get_object_or_404(Course, slug=slug, is_active=True)
+    
+    if not get_course_access(request.user, course).is_instructor:
+        return HttpResponseForbidden("Only the course instructor can view course analytics.")
+    
+    students = course.student_count
+    course_rollup = CourseRollup.objects.filter(course=course).first() or CourseRollup(course=course)
+    modules = list(course.modules.select_related('rollup').order_by('order', 'pk'))
+    assignments = list(
+        Assignment.objects.filter(module__course=course)
+        .select_related('rollup')
+        .order_by('due_date', 'pk')
+    )
+    
+    # Rollups are created on the first submission; anything without one is all zeros
+    assignments_by_module = {}
+    for assignment in assignments:
+        assignment.stats = getattr(assignment, 'rollup', None) or AssignmentRollup(assignment=assignment)
+        assignment.submission_rate = assignment.stats.submission_rate(students)
+        assignments_by_module.setdefault(assignment.module_id, []).append(assignment)
+    for module in modules:
+        module.stats = getattr(module, 'rollup', None) or ModuleRollup(module=module)
+        module.submission_rate = module.stats.submission_rate(students * len(assignments_by_module.get(module.pk, [])))
+    
+    context = {
+        'course': course,
+        'course_stats': course_rollup,
+        'course_submission_rate': course_rollup.submission_rate(students * len(assignments)),
+        'modules': modules,
+        'assignments': assignments,
+        'student_total': students,
+    }
+    
+    return render(request, 'courses/course_analytics.html', context)
+
+
+def _upload_error(message, status=400):
+    return JsonResponse({'status': 'error', 'message': message}, status=status)
+
+
+def _upload_session_state(session):
+    return {
+        'status': 'success',
+        'id': str(session.id),
+        'chunk_size': session.chunk_size,
+        'chunk_count': session.chunk_count,
+        'received': received_chunks(session),
+        'complete': session.status == 'complete',
+    }
+
+
+@login_required
+@require_POST
+def upload_session_create(request):
+    """Start a resumable chunked upload for a submission or content file"""
+    try:
+        data = json.loads(request.body)
+        target = data['target']
+        object_id = int(data['object_id'])
+        filename = str(data['filename'])[:255]
+        size = int(data['size'])
+    except (ValueError, KeyError, TypeError):
+        return _upload_error("Invalid upload request.")
+    
+    if not filename or size < 0 or size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        return _upload_error("Invalid file name or size.")
+    
+    session = UploadSession(user=request.user, target=target, filename=filename, size=size,
+                            chunk_size=settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+                            checksum=str(data.get('checksum') or '')[:64])
+    
+    if target == 'submission':
+        assignment = get_object_or_404(Assignment.objects.select_related('module__course'), id=object_id)
+        access = get_course_access(request.user, assignment.module.course)
+        if not access.is_enrolled or access.is_instructor:
+            return _upload_error("You cannot submit to this assignment.", status=403)
+        submission = Submission.objects.filter(assignment=assignment, student=request.user).first()
+        if submission and submission.status != 'returned':
+            return _upload_error("This assignment has already been submitted.", status=403)
+        session.assignment = assignment
+    elif target == 'content':
+        content = get_object_or_404(Content.objects.select_related('module__course'), id=object_id)
+        access = get_course_access(request.user, content.module.course)
+        if not (access.is_instructor or access.is_staff):
+            return _upload_error("Only the course instructor can upload content files.", status=403)
+        session.content = content
+    else:
+        return _upload_error("Unknown upload target.")
+    
+    session.save()
+    return JsonResponse(_upload_session_state(session), status=201)
+
+
+@login_required
+@require_http_methods(['GET', 'DELETE'])
+def upload_session_detail(request, session_id):
+    """Report received chunks so a client can resume, or abort the upload"""
+    session = get_object_or_404(UploadSession, id=session_id, user=request.user)
+    
+    if request.method == 'DELETE':
+        discard_staging(session)
+        session.delete()
+        return JsonResponse({'status': 'success', 'message': 'Upload aborted'})
+    
+    return JsonResponse(_upload_session_state(session))
+
+
+@login_required
+@require_http_methods(['PUT'])
+def upload_chunk(request, session_id, index):
+    """Store one chunk, streamed from the raw request body"""
+    session = get_object_or_404(UploadSession, id=session_id, user=request.user, status='active')
+    
+    try:
+        digest = write_chunk(session, index, request, request.headers.get('X-Chunk-Checksum', ''))
+    except UploadError as e:
+        return _upload_error(str(e))
+    
+    return JsonResponse({'status': 'success', 'index': index, 'checksum': digest})
+
+
+@login_required
+@require_POST
+def upload_session_complete(request, session_id):
+    """Assemble the uploaded chunks and attach the file to its submission or content"""
+    session = get_object_or_404(
+        UploadSession.objects.select_related('assignment__module__course', 'content__module__course'),
+        id=session_id, user=request.user, status='active'
+    )
+    
+    text = None
+    if session.target == 'submission' and request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or '{}')
+        except ValueError:
+            return _upload_error("Invalid JSON body.")
+        if not isinstance(data, dict):
+            return _upload_error("The JSON body must be an object.")
+        text = data.get('text')
+        if text is not None and not isinstance(text, str):
+            return _upload_error("text must be a string.")
+    
+    try:
+        target = complete_upload(session, text=text)
+    except UploadDenied as e:
+        return _upload_error(str(e), status=403)
+    except UploadError as e:
+        return _upload_error(str(e))
+    
+    if session.target == 'submission':
+        messages.success(request, "Your assignment has been submitted successfully.")
+        redirect_url = reverse('assignment_detail', kwargs={
+            'course_slug': session.assignment.module.course.slug,
+            'assignment_id': session.assignment.id,
+        })
+    else:
+        redirect_url = reverse('module_detail', kwargs={
+            'course_slug': session.content.module.course.slug,
+            'module_id': session.content.module.id,
+        })
+    
+    return JsonResponse({'status': 'success', 'id': target.id, 'redirect': redirect_url})
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from search.admin import IndexedSearchMixin
 from .models import Forum, Topic, Post, Subscription
 
 @admin.register(Forum)
@@ -8,6 +9,7 @@ class ForumAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description')
     prepopulated_fields = {'slug': ('title',)}
     date_hierarchy = 'created_at'
+    list_select_related = ('course',)
 
 @admin.register(Topic)
 class TopicAdmin(admin.ModelAdmin):
@@ -17,19 +19,22 @@ class TopicAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     date_hierarchy = 'created_at'
     raw_id_fields = ('created_by',)
+    list_select_related = ('forum', 'created_by')
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ('topic', 'created_by', 'created_at', 'is_edited')
     list_filter = ('is_edited', 'created_at', 'topic__forum')
     search_fields = ('content', 'created_by__username', 'topic__title')
+    search_kind = 'post'
+    exact_search_fields = ('created_by__username',)
     date_hierarchy = 'created_at'
     raw_id_fields = ('created_by', 'topic')
 
 @admin.register(Subscription)
 class SubscriptionAdmin(admin.ModelAdmin):
-    list_display = ('user', 'topic', 'created_at')
-    list_filter = ('created_at', 'topic__forum')
+    list_display = ('user', 'topic', 'mode', 'created_at')
+    list_filter = ('mode', 'created_at', 'topic__forum')
     search_fields = ('user__username', 'topic__title')
     date_hierarchy = 'created_at'
     raw_id_fields = ('user', 'topic')
@@ -0,0 +1,153 @@
+"""
+Denormalized forum and topic counters, and buffered topic view counts.
+
+Topic.post_count/first_post/last_post and Forum.topic_count/post_count/
+last_post are recomputed from the source rows with one
+``UPDATE ... SET x = (SELECT ...)`` per topic and per forum whenever a post
+or topic is added, moved or removed (see forums.signals), rather than
+adjusted by +1/-1, so a retried or partial write cannot leave them off by
+one. Forum totals are derived from the stored topic columns, so the forum
+update reads one row per topic instead of every post. The repair_forum_counters
+command fixes rows changed behind the ORM's back.
+
+Page views are added to an in-process WriteBehindBuffer and flushed every
+few seconds as ``UPDATE forums_topic SET views = views + n``, one statement
+per distinct n, so a GET no longer writes the whole topic row or bumps its
+``updated_at``. Each worker process flushes its own increments and the
+database adds them up, so totals stay exact across workers; only the
+increments pending in a worker that is killed outright are lost.
+"""
+import operator
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import BigIntegerField, Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from core.buffers import WriteBehindBuffer
+
+from .models import Forum, Post, Topic
+
+TOPIC_COUNTER_FIELDS = ('post_count', 'first_post', 'last_post')
+FORUM_COUNTER_FIELDS = ('topic_count', 'post_count', 'last_post')
+
+
+def _aggregate_subquery(queryset, group_field, aggregate):
+    values = (
+        queryset.filter(**{group_field: OuterRef('pk')})
+        .order_by()
+        .values(group_field)
+        .annotate(total=aggregate)
+        .values('total')
+    )
+    return Coalesce(Subquery(values, output_field=IntegerField()), Value(0))
+
+
+def topic_counter_expressions():
+    """Return {field: expression} computing each Topic counter from its posts"""
+    posts = Post.objects.filter(topic=OuterRef('pk'))
+    return {
+        'post_count': _aggregate_subquery(Post.objects.all(), 'topic', Count('pk')),
+        'first_post': Subquery(posts.order_by('created_at', 'pk').values('pk')[:1]),
+        'last_post': Subquery(posts.order_by('-created_at', '-pk').values('pk')[:1]),
+    }
+
+
+def forum_counter_expressions():
+    """Return {field: expression} computing each Forum counter from its topics' stored counters"""
+    return {
+        'topic_count': _aggregate_subquery(Topic.objects.all(), 'forum', Count('pk')),
+        'post_count': _aggregate_subquery(Topic.objects.all(), 'forum', Sum('post_count')),
+        'last_post': Subquery(
+            Topic.objects.filter(forum=OuterRef('pk'), last_post__isnull=False)
+            .order_by('-last_post__created_at', '-last_post')
+            .values('last_post')[:1]
+        ),
+    }
+
+
+def recount_topics(topics=None):
+    """
+    Recompute counters for the given topic IDs or queryset (all topics
+    when None). Returns the number of topics updated.
+    """
+    queryset = Topic.objects.all()
+    if topics is not None:
+        queryset = queryset.filter(pk__in=topics)
+    return queryset.update(**topic_counter_expressions())
+
+
+def recount_forums(forums=None):
+    """
+    Recompute counters for the given forum IDs or queryset (all forums
+    when None) from their topics, which must be up to date. Returns the
+    number of forums updated.
+    """
+    queryset = Forum.objects.all()
+    if forums is not None:
+        queryset = queryset.filter(pk__in=forums)
+    return queryset.update(**forum_counter_expressions())
+
+
+def recount_topic_tree(topic_ids, forum_ids):
+    """
+    Recount the given topics and then their forums in one transaction.
+
+    The rows are locked first, so concurrent recounts of the same topic or
+    forum queue up and each recount's UPDATE reads the posts committed by
+    the one before it. NO KEY UPDATE does not conflict with the key-share
+    lock that inserting a post takes on its topic.
+    """
+    topic_ids, forum_ids = sorted(set(topic_ids)), sorted(set(forum_ids))
+    with transaction.atomic():
+        list(Topic.objects.select_for_update(no_key=True).filter(pk__in=topic_ids).order_by('pk').values_list('pk'))
+        recount_topics(topic_ids)
+        list(Forum.objects.select_for_update(no_key=True).filter(pk__in=forum_ids).order_by('pk').values_list('pk'))
+        recount_forums(forum_ids)
+
+
+def _drifted(queryset, expressions):
+    annotations = {}
+    drift = Q()
+    for field, expression in expressions.items():
+        stored = F(field)
+        if field.endswith('_post'):
+            # Missing pointers compare as 0 so NULL on one side counts as drift
+            expression = Coalesce(expression, Value(0), output_field=BigIntegerField())
+            stored = Coalesce(stored, Value(0), output_field=BigIntegerField())
+        annotations[f'actual_{field}'] = expression
+        annotations[f'stored_{field}'] = stored
+        drift |= ~Q(**{f'actual_{field}': F(f'stored_{field}')})
+    return queryset.annotate(**annotations).filter(drift)
+
+
+def drifted_topics():
+    """Return a queryset of topics whose stored counters are out of date"""
+    return _drifted(Topic.objects.all(), topic_counter_expressions())
+
+
+def drifted_forums():
+    """Return a queryset of forums whose stored counters are out of date"""
+    return _drifted(Forum.objects.all(), forum_counter_expressions())
+
+
+def _flush_views(pending):
+    topics_by_increment = defaultdict(list)
+    for topic_id, increment in pending.items():
+        topics_by_increment[increment].append(topic_id)
+    with transaction.atomic():
+        for increment, topic_ids in topics_by_increment.items():
+            Topic.objects.filter(pk__in=topic_ids).update(views=F('views') + increment)
+
+
+view_buffer = WriteBehindBuffer('topic-views', _flush_views, operator.add)
+
+
+def record_topic_view(topic):
+    """Count one view of a topic"""
+    view_buffer.add(topic.pk, 1)
+
+
+def pending_views(topic):
+    """Views of a topic counted by this process but not yet flushed"""
+    return view_buffer.pending(topic.pk, 0)
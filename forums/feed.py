@@ -0,0 +1,87 @@
+"""
+Fan-out-on-read subscription feeds.
+
+Notify-mode subscriptions get one Notification row per subscriber per post,
+so that table grows as posts x subscribers. For feed-mode subscriptions a
+post is written once, as a TopicEvent, and each user's feed is assembled
+when it is read: the events of their subscribed topics newer than the
+subscription's ``last_read_event_id`` watermark are unread. The
+``(topic, id)`` index on TopicEvent turns this into one index range scan
+per subscription, starting at the watermark, so the cost tracks what the
+user has not read yet rather than the topic's history.
+"""
+from django.db.models import BooleanField, Count, ExpressionWrapper, F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Subscription, TopicEvent
+
+
+def record_post_event(post):
+    """Record a new post once for all of its topic's feed subscribers"""
+    return TopicEvent.objects.create(
+        topic_id=post.topic_id, event_type='post', post=post, actor_id=post.created_by_id,
+    )
+
+
+def _subscribed_events(user):
+    # One filter() call, so every condition applies to the same subscription row
+    return TopicEvent.objects.filter(
+        topic__subscriptions__user=user,
+        topic__subscriptions__mode=Subscription.MODE_FEED,
+    ).exclude(actor=user)
+
+
+def _unread_events(user):
+    return TopicEvent.objects.filter(
+        topic__subscriptions__user=user,
+        topic__subscriptions__mode=Subscription.MODE_FEED,
+        id__gt=F('topic__subscriptions__last_read_event_id'),
+    ).exclude(actor=user)
+
+
+def feed_events(user):
+    """Events in the user's feed-mode topics (not their own), with ``is_unread``, newest first"""
+    return (
+        _subscribed_events(user)
+        .annotate(is_unread=ExpressionWrapper(
+            Q(id__gt=F('topic__subscriptions__last_read_event_id')), output_field=BooleanField(),
+        ))
+        .select_related('topic__forum', 'post', 'actor')
+        .order_by('-id')
+    )
+
+
+def unread_count(user):
+    """Total unread events across the user's feed-mode subscriptions"""
+    return _unread_events(user).count()
+
+
+def unread_counts_by_topic(user):
+    """Return {topic_id: unread events} for the user's feed-mode topics with anything unread"""
+    return dict(
+        _unread_events(user).order_by().values('topic_id').annotate(unread=Count('id')).values_list('topic_id', 'unread')
+    )
+
+
+def mark_topic_read(user, topic, posts=None):
+    """
+    Advance the user's watermark in a topic past the events of ``posts``
+    (the posts they were shown), or past every event when None.
+    """
+    events = TopicEvent.objects.filter(topic=topic)
+    if posts is not None:
+        events = events.filter(post__in=[post.pk for post in posts])
+    latest = events.aggregate(latest=Max('id'))['latest']
+    if latest is None:
+        return 0
+    return Subscription.objects.filter(
+        user=user, topic=topic, mode=Subscription.MODE_FEED, last_read_event_id__lt=latest,
+    ).update(last_read_event_id=latest)
+
+
+def mark_all_read(user):
+    """Advance every feed-mode watermark of the user to their topic's newest event"""
+    latest = TopicEvent.objects.filter(topic=OuterRef('topic')).order_by('-id').values('id')[:1]
+    return Subscription.objects.filter(user=user, mode=Subscription.MODE_FEED).update(
+        last_read_event_id=Coalesce(Subquery(latest), F('last_read_event_id')),
+    )
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forums', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='topic',
+            name='views',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Forum = apps.get_model('forums', 'Forum')
+    Topic = apps.get_model('forums', 'Topic')
+    Post = apps.get_model('forums', 'Post')
+
+    def total_of(queryset, group_field, aggregate):
+        totals = (
+            queryset.filter(**{group_field: OuterRef('pk')})
+            .order_by()
+            .values(group_field)
+            .annotate(total=aggregate)
+            .values('total')
+        )
+        return Coalesce(Subquery(totals, output_field=IntegerField()), Value(0))
+
+    posts = Post.objects.filter(topic=OuterRef('pk'))
+    Topic.objects.update(
+        post_count=total_of(Post.objects.all(), 'topic', Count('pk')),
+        first_post=Subquery(posts.order_by('created_at', 'pk').values('pk')[:1]),
+        last_post=Subquery(posts.order_by('-created_at', '-pk').values('pk')[:1]),
+    )
+    Forum.objects.update(
+        topic_count=total_of(Topic.objects.all(), 'forum', Count('pk')),
+        post_count=total_of(Topic.objects.all(), 'forum', Sum('post_count')),
+        last_post=Subquery(
+            Topic.objects.filter(forum=OuterRef('pk'), last_post__isnull=False)
+            .order_by('-last_post__created_at', '-last_post')
+            .values('last_post')[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forums', '0002_topic_views_not_editable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forum',
+            name='last_post',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='forums.post'),
+        ),
+        migrations.AddField(
+            model_name='forum',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='forum',
+            name='topic_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='first_post',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='forums.post'),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='last_post',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='forums.post'),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forums', '0003_forum_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['topic', 'created_at', 'id'], name='forums_post_topic_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import forums.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('forums', '0004_post_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscription',
+            name='last_read_event_id',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='mode',
+            field=models.CharField(choices=[('notify', 'Notification per post'), ('feed', 'Subscription feed')], default=forums.models.default_subscription_mode, max_length=10),
+        ),
+        migrations.CreateModel(
+            name='TopicEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('post', 'New Post')], default='post', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='forum_events', to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='events', to='forums.post')),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='forums.topic')),
+            ],
+            options={
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['topic', 'id'], name='forums_event_topic_id_idx')],
+            },
+        ),
+    ]
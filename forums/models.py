@@ -1,10 +1,12 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils.text import slugify
 from django.urls import reverse
+from core.models import DerivedFieldsModel
 from courses.models import Course
 
-class Forum(models.Model):
+class Forum(DerivedFieldsModel):
     """
     A forum can be course-specific or general.
     """
@@ -15,6 +17,14 @@ class Forum(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Maintained by forums.counters when topics and posts are added or removed
+    topic_count = models.PositiveIntegerField(default=0, editable=False)
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+    last_post = models.ForeignKey(
+        'Post', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+',
+    )
+
+    DERIVED_FIELDS = ('topic_count', 'post_count', 'last_post')
     
     class Meta:
         ordering = ['title']
@@ -29,16 +39,8 @@ class Forum(models.Model):
     
     def get_absolute_url(self):
         return reverse('forum_detail', kwargs={'slug': self.slug})
-    
-    @property
-    def topic_count(self):
-        return self.topics.count()
-    
-    @property
-    def post_count(self):
-        return sum(topic.post_count for topic in self.topics.all())
 
-class Topic(models.Model):
+class Topic(DerivedFieldsModel):
     """
     A topic belongs to a forum and contains posts.
     """
@@ -48,9 +50,21 @@ class Topic(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='topics')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    views = models.PositiveIntegerField(default=0)
+    # Only changed by forums.counters, with UPDATE ... SET views = views + n
+    views = models.PositiveIntegerField(default=0, editable=False)
     is_pinned = models.BooleanField(default=False)
     is_closed = models.BooleanField(default=False)
+    # Maintained by forums.counters when posts are added or removed
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+    first_post = models.ForeignKey(
+        'Post', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+',
+    )
+    last_post = models.ForeignKey(
+        'Post', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+',
+    )
+
+    # views too: buffered increments may have overtaken the loaded value
+    DERIVED_FIELDS = ('views', 'post_count', 'first_post', 'last_post')
     
     class Meta:
         ordering = ['-is_pinned', '-updated_at']
@@ -66,14 +80,6 @@ class Topic(models.Model):
     
     def get_absolute_url(self):
         return reverse('topic_detail', kwargs={'forum_slug': self.forum.slug, 'slug': self.slug})
-    
-    @property
-    def post_count(self):
-        return self.posts.count()
-    
-    @property
-    def last_post(self):
-        return self.posts.order_by('-created_at').first()
 
 class Post(models.Model):
     """
@@ -88,6 +94,10 @@ class Post(models.Model):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Keyset pagination of a topic: WHERE topic = ? AND (created_at, id) > (?, ?)
+            models.Index(fields=['topic', 'created_at', 'id'], name='forums_post_topic_keyset_idx'),
+        ]
         
     def __str__(self):
         return f"Post by {self.created_by.username} in {self.topic.title}"
@@ -99,16 +109,67 @@ class Post(models.Model):
             'pk': self.pk
         })
 
+def default_subscription_mode():
+    return getattr(settings, 'FORUM_SUBSCRIPTION_MODE', Subscription.MODE_NOTIFY)
+
 class Subscription(models.Model):
     """
     Users can subscribe to topics to receive notifications.
+
+    In ``notify`` mode every new post creates a Notification row for the
+    subscriber. In ``feed`` mode the post is recorded once as a TopicEvent
+    and the subscriber's feed and unread count are computed when read,
+    from the events after ``last_read_event_id`` (see forums.feed).
     """
+    MODE_NOTIFY = 'notify'
+    MODE_FEED = 'feed'
+    MODE_CHOICES = (
+        (MODE_NOTIFY, 'Notification per post'),
+        (MODE_FEED, 'Subscription feed'),
+    )
+    
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='forum_subscriptions')
     topic = models.ForeignKey(Topic, on_delete=models.CASCADE, related_name='subscriptions')
     created_at = models.DateTimeField(auto_now_add=True)
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default=default_subscription_mode)
+    # ID of the newest TopicEvent the user has read in this topic (feed mode)
+    last_read_event_id = models.BigIntegerField(default=0, editable=False)
     
     class Meta:
         unique_together = ['user', 'topic']
         
     def __str__(self):
         return f"{self.user.username} subscribed to {self.topic.title}"
+    
+    def save(self, *args, **kwargs):
+        if self.pk is None and not self.last_read_event_id:
+            # Only what happens after subscribing is unread
+            self.last_read_event_id = (
+                TopicEvent.objects.filter(topic_id=self.topic_id).aggregate(latest=models.Max('id'))['latest'] or 0
+            )
+        super().save(*args, **kwargs)
+
+class TopicEvent(models.Model):
+    """
+    Something that happened in a topic, recorded once for all of its
+    feed-mode subscribers.
+    """
+    EVENT_TYPES = (
+        ('post', 'New Post'),
+    )
+    
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, related_name='events')
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPES, default='post')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, null=True, blank=True, related_name='events')
+    actor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='forum_events')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            # Unread events of a subscription: WHERE topic = ? AND id > watermark
+            models.Index(fields=['topic', 'id'], name='forums_event_topic_id_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_event_type_display()} in {self.topic.title}"
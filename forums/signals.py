@@ -0,0 +1,83 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .counters import recount_topic_tree
+from .feed import record_post_event
+from .models import Post, Topic
+
+_deleted = threading.local()
+
+
+def _recount_after_delete(topic_ids=(), forum_ids=()):
+    """
+    Queue a recount for when the transaction commits. Deleting a topic or
+    forum cascades to every post in it, so the recounts are merged into one
+    instead of running per post.
+    """
+    pending = getattr(_deleted, 'pending', None)
+    if pending is None:
+        pending = _deleted.pending = (set(), set())
+    pending[0].update(topic_ids)
+    pending[1].update(forum_ids)
+    # Registered every time so a rolled-back transaction cannot strand the queue
+    transaction.on_commit(_flush_deleted)
+
+
+def _flush_deleted():
+    pending = getattr(_deleted, 'pending', None)
+    if pending is None:
+        return
+    _deleted.pending = None
+    topic_ids, forum_ids = pending
+    # Topics deleted with their posts are gone; their forums were queued by topic_deleted
+    forum_ids.update(Topic.objects.filter(pk__in=topic_ids).values_list('forum_id', flat=True))
+    recount_topic_tree(topic_ids, forum_ids)
+
+
+@receiver(post_init, sender=Post)
+def remember_post_topic(sender, instance, **kwargs):
+    # __dict__ so a deferred topic_id is not fetched just to be remembered
+    instance._counted_topic_id = instance.__dict__.get('topic_id')
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    """Recount the topic and forum a post was added to (or moved between)"""
+    if raw:
+        return
+    topic_ids = {instance.topic_id, instance._counted_topic_id} - {None}
+    instance._counted_topic_id = instance.topic_id
+    if created:
+        record_post_event(instance)
+    if created or len(topic_ids) > 1:
+        forum_ids = Topic.objects.filter(pk__in=topic_ids).values_list('forum_id', flat=True)
+        recount_topic_tree(topic_ids, forum_ids)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    _recount_after_delete(topic_ids=[instance.topic_id])
+
+
+@receiver(post_init, sender=Topic)
+def remember_topic_forum(sender, instance, **kwargs):
+    instance._counted_forum_id = instance.__dict__.get('forum_id')
+
+
+@receiver(post_save, sender=Topic)
+def topic_saved(sender, instance, created, raw=False, **kwargs):
+    """Recount the forum a topic was added to (or the forums it moved between)"""
+    if raw:
+        return
+    forum_ids = {instance.forum_id, instance._counted_forum_id} - {None}
+    instance._counted_forum_id = instance.forum_id
+    if created or len(forum_ids) > 1:
+        recount_topic_tree([], forum_ids)
+
+
+@receiver(post_delete, sender=Topic)
+def topic_deleted(sender, instance, **kwargs):
+    _recount_after_delete(forum_ids=[instance.forum_id])
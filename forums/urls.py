@@ -5,6 +5,9 @@ urlpatterns = [
     # Forums
     path('', views.forum_list, name='forum_list'),
     path('create/', views.forum_create, name='forum_create'),
+    path('feed/', views.subscription_feed, name='subscription_feed'),
+    path('feed/unread/', views.subscription_feed_unread, name='subscription_feed_unread'),
+    path('feed/mark-read/', views.subscription_feed_mark_read, name='subscription_feed_mark_read'),
     path('<slug:slug>/', views.forum_detail, name='forum_detail'),
     path('<slug:slug>/edit/', views.forum_edit, name='forum_edit'),
     
@@ -18,7 +21,9 @@ urlpatterns = [
     path('<slug:forum_slug>/<slug:slug>/unsubscribe/', views.topic_unsubscribe, name='topic_unsubscribe'),
     
     # Posts
+    path('<slug:forum_slug>/<slug:topic_slug>/posts/', views.topic_posts, name='topic_posts'),
     path('<slug:forum_slug>/<slug:topic_slug>/posts/create/', views.post_create, name='post_create'),
+    path('<slug:forum_slug>/<slug:topic_slug>/posts/<int:pk>/', views.post_detail, name='post_detail'),
     path('<slug:forum_slug>/<slug:topic_slug>/posts/<int:pk>/edit/', views.post_edit, name='post_edit'),
     path('<slug:forum_slug>/<slug:topic_slug>/posts/<int:pk>/delete/', views.post_delete, name='post_delete'),
 ]
\ No newline at end of file
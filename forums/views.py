@@ -1,13 +1,18 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.models import User
 from django.contrib import messages
 from django.urls import reverse
-from django.http import HttpResponseForbidden
-from django.db.models import Count, Q
+from django.http import HttpResponseForbidden, JsonResponse
+from django.db import transaction
+from django.db.models import Q
+from django.views.decorators.http import require_POST, require_safe
 
 from .models import Forum, Topic, Post, Subscription
-from messaging.models import Notification
+from core.pagination import InvalidCursor, KeysetPaginator
+from courses.access import get_course_access, get_enrolled_course_ids
+from messaging.dispatch import dispatch, notify_topic_subscribers
+from .counters import pending_views, record_topic_view
+from .feed import feed_events, mark_all_read, mark_topic_read, unread_count, unread_counts_by_topic
 from .forms import ForumForm, TopicForm, PostForm
 
 def forum_list(request):
@@ -20,12 +25,12 @@ def forum_list(request):
         instructor_courses = request.user.courses_teaching.all()
         
         # Get courses where user is enrolled
-        enrolled_courses = request.user.courses_enrolled.all()
+        enrolled_course_ids = get_enrolled_course_ids(request.user)
         
         # Get course-specific forums for these courses
         course_forums = Forum.objects.filter(
             Q(course__in=instructor_courses) | 
-            Q(course__in=enrolled_courses)
+            Q(course_id__in=enrolled_course_ids)
         ).distinct()
         
         # Combine querysets
@@ -66,16 +71,12 @@ def forum_detail(request, slug):
     
     # Check if the forum is course-specific and if the user has access
     if forum.course and request.user.is_authenticated:
-        is_instructor = request.user == forum.course.instructor
-        is_enrolled = request.user in forum.course.students.all()
-        if not (is_instructor or is_enrolled or request.user.is_staff):
+        if not get_course_access(request.user, forum.course).can_access:
             messages.error(request, "You don't have access to this forum.")
             return redirect('forum_list')
     
-    # Get topics with annotated post counts and last post info
-    topics = forum.topics.select_related('created_by').annotate(
-        post_count=Count('posts')
-    ).order_by('-is_pinned', '-updated_at')
+    # Post counts and last posts are stored on each topic
+    topics = forum.topics.select_related('created_by', 'last_post__created_by').order_by('-is_pinned', '-updated_at')
     
     context = {
         'forum': forum,
@@ -116,9 +117,7 @@ def topic_create(request, forum_slug):
     
     # Check if the forum is course-specific and if the user has access
     if forum.course:
-        is_instructor = request.user == forum.course.instructor
-        is_enrolled = request.user in forum.course.students.all()
-        if not (is_instructor or is_enrolled or request.user.is_staff):
+        if not get_course_access(request.user, forum.course).can_access:
             messages.error(request, "You don't have access to this forum.")
             return redirect('forum_list')
     
@@ -127,20 +126,22 @@ def topic_create(request, forum_slug):
         post_form = PostForm(request.POST)
         
         if topic_form.is_valid() and post_form.is_valid():
-            # Create the topic
-            topic = topic_form.save(commit=False)
-            topic.forum = forum
-            topic.created_by = request.user
-            topic.save()
-            
-            # Create the initial post
-            post = post_form.save(commit=False)
-            post.topic = topic
-            post.created_by = request.user
-            post.save()
-            
-            # Auto-subscribe the creator
-            Subscription.objects.create(user=request.user, topic=topic)
+            # The topic, its first post and the counters they update commit together
+            with transaction.atomic():
+                # Create the topic
+                topic = topic_form.save(commit=False)
+                topic.forum = forum
+                topic.created_by = request.user
+                topic.save()
+                
+                # Create the initial post
+                post = post_form.save(commit=False)
+                post.topic = topic
+                post.created_by = request.user
+                post.save()
+                
+                # Auto-subscribe the creator
+                Subscription.objects.create(user=request.user, topic=topic)
             
             messages.success(request, f"Topic '{topic.title}' created successfully.")
             return redirect('topic_detail', forum_slug=forum.slug, slug=topic.slug)
@@ -156,6 +157,37 @@ def topic_create(request, forum_slug):
     }
     return render(request, 'forums/topic_form.html', context)
 
+POSTS_PER_PAGE = 30
+
+
+def _topic_posts_page(request, topic):
+    """
+    The page of posts requested by ?after= / ?before= (cursors), ?post=
+    (the page starting at that post) or ?page=last; the first page otherwise.
+    """
+    paginator = KeysetPaginator(
+        topic.posts.select_related('created_by'), ordering=('created_at', 'pk'), per_page=POSTS_PER_PAGE,
+    )
+    try:
+        if request.GET.get('after'):
+            return paginator.page(after=request.GET['after'])
+        if request.GET.get('before'):
+            return paginator.page(before=request.GET['before'])
+    except InvalidCursor:
+        return paginator.page()
+    if request.GET.get('post', '').isdigit():
+        post = topic.posts.filter(pk=request.GET['post']).only('pk', 'created_at').first()
+        if post is not None:
+            return paginator.page_from(post)
+    if request.GET.get('page') == 'last':
+        return paginator.last_page()
+    return paginator.page()
+
+
+def _page_url(base_url, param, cursor):
+    return f"{base_url}?{param}={cursor}" if cursor else None
+
+
 def topic_detail(request, forum_slug, slug):
     """Display posts in a topic."""
     forum = get_object_or_404(Forum, slug=forum_slug, is_active=True)
@@ -163,24 +195,26 @@ def topic_detail(request, forum_slug, slug):
     
     # Check if the forum is course-specific and if the user has access
     if forum.course and request.user.is_authenticated:
-        is_instructor = request.user == forum.course.instructor
-        is_enrolled = request.user in forum.course.students.all()
-        if not (is_instructor or is_enrolled or request.user.is_staff):
+        if not get_course_access(request.user, forum.course).can_access:
             messages.error(request, "You don't have access to this topic.")
             return redirect('forum_list')
     
-    # Increment view count
-    topic.views += 1
-    topic.save()
+    # Counted in memory and flushed in batches; show this worker's pending views too
+    record_topic_view(topic)
+    topic.views += pending_views(topic)
     
-    # Get posts
-    posts = topic.posts.select_related('created_by').order_by('created_at')
+    # One page of posts, fetched by cursor so deep pages cost the same as the first
+    page = _topic_posts_page(request, topic)
+    topic_url = topic.get_absolute_url()
     
     # Check if user is subscribed
     is_subscribed = False
     can_post = not topic.is_closed
     if request.user.is_authenticated:
         is_subscribed = Subscription.objects.filter(user=request.user, topic=topic).exists()
+        if is_subscribed:
+            # Feed-mode subscribers have now read the posts on this page
+            mark_topic_read(request.user, topic, page.object_list)
         # Always allow staff and instructors to post in closed topics
         if topic.is_closed and (request.user.is_staff or (forum.course and request.user == forum.course.instructor)):
             can_post = True
@@ -188,12 +222,54 @@ def topic_detail(request, forum_slug, slug):
     context = {
         'forum': forum,
         'topic': topic,
-        'posts': posts,
+        'posts': page.object_list,
+        'page': page,
+        'first_page_url': topic_url if page.has_previous() else None,
+        'previous_page_url': _page_url(topic_url, 'before', page.previous_cursor()),
+        'next_page_url': _page_url(topic_url, 'after', page.next_cursor()),
+        'last_page_url': f"{topic_url}?page=last" if page.has_next() else None,
+        'more_posts_url': _page_url(
+            reverse('topic_posts', kwargs={'forum_slug': forum.slug, 'topic_slug': topic.slug}),
+            'after', page.next_cursor(),
+        ),
         'is_subscribed': is_subscribed,
         'can_post': can_post,
     }
     return render(request, 'forums/topic_detail.html', context)
 
+@require_safe
+def topic_posts(request, forum_slug, topic_slug):
+    """Return a page of a topic's posts as JSON, for infinite scrolling."""
+    forum = get_object_or_404(Forum, slug=forum_slug, is_active=True)
+    topic = get_object_or_404(Topic, forum=forum, slug=topic_slug)
+    
+    if forum.course:
+        if not request.user.is_authenticated:
+            return JsonResponse({'status': 'error', 'message': 'Authentication required'}, status=403)
+        if not get_course_access(request.user, forum.course).can_access:
+            return JsonResponse({'status': 'error', 'message': 'Access denied'}, status=403)
+    
+    page = _topic_posts_page(request, topic)
+    posts_url = request.path
+    topic_url = topic.get_absolute_url()
+    return JsonResponse({
+        'status': 'success',
+        'posts': [
+            {
+                'id': post.pk,
+                'author': post.created_by.get_full_name() or post.created_by.username,
+                'content': post.content,
+                'created_at': post.created_at,
+                'is_edited': post.is_edited,
+                'is_first_post': post.pk == topic.first_post_id,
+                'url': f"{topic_url}?post={post.pk}#post-{post.pk}",
+            }
+            for post in page
+        ],
+        'previous': _page_url(posts_url, 'before', page.previous_cursor()),
+        'next': _page_url(posts_url, 'after', page.next_cursor()),
+    })
+
 @login_required
 def topic_edit(request, forum_slug, slug):
     """Edit a topic."""
@@ -295,6 +371,40 @@ def topic_unsubscribe(request, forum_slug, slug):
     
     return redirect('topic_detail', forum_slug=forum.slug, slug=topic.slug)
 
+FEED_EVENTS_PER_PAGE = 30
+
+@login_required
+def subscription_feed(request):
+    """List new posts in the topics the user follows as a feed."""
+    paginator = KeysetPaginator(feed_events(request.user), ordering=('-id',), per_page=FEED_EVENTS_PER_PAGE)
+    try:
+        page = paginator.page(after=request.GET.get('after') or None)
+    except InvalidCursor:
+        page = paginator.page()
+    
+    context = {
+        'events': page.object_list,
+        'page': page,
+        'next_page_url': _page_url(reverse('subscription_feed'), 'after', page.next_cursor()),
+        'unread_count': unread_count(request.user),
+        'unread_by_topic': unread_counts_by_topic(request.user),
+    }
+    return render(request, 'forums/subscription_feed.html', context)
+
+@login_required
+@require_safe
+def subscription_feed_unread(request):
+    """Return the user's unread feed count as JSON (e.g. for a navbar badge)."""
+    return JsonResponse({'status': 'success', 'unread': unread_count(request.user)})
+
+@login_required
+@require_POST
+def subscription_feed_mark_read(request):
+    """Mark everything in the user's feed as read."""
+    mark_all_read(request.user)
+    messages.success(request, "All topics marked as read.")
+    return redirect('subscription_feed')
+
 @login_required
 def post_create(request, forum_slug, topic_slug):
     """Create a reply in a topic."""
@@ -303,9 +413,7 @@ def post_create(request, forum_slug, topic_slug):
     
     # Check if the forum is course-specific and if the user has access
     if forum.course:
-        is_instructor = request.user == forum.course.instructor
-        is_enrolled = request.user in forum.course.students.all()
-        if not (is_instructor or is_enrolled or request.user.is_staff):
+        if not get_course_access(request.user, forum.course).can_access:
             messages.error(request, "You don't have access to this topic.")
             return redirect('forum_list')
     
@@ -318,33 +426,23 @@ def post_create(request, forum_slug, topic_slug):
     if request.method == 'POST':
         form = PostForm(request.POST)
         if form.is_valid():
-            post = form.save(commit=False)
-            post.topic = topic
-            post.created_by = request.user
-            post.save()
-            
-            # Update topic timestamp
-            topic.updated_at = post.created_at
-            topic.save()
+            with transaction.atomic():
+                post = form.save(commit=False)
+                post.topic = topic
+                post.created_by = request.user
+                post.save()
+                
+                # Update topic timestamp
+                topic.updated_at = post.created_at
+                topic.save()
             
-            # Notify subscribers
-            subscribers = User.objects.filter(
-                forum_subscriptions__topic=topic
-            ).exclude(id=request.user.id)
-            
-            for subscriber in subscribers:
-                Notification.objects.create(
-                    user=subscriber,
-                    notification_type='forum_post',
-                    title=f'New reply in "{topic.title}"',
-                    message=f'{request.user.username} has posted in a topic you are subscribed to: {topic.title}',
-                    related_forum_post=post
-                )
+            # Notify subscribers in the background, in bulk
+            dispatch(notify_topic_subscribers, post.pk)
             
             messages.success(request, "Your reply has been posted.")
             
             # Return to the last page of the topic
-            return redirect('topic_detail', forum_slug=forum.slug, slug=topic.slug)
+            return redirect(f"{topic.get_absolute_url()}?page=last#post-{post.pk}")
     else:
         form = PostForm()
     
@@ -356,6 +454,13 @@ def post_create(request, forum_slug, topic_slug):
     }
     return render(request, 'forums/post_form.html', context)
 
+def post_detail(request, forum_slug, topic_slug, pk):
+    """Redirect to the page of the topic that starts at a post."""
+    forum = get_object_or_404(Forum, slug=forum_slug)
+    topic = get_object_or_404(Topic, forum=forum, slug=topic_slug)
+    post = get_object_or_404(Post, pk=pk, topic=topic)
+    return redirect(f"{topic.get_absolute_url()}?post={post.pk}#post-{post.pk}")
+
 @login_required
 def post_edit(request, forum_slug, topic_slug, pk):
     """Edit a post."""
@@ -403,7 +508,7 @@ def post_delete(request, forum_slug, topic_slug, pk):
         return redirect('topic_detail', forum_slug=forum.slug, slug=topic.slug)
     
     # Don't allow deletion of the first post (would break the topic)
-    if post == topic.posts.earliest('created_at'):
+    if post.pk == topic.first_post_id:
         messages.error(request, "Cannot delete the first post of a topic.")
         return redirect('topic_detail', forum_slug=forum.slug, slug=topic.slug)
     
@@ -5,7 +5,7 @@ class MessageInline(admin.TabularInline):
     model = Message
     extra = 0
     readonly_fields = ('created_at',)
-    fields = ('sender', 'content', 'is_read', 'created_at')
+    fields = ('sender', 'content', 'created_at')
     raw_id_fields = ('sender',)
 
 @admin.register(Conversation)
@@ -23,8 +23,8 @@ class ConversationAdmin(admin.ModelAdmin):
 
 @admin.register(Message)
 class MessageAdmin(admin.ModelAdmin):
-    list_display = ('conversation', 'sender', 'content_preview', 'created_at', 'is_read')
-    list_filter = ('is_read', 'created_at')
+    list_display = ('conversation', 'sender', 'content_preview', 'created_at')
+    list_filter = ('created_at',)
     search_fields = ('content', 'sender__username')
     date_hierarchy = 'created_at'
     raw_id_fields = ('sender', 'conversation')
@@ -0,0 +1,63 @@
+"""
+Conversation inbox.
+
+Each Conversation stores a pointer to its newest message and a short
+preview of it. The pointer and preview are kept up to date from the
+Message signals (see messaging.signals) with a single UPDATE.
+``inbox(user)`` builds the whole inbox in one query:
+
+- the last message and its sender come through a join;
+- the user's unread count is a correlated subquery on the read-state
+  watermark;
+- the participants are loaded by one prefetch.
+
+Rendering a row then needs no queries of its own, and the list is
+keyset-paginated on (updated_at, id).
+"""
+from django.contrib.auth.models import User
+from django.db.models import Prefetch, Q
+
+from .models import Conversation, Message
+from .read_state import unread_count_subquery
+
+PREVIEW_LENGTH = 100
+
+
+def message_preview(content):
+    return content[:PREVIEW_LENGTH] + ('...' if len(content) > PREVIEW_LENGTH else '')
+
+
+def message_added(message):
+    """Point the conversation at a new message unless a newer one is already recorded"""
+    Conversation.objects.filter(
+        Q(last_message__isnull=True) | Q(last_message_id__lt=message.pk), pk=message.conversation_id,
+    ).update(
+        last_message=message,
+        last_message_preview=message_preview(message.content),
+        updated_at=message.created_at,
+    )
+
+
+def refresh_last_message(conversation_id):
+    """Recompute a conversation's last message, e.g. after one was edited or deleted"""
+    latest = (
+        Message.objects.filter(conversation_id=conversation_id)
+        .order_by('-id')
+        .only('id', 'content')
+        .first()
+    )
+    Conversation.objects.filter(pk=conversation_id).update(
+        last_message=latest,
+        last_message_preview=message_preview(latest.content) if latest else '',
+    )
+
+
+def inbox(user):
+    """The user's conversations with their last message, unread count and participants, newest first"""
+    return (
+        Conversation.objects.filter(participants=user)
+        .select_related('last_message__sender')
+        .annotate(unread=unread_count_subquery(user))
+        .prefetch_related(Prefetch('participants', queryset=User.objects.order_by('username')))
+        .order_by('-updated_at', '-pk')
+    )
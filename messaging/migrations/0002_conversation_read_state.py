@@ -0,0 +1,69 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Max, Min
+
+
+def populate_read_states(apps, schema_editor):
+    """Start each participant's watermark just before the first message from others still flagged unread"""
+    Conversation = apps.get_model('messaging', 'Conversation')
+    Message = apps.get_model('messaging', 'Message')
+    ConversationReadState = apps.get_model('messaging', 'ConversationReadState')
+
+    batch = []
+    participants = Conversation.participants.through.objects.values_list('conversation_id', 'user_id')
+    for conversation_id, user_id in participants.iterator(chunk_size=2000):
+        messages = Message.objects.filter(conversation_id=conversation_id)
+        first_unread = (
+            messages.filter(is_read=False).exclude(sender_id=user_id).aggregate(first=Min('id'))['first']
+        )
+        if first_unread is not None:
+            messages = messages.filter(id__lt=first_unread)
+        last_read = messages.aggregate(last=Max('id'))['last'] or 0
+        batch.append(ConversationReadState(
+            conversation_id=conversation_id, user_id=user_id, last_read_message_id=last_read,
+        ))
+        if len(batch) >= 1000:
+            ConversationReadState.objects.bulk_create(batch)
+            batch = []
+    ConversationReadState.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('messaging', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationReadState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_message_id', models.BigIntegerField(default=0)),
+                ('read_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'id'], name='messaging_message_conv_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='conversationreadstate',
+            name='conversation',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_states', to='messaging.conversation'),
+        ),
+        migrations.AddField(
+            model_name='conversationreadstate',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_read_states', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='conversationreadstate',
+            constraint=models.UniqueConstraint(fields=('conversation', 'user'), name='messaging_read_state_unique'),
+        ),
+        migrations.RunPython(populate_read_states, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import OuterRef, Subquery
+
+
+def populate_last_messages(apps, schema_editor):
+    Conversation = apps.get_model('messaging', 'Conversation')
+    Message = apps.get_model('messaging', 'Message')
+
+    latest = Message.objects.filter(conversation=OuterRef('pk')).order_by('-id')
+    conversations = (
+        Conversation.objects.annotate(
+            latest_id=Subquery(latest.values('id')[:1]),
+            latest_content=Subquery(latest.values('content')[:1]),
+        )
+        .filter(latest_id__isnull=False)
+        .only('id')
+    )
+    batch = []
+    for conversation in conversations.iterator(chunk_size=1000):
+        content = conversation.latest_content
+        conversation.last_message_id = conversation.latest_id
+        conversation.last_message_preview = content[:100] + ('...' if len(content) > 100 else '')
+        batch.append(conversation)
+        if len(batch) >= 1000:
+            Conversation.objects.bulk_update(batch, ['last_message', 'last_message_preview'])
+            batch = []
+    Conversation.objects.bulk_update(batch, ['last_message', 'last_message_preview'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0002_conversation_read_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_preview',
+            field=models.CharField(blank=True, editable=False, max_length=120),
+        ),
+        migrations.RunPython(populate_last_messages, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
+from core.models import DerivedFieldsModel
 
-class Conversation(models.Model):
+class Conversation(DerivedFieldsModel):
     """
     A conversation between two or more users.
     """
@@ -10,6 +11,13 @@ class Conversation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     subject = models.CharField(max_length=255, blank=True)
+    # Maintained by messaging.inbox when messages are sent or deleted
+    last_message = models.ForeignKey(
+        'Message', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+',
+    )
+    last_message_preview = models.CharField(max_length=120, blank=True, editable=False)
+    
+    DERIVED_FIELDS = ('last_message', 'last_message_preview')
     
     class Meta:
         ordering = ['-updated_at']
@@ -20,13 +28,10 @@ class Conversation(models.Model):
     def get_absolute_url(self):
         return reverse('conversation_detail', kwargs={'pk': self.pk})
     
-    @property
-    def last_message(self):
-        return self.messages.order_by('-created_at').first()
-    
     def unread_count(self, user):
-        """Count of unread messages for a specific user"""
-        return self.messages.filter(is_read=False).exclude(sender=user).count()
+        """Count of messages from others after the user's read watermark"""
+        last_read = self.read_states.filter(user=user).values_list('last_read_message_id', flat=True).first()
+        return self.messages.filter(id__gt=last_read or 0).exclude(sender=user).count()
     
     def other_participants(self, user):
         """Get other participants in the conversation"""
@@ -40,18 +45,37 @@ class Message(models.Model):
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # Shared by all participants, so no longer maintained: per-user read
+    # state lives in ConversationReadState
     is_read = models.BooleanField(default=False)
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Unread messages: WHERE conversation = ? AND id > watermark
+            models.Index(fields=['conversation', 'id'], name='messaging_message_conv_id_idx'),
+        ]
     
     def __str__(self):
         return f"Message from {self.sender.username} in {self.conversation}"
+
+class ConversationReadState(models.Model):
+    """
+    How far one participant has read a conversation: every message with an
+    ID up to ``last_read_message_id`` counts as read for that user.
+    """
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='read_states')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversation_read_states')
+    last_read_message_id = models.BigIntegerField(default=0)
+    read_at = models.DateTimeField(auto_now=True)
     
-    def mark_as_read(self):
-        if not self.is_read:
-            self.is_read = True
-            self.save()
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['conversation', 'user'], name='messaging_read_state_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} read {self.conversation} up to message {self.last_read_message_id}"
 
 class Notification(models.Model):
     """
@@ -0,0 +1,48 @@
+"""
+Per-participant read state of conversations.
+
+Each (conversation, user) pair has a ConversationReadState row holding the
+ID of the newest message the user has seen. Message IDs only grow, so a
+message is unread for a user exactly when its ID is above their watermark
+and someone else sent it. Counting unread messages is then one range scan
+of the (conversation, id) index, and opening a conversation writes one
+row, where a shared ``Message.is_read`` flag needed an UPDATE of every
+message and could not tell participants apart.
+"""
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import ConversationReadState, Message
+
+
+def mark_conversation_read(conversation, user, message_id):
+    """Record that ``user`` has seen ``conversation`` up to ``message_id``"""
+    ConversationReadState.objects.bulk_create(
+        [ConversationReadState(conversation=conversation, user=user, last_read_message_id=message_id)],
+        ignore_conflicts=True,
+    )
+    # The row may have existed already. Only ever move the watermark forward,
+    # so a slower request that showed older messages cannot make them unread
+    ConversationReadState.objects.filter(
+        conversation=conversation, user=user, last_read_message_id__lt=message_id,
+    ).update(last_read_message_id=message_id, read_at=timezone.now())
+
+
+def unread_count_subquery(user, conversation_ref='pk'):
+    """
+    Expression counting the messages from others after the user's watermark
+    in the conversation ``conversation_ref`` names, for ``annotate()``.
+    """
+    watermark = ConversationReadState.objects.filter(
+        conversation=OuterRef(OuterRef(conversation_ref)), user=user,
+    ).values('last_read_message_id')[:1]
+    unread = (
+        Message.objects.filter(conversation=OuterRef(conversation_ref), id__gt=Coalesce(Subquery(watermark), Value(0)))
+        .exclude(sender=user)
+        .order_by()
+        .values('conversation')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
@@ -0,0 +1,99 @@
+"""
+Real-time delivery of new messages and notifications.
+
+Every user has one channel on the core.pubsub broker. When a Message or
+Notification is created, an event is published to the channel of each user
+who should see it once the transaction commits (a rolled-back message is
+never pushed). The ``event_stream`` view holds one server-sent events
+response per open page and writes out whatever arrives on the user's
+channel, so clients see new messages within a fraction of a second
+without polling.
+"""
+import json
+
+from django.db import transaction
+from django.urls import reverse
+
+from core.pubsub import get_broker
+
+from .models import Notification
+
+MESSAGE_EVENT = 'new-message'
+NOTIFICATION_EVENT = 'notification'
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def message_event(message):
+    return {
+        'type': MESSAGE_EVENT,
+        'id': message.pk,
+        'conversation': message.conversation_id,
+        'sender': message.sender.username,
+        'sender_id': message.sender_id,
+        'content': message.content,
+        'created_at': message.created_at.isoformat(),
+        'url': reverse('conversation_detail', kwargs={'pk': message.conversation_id}),
+    }
+
+
+def notification_event(notification):
+    return {
+        'type': NOTIFICATION_EVENT,
+        'id': notification.pk,
+        'notification_type': notification.notification_type,
+        'title': notification.title,
+        'message': notification.message,
+        'created_at': notification.created_at.isoformat(),
+        'url': notification.related_link or reverse('notification_list'),
+    }
+
+
+def publish_message(message, recipient_ids):
+    """Push a new message to its participants once the current transaction commits"""
+    event = message_event(message)
+    broker = get_broker()
+
+    def publish():
+        for user_id in recipient_ids:
+            broker.publish(user_channel(user_id), event)
+    transaction.on_commit(publish)
+
+
+def publish_notifications(notifications):
+    """Push new notifications to their users once the current transaction commits"""
+    events = [(notification.user_id, notification_event(notification)) for notification in notifications]
+    broker = get_broker()
+
+    def publish():
+        for user_id, event in events:
+            broker.publish(user_channel(user_id), event)
+    transaction.on_commit(publish)
+
+
+def publish_bulk_notifications(first_pk, last_pk, **fields):
+    """
+    Push the notifications that bulk_notify created with ``fields`` (primary
+    keys ``first_pk`` to ``last_pk``) once the current transaction commits.
+    They are streamed back from the database rather than held in the
+    callback, so a send to a whole course keeps memory flat however long its
+    transaction runs.
+    """
+    broker = get_broker()
+
+    def publish():
+        notifications = (
+            Notification.objects.filter(pk__range=(first_pk, last_pk), **fields)
+            .order_by('pk')
+            .iterator(chunk_size=1000)
+        )
+        for notification in notifications:
+            broker.publish(user_channel(notification.user_id), notification_event(notification))
+    transaction.on_commit(publish)
+
+
+def format_event(event):
+    """Encode an event as a server-sent events frame"""
+    return f"id: {event['type']}-{event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .inbox import message_added, refresh_last_message
+from .models import Message, Notification
+from .realtime import publish_message, publish_notifications
+
+
+@receiver(post_save, sender=Message)
+def message_saved(sender, instance, created, raw=False, **kwargs):
+    """Keep the conversation's last message pointer and preview current"""
+    if raw:
+        return
+    if created:
+        message_added(instance)
+        publish_message(instance, list(instance.conversation.participants.values_list('id', flat=True)))
+    else:
+        refresh_last_message(instance.conversation_id)
+
+
+@receiver(post_delete, sender=Message)
+def message_deleted(sender, instance, **kwargs):
+    refresh_last_message(instance.conversation_id)
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, raw=False, **kwargs):
+    """Push new notifications to the user's open pages"""
+    if created and not raw:
+        publish_notifications([instance])
@@ -12,6 +12,9 @@ urlpatterns = [
     path('<int:conversation_id>/messages/create/', views.message_create, name='message_create'),
     path('messages/<int:pk>/delete/', views.message_delete, name='message_delete'),
     
+    # Real-time events (server-sent events)
+    path('events/', views.event_stream, name='event_stream'),
+    
     # Notifications
     path('notifications/', views.notification_list, name='notification_list'),
     path('notifications/<int:pk>/mark-read/', views.notification_mark_read, name='notification_mark_read'),
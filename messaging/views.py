@@ -1,21 +1,47 @@
+import asyncio
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Q
 from django.urls import reverse
-from django.http import HttpResponseForbidden, JsonResponse
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
+
+from core.pagination import InvalidCursor, KeysetPaginator
+from core.pubsub import get_broker
 
 from .models import Conversation, Message, Notification
 from .forms import ConversationForm, MessageForm
+from .inbox import inbox
+from .read_state import mark_conversation_read
+from .realtime import format_event, user_channel
+
+CONVERSATIONS_PER_PAGE = 25
 
 @login_required
 def conversation_list(request):
     """List all conversations for the current user."""
-    conversations = Conversation.objects.filter(participants=request.user).order_by('-updated_at')
+    # One query for the page (last message, sender and unread count joined in)
+    # plus one prefetch of participants; pages by cursor rather than OFFSET
+    paginator = KeysetPaginator(inbox(request.user), ordering=('-updated_at', '-pk'), per_page=CONVERSATIONS_PER_PAGE)
+    try:
+        page = paginator.page(after=request.GET.get('after') or None)
+    except InvalidCursor:
+        page = paginator.page()
+    
+    conversations = page.object_list
+    for conversation in conversations:
+        conversation.others = [user for user in conversation.participants.all() if user.pk != request.user.pk]
     
+    next_cursor = page.next_cursor()
     context = {
         'conversations': conversations,
+        'page': page,
+        'next_page_url': f"{reverse('conversation_list')}?after={next_cursor}" if next_cursor else None,
     }
     return render(request, 'messaging/conversation_list.html', context)
 
@@ -89,14 +115,11 @@ def conversation_detail(request, pk):
         return redirect('conversation_list')
     
     # Get all messages for this conversation
-    message_list = conversation.messages.order_by('created_at')
+    message_list = list(conversation.messages.select_related('sender').order_by('created_at', 'id'))
     
-    # Mark all messages as read for this user
-    Message.objects.filter(
-        conversation=conversation
-    ).exclude(
-        sender=request.user
-    ).update(is_read=True)
+    # Everything shown is now read for this user: one upsert of their watermark
+    if message_list:
+        mark_conversation_read(conversation, request.user, max(message.pk for message in message_list))
     
     # Mark related notifications as read
     Notification.objects.filter(
@@ -113,10 +136,6 @@ def conversation_detail(request, pk):
             message.sender = request.user
             message.save()
             
-            # Update conversation timestamp
-            conversation.updated_at = message.created_at
-            conversation.save()
-            
             # Notify other participants
             for participant in conversation.participants.exclude(id=request.user.id):
                 Notification.objects.create(
@@ -186,10 +205,6 @@ def message_create(request, conversation_id):
                 content=content
             )
             
-            # Update conversation timestamp
-            conversation.updated_at = message.created_at
-            conversation.save()
-            
             # Notify other participants
             for participant in conversation.participants.exclude(id=request.user.id):
                 Notification.objects.create(
@@ -280,3 +295,34 @@ def notification_delete(request, pk):
         'notification': notification,
     }
     return render(request, 'messaging/notification_confirm_delete.html', context)
+
+STREAM_KEEPALIVE_SECONDS = 15
+
+async def _event_frames(user_id):
+    loop = asyncio.get_running_loop()
+    # Streams end after a while and EventSource reconnects: Django cannot
+    # see a client that went away until a write fails, so this bounds how
+    # long an abandoned stream can linger
+    deadline = loop.time() + getattr(settings, 'REALTIME_STREAM_TIMEOUT', 300)
+    async with get_broker().subscribe([user_channel(user_id)]) as subscription:
+        yield "retry: 3000\n\n"
+        while loop.time() < deadline:
+            event = await subscription.get(timeout=STREAM_KEEPALIVE_SECONDS)
+            # A comment line keeps proxies from closing an idle connection
+            yield format_event(event) if event is not None else ": keepalive\n\n"
+
+async def event_stream(request):
+    """Stream new messages and notifications for the current user as server-sent events."""
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI each open stream would pin a worker thread; 204 tells
+        # EventSource not to reconnect, so pages fall back to reloading
+        return HttpResponse(status=204)
+    
+    user_id = await sync_to_async(lambda: request.user.pk if request.user.is_authenticated else None)()
+    if user_id is None:
+        return HttpResponseForbidden()
+    
+    response = StreamingHttpResponse(_event_frames(user_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
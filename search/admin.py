@@ -0,0 +1,33 @@
+from django.contrib import admin
+from django.db.models import Q
+
+from .models import SearchDocument
+from .query import matching_object_ids
+
+
+class IndexedSearchMixin:
+    """
+    Answer admin searches from the full-text index instead of icontains
+    scans. ``search_kind`` names the SearchDocument kind for the model;
+    ``exact_search_fields`` are also matched exactly (e.g. usernames).
+    """
+    search_kind = None
+    exact_search_fields = ()
+    
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        condition = Q(pk__in=matching_object_ids(self.search_kind, search_term))
+        for field in self.exact_search_fields:
+            condition |= Q(**{field: search_term})
+        return queryset.filter(condition), False
+
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    list_display = ('title', 'kind', 'object_id', 'course', 'is_public', 'updated_at')
+    list_filter = ('kind', 'is_public')
+    search_fields = ('title',)
+    raw_id_fields = ('course',)
+    exclude = ('search_vector',)
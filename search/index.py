@@ -0,0 +1,195 @@
+"""
+Search index maintenance.
+
+Every searchable object is flattened into a SearchDocument row. On
+PostgreSQL a trigger (see migration 0002) keeps the row's weighted
+``tsvector`` current and a GIN index serves queries; on other databases the
+title and body are tokenized here and stored as SearchTerm postings, a
+small inverted index with title terms weighted above body terms.
+"""
+import re
+from collections import Counter
+
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils.html import strip_tags
+
+from courses.models import Assignment, Content, Course
+from forums.models import Post
+
+from .models import SearchDocument, SearchTerm
+
+TITLE_WEIGHT = 3
+BODY_WEIGHT = 1
+MAX_TERM_LENGTH = 64
+REBUILD_BATCH_SIZE = 500
+
+TOKEN_RE = re.compile(r'\w+')
+STOP_WORDS = frozenset((
+    'a an and are as at be but by for from has have if in into is it its no not of on or such '
+    'that the their then there these they this to was were will with'
+).split())
+
+
+def uses_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def _stem(token):
+    # Just enough folding for plurals to match their singulars
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Yield normalized index terms from text"""
+    for token in TOKEN_RE.findall(text.lower()):
+        if len(token) < 2 or len(token) > MAX_TERM_LENGTH or token in STOP_WORDS:
+            continue
+        yield _stem(token)
+
+
+def term_weights(title, body):
+    weights = Counter()
+    for term in tokenize(title):
+        weights[term] += TITLE_WEIGHT
+    for term in tokenize(body):
+        weights[term] += BODY_WEIGHT
+    return weights
+
+
+def course_document(course):
+    return SearchDocument(
+        kind='course', object_id=course.pk, course_id=course.pk, is_public=True,
+        title=course.title, body=course.description,
+        url=reverse('course_detail', kwargs={'slug': course.slug}),
+    )
+
+
+def content_document(content, course_slug):
+    return SearchDocument(
+        kind='content', object_id=content.pk, course_id=content.module.course_id,
+        title=content.title, body=content.content_text or '',
+        url=reverse('module_detail', kwargs={'course_slug': course_slug, 'module_id': content.module_id}),
+    )
+
+
+def assignment_document(assignment, course_slug):
+    return SearchDocument(
+        kind='assignment', object_id=assignment.pk, course_id=assignment.module.course_id,
+        title=assignment.title, body=assignment.description,
+        url=reverse('assignment_detail', kwargs={'course_slug': course_slug, 'assignment_id': assignment.pk}),
+    )
+
+
+def post_document(post):
+    forum = post.topic.forum
+    return SearchDocument(
+        kind='post', object_id=post.pk, course_id=forum.course_id, is_public=forum.course_id is None,
+        title=post.topic.title, body=strip_tags(post.content),
+        url=f"{post.topic.get_absolute_url()}#post-{post.pk}",
+    )
+
+
+def build_document(instance):
+    """Return an unsaved SearchDocument for a model instance"""
+    if isinstance(instance, Course):
+        return course_document(instance)
+    if isinstance(instance, Content):
+        return content_document(instance, instance.module.course.slug)
+    if isinstance(instance, Assignment):
+        return assignment_document(instance, instance.module.course.slug)
+    if isinstance(instance, Post):
+        return post_document(instance)
+    raise TypeError(f"{type(instance).__name__} is not searchable")
+
+
+def _write_postings(documents):
+    SearchTerm.objects.filter(document__in=[document.pk for document in documents]).delete()
+    SearchTerm.objects.bulk_create([
+        SearchTerm(term=term, document_id=document.pk, weight=weight)
+        for document in documents
+        for term, weight in term_weights(document.title, document.body).items()
+    ], batch_size=2000)
+
+
+@transaction.atomic
+def index_instance(instance):
+    """Insert or refresh the search document for a model instance"""
+    document = build_document(instance)
+    document.pk = (
+        SearchDocument.objects.filter(kind=document.kind, object_id=document.object_id)
+        .values_list('pk', flat=True).first()
+    )
+    document.save()
+    if not uses_postgres():
+        _write_postings([document])
+    return document
+
+
+def remove_instance(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def index_documents(documents):
+    """Bulk-insert freshly built documents (e.g. from a rebuild or course clone)"""
+    with transaction.atomic():
+        created = SearchDocument.objects.bulk_create(documents)
+        if not uses_postgres():
+            if created and created[0].pk is None:
+                # Backends that cannot return primary keys from bulk inserts
+                pks = {
+                    (kind, object_id): pk for pk, kind, object_id in SearchDocument.objects.filter(
+                        object_id__in=[document.object_id for document in created]
+                    ).values_list('pk', 'kind', 'object_id')
+                }
+                for document in created:
+                    document.pk = pks[(document.kind, document.object_id)]
+            _write_postings(created)
+    return len(created)
+
+
+def iter_all_documents():
+    """Yield a SearchDocument for every searchable object, in batches"""
+    for course in Course.objects.iterator(chunk_size=REBUILD_BATCH_SIZE):
+        yield course_document(course)
+    for content in Content.objects.select_related('module__course').iterator(chunk_size=REBUILD_BATCH_SIZE):
+        yield content_document(content, content.module.course.slug)
+    for assignment in Assignment.objects.select_related('module__course').iterator(chunk_size=REBUILD_BATCH_SIZE):
+        yield assignment_document(assignment, assignment.module.course.slug)
+    for post in Post.objects.select_related('topic__forum').iterator(chunk_size=REBUILD_BATCH_SIZE):
+        yield post_document(post)
+
+
+def index_course_tree(course):
+    """Index a course and all of its contents and assignments"""
+    documents = [course_document(course)]
+    documents += [
+        content_document(content, course.slug)
+        for content in Content.objects.filter(module__course=course).select_related('module')
+    ]
+    documents += [
+        assignment_document(assignment, course.slug)
+        for assignment in Assignment.objects.filter(module__course=course).select_related('module')
+    ]
+    SearchDocument.objects.filter(course=course).exclude(kind='post').delete()
+    return index_documents(documents)
+
+
+def rebuild_index():
+    """Drop and rebuild the whole index; returns the number of documents"""
+    SearchTerm.objects.all().delete()
+    SearchDocument.objects.all().delete()
+    total = 0
+    batch = []
+    for document in iter_all_documents():
+        batch.append(document)
+        if len(batch) >= REBUILD_BATCH_SIZE:
+            total += index_documents(batch)
+            batch = []
+    if batch:
+        total += index_documents(batch)
+    return total
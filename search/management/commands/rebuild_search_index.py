@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from search.index import rebuild_index, uses_postgres
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for courses, content, assignments and forum posts"
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        total = rebuild_index()
+        backend = "PostgreSQL tsvector" if uses_postgres() else "inverted index"
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {total} documents ({backend}) in {time.monotonic() - started:.1f}s"
+        ))
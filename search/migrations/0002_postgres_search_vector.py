@@ -0,0 +1,49 @@
+from django.db import migrations
+
+# The weighted tsvector is maintained by the database so bulk inserts and raw
+# updates are indexed too. Other backends use the SearchTerm postings instead.
+CREATE_SQL = """
+CREATE OR REPLACE FUNCTION search_document_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('pg_catalog.english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('pg_catalog.english', coalesce(NEW.body, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER search_document_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, body ON search_searchdocument
+    FOR EACH ROW EXECUTE PROCEDURE search_document_vector_update();
+
+CREATE INDEX search_document_vector_idx ON search_searchdocument USING GIN (search_vector);
+
+UPDATE search_searchdocument SET title = title;
+"""
+
+DROP_SQL = """
+DROP INDEX IF EXISTS search_document_vector_idx;
+DROP TRIGGER IF EXISTS search_document_vector_trigger ON search_searchdocument;
+DROP FUNCTION IF EXISTS search_document_vector_update();
+"""
+
+
+def create_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:20
+
+from django.db import migrations
+from django.urls import reverse
+from django.utils.html import strip_tags
+
+from search.index import term_weights
+
+BATCH_SIZE = 500
+
+
+def index_existing_objects(apps, schema_editor):
+    """Index every course, content, assignment and forum post that has no search document yet"""
+    Course = apps.get_model('courses', 'Course')
+    Content = apps.get_model('courses', 'Content')
+    Assignment = apps.get_model('courses', 'Assignment')
+    Post = apps.get_model('forums', 'Post')
+    SearchDocument = apps.get_model('search', 'SearchDocument')
+    SearchTerm = apps.get_model('search', 'SearchTerm')
+    # On PostgreSQL the trigger from 0002 fills search_vector on insert
+    write_postings = schema_editor.connection.vendor != 'postgresql'
+
+    def unindexed(queryset, kind):
+        indexed = SearchDocument.objects.filter(kind=kind).values('object_id')
+        return queryset.exclude(pk__in=indexed).order_by('pk').iterator(chunk_size=BATCH_SIZE)
+
+    def documents():
+        for course in unindexed(Course.objects.all(), 'course'):
+            yield SearchDocument(
+                kind='course', object_id=course.pk, course_id=course.pk, is_public=True,
+                title=course.title, body=course.description,
+                url=reverse('course_detail', kwargs={'slug': course.slug}),
+            )
+        for content in unindexed(Content.objects.select_related('module__course'), 'content'):
+            yield SearchDocument(
+                kind='content', object_id=content.pk, course_id=content.module.course_id,
+                title=content.title, body=content.content_text or '',
+                url=reverse('module_detail', kwargs={
+                    'course_slug': content.module.course.slug, 'module_id': content.module_id,
+                }),
+            )
+        for assignment in unindexed(Assignment.objects.select_related('module__course'), 'assignment'):
+            yield SearchDocument(
+                kind='assignment', object_id=assignment.pk, course_id=assignment.module.course_id,
+                title=assignment.title, body=assignment.description,
+                url=reverse('assignment_detail', kwargs={
+                    'course_slug': assignment.module.course.slug, 'assignment_id': assignment.pk,
+                }),
+            )
+        for post in unindexed(Post.objects.select_related('topic__forum'), 'post'):
+            forum = post.topic.forum
+            topic_url = reverse('topic_detail', kwargs={'forum_slug': forum.slug, 'slug': post.topic.slug})
+            yield SearchDocument(
+                kind='post', object_id=post.pk, course_id=forum.course_id, is_public=forum.course_id is None,
+                title=post.topic.title, body=strip_tags(post.content),
+                url=f"{topic_url}#post-{post.pk}",
+            )
+
+    def flush(batch):
+        created = SearchDocument.objects.bulk_create(batch)
+        if not write_postings:
+            return
+        if created and created[0].pk is None:
+            # Backends that cannot return primary keys from bulk inserts
+            kinds = {document.kind for document in created}
+            pks = {
+                (kind, object_id): pk for pk, kind, object_id in SearchDocument.objects.filter(
+                    kind__in=kinds, object_id__in=[document.object_id for document in created],
+                ).values_list('pk', 'kind', 'object_id')
+            }
+            for document in created:
+                document.pk = pks[(document.kind, document.object_id)]
+        SearchTerm.objects.bulk_create([
+            SearchTerm(term=term, document_id=document.pk, weight=weight)
+            for document in created
+            for term, weight in term_weights(document.title, document.body).items()
+        ], batch_size=2000)
+
+    batch = []
+    for document in documents():
+        batch.append(document)
+        if len(batch) >= BATCH_SIZE:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_postgres_search_vector'),
+        ('courses', '0010_content_progress'),
+        ('forums', '0005_topic_events'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_existing_objects, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+
+from courses.models import Course
+
+
+class SearchDocument(models.Model):
+    """
+    One searchable object (course, content, assignment or forum post),
+    denormalized with the course it belongs to for permission filtering.
+    """
+    KIND_CHOICES = (
+        ('course', 'Course'),
+        ('content', 'Content'),
+        ('assignment', 'Assignment'),
+        ('post', 'Forum Post'),
+    )
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    is_public = models.BooleanField(default=False)
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    url = models.CharField(max_length=500)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    # Maintained by a database trigger on PostgreSQL; unused elsewhere
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='search_document_unique_object'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title}"
+
+
+class SearchTerm(models.Model):
+    """
+    Posting in the inverted index used when PostgreSQL full-text search is
+    not available (e.g. SQLite in tests).
+    """
+    term = models.CharField(max_length=64)
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE, related_name='terms')
+    weight = models.PositiveIntegerField()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'document'], name='search_term_unique_posting'),
+        ]
+    
+    def __str__(self):
+        return f"{self.term} -> {self.document_id}"
@@ -0,0 +1,105 @@
+"""
+Search queries.
+
+``search(user, text)`` returns SearchDocument rows the user may see,
+annotated with ``rank`` and ordered best first. On PostgreSQL this is a
+``websearch_to_tsquery`` match against the GIN-indexed ``search_vector``
+ranked with ``ts_rank``; elsewhere every query term must appear in the
+SearchTerm postings and documents are ranked by tf-idf.
+"""
+import math
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Case, Count, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When
+
+from courses.access import get_enrolled_course_ids
+from courses.models import Course
+
+from .index import tokenize, uses_postgres
+from .models import SearchDocument, SearchTerm
+
+SEARCH_CONFIG = 'english'
+SNIPPET_LENGTH = 200
+
+
+def visible_documents(user):
+    """Documents in active courses (or no course) that the user may read"""
+    documents = SearchDocument.objects.filter(Q(course__isnull=True) | Q(course__is_active=True))
+    if user.is_authenticated and user.is_staff:
+        return documents
+    if not user.is_authenticated:
+        return documents.filter(is_public=True)
+
+    member_ids = set(get_enrolled_course_ids(user))
+    member_ids.update(Course.objects.filter(instructor=user).values_list('pk', flat=True))
+    return documents.filter(Q(is_public=True) | Q(course_id__in=member_ids))
+
+
+def _postgres_search(documents, text):
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    return documents.filter(search_vector=query).annotate(rank=SearchRank(F('search_vector'), query))
+
+
+def _postings_search(documents, text):
+    terms = sorted(set(tokenize(text)))
+    if not terms:
+        return documents.none().annotate(rank=Value(0.0, output_field=FloatField()))
+
+    # Inverse document frequency per term, from one grouped count
+    total = SearchDocument.objects.count() or 1
+    frequencies = dict(
+        SearchTerm.objects.filter(term__in=terms).values('term').annotate(df=Count('id')).values_list('term', 'df')
+    )
+    if len(frequencies) < len(terms):
+        return documents.none().annotate(rank=Value(0.0, output_field=FloatField()))
+    idf = {term: math.log(1 + total / frequencies[term]) for term in terms}
+
+    # Documents containing every term, then a weighted score for just those
+    matching = (
+        SearchTerm.objects.filter(term__in=terms).values('document')
+        .annotate(matched=Count('term')).filter(matched=len(terms)).values('document')
+    )
+    score = (
+        SearchTerm.objects.filter(document=OuterRef('pk'), term__in=terms).values('document')
+        .annotate(score=Sum(Case(
+            *[When(term=term, then=F('weight') * Value(weight)) for term, weight in idf.items()],
+            output_field=FloatField(),
+        ))).values('score')
+    )
+    return documents.filter(pk__in=matching).annotate(rank=Subquery(score, output_field=FloatField()))
+
+
+def search(user, text, kinds=None):
+    """Return a ranked queryset of SearchDocuments matching ``text`` that ``user`` may see"""
+    documents = visible_documents(user)
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+    if uses_postgres():
+        results = _postgres_search(documents, text)
+    else:
+        results = _postings_search(documents, text)
+    return results.order_by('-rank', '-updated_at')
+
+
+def matching_object_ids(kind, text):
+    """Primary keys of objects of one kind matching ``text``, for admin search (no permission filter)"""
+    documents = SearchDocument.objects.filter(kind=kind)
+    if uses_postgres():
+        results = _postgres_search(documents, text)
+    else:
+        results = _postings_search(documents, text)
+    return results.values('object_id')
+
+
+def snippet(body, text, length=SNIPPET_LENGTH):
+    """Return an excerpt of ``body`` around the first query term it contains"""
+    words = [re.escape(word) for word in re.findall(r'\w+', text) if len(word) > 1]
+    match = re.search('|'.join(words), body, re.IGNORECASE) if words else None
+    start = max(0, match.start() - length // 4) if match else 0
+    excerpt = body[start:start + length].strip()
+    if start > 0:
+        excerpt = '…' + excerpt
+    if start + length < len(body):
+        excerpt += '…'
+    return excerpt
@@ -0,0 +1,63 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from courses.models import Assignment, Content, Course
+from courses.signals import course_cloned
+from forums.models import Forum, Post, Topic
+
+from .index import index_course_tree, index_documents, index_instance, post_document, remove_instance
+from .models import SearchDocument
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, **kwargs):
+    """Index a course; re-index its tree if its slug (and so every URL) changed"""
+    old_url = SearchDocument.objects.filter(kind='course', object_id=instance.pk).values_list('url', flat=True).first()
+    document = index_instance(instance)
+    if old_url and old_url != document.url:
+        index_course_tree(instance)
+
+
+@receiver(course_cloned)
+def course_cloned_handler(sender, clone, **kwargs):
+    """Index a cloned course, whose rows were bulk-created without post_save"""
+    index_course_tree(clone)
+
+
+@receiver(post_save, sender=Content)
+@receiver(post_save, sender=Assignment)
+@receiver(post_save, sender=Post)
+def searchable_saved(sender, instance, **kwargs):
+    """Keep the search document of a saved object current"""
+    index_instance(instance)
+
+
+@receiver(post_delete, sender=Content)
+@receiver(post_delete, sender=Assignment)
+@receiver(post_delete, sender=Post)
+def searchable_deleted(sender, instance, **kwargs):
+    """Drop the search document of a deleted object"""
+    kind = {Content: 'content', Assignment: 'assignment', Post: 'post'}[sender]
+    remove_instance(kind, instance.pk)
+
+
+@receiver(post_save, sender=Topic)
+def topic_saved(sender, instance, created, **kwargs):
+    """Post documents carry their topic's title; re-index them when it changes"""
+    if created:
+        return
+    post_ids = instance.posts.values('pk')
+    stale = SearchDocument.objects.filter(kind='post', object_id__in=post_ids).exclude(title=instance.title)
+    if stale.exists():
+        SearchDocument.objects.filter(kind='post', object_id__in=post_ids).delete()
+        index_documents([post_document(post) for post in instance.posts.select_related('topic__forum')])
+
+
+@receiver(post_save, sender=Forum)
+def forum_saved(sender, instance, created, **kwargs):
+    """Move a forum's post documents with the forum when it changes course"""
+    if created:
+        return
+    SearchDocument.objects.filter(
+        kind='post', object_id__in=Post.objects.filter(topic__forum=instance).values('pk')
+    ).exclude(course_id=instance.course_id).update(course_id=instance.course_id, is_public=instance.course_id is None)
@@ -0,0 +1,30 @@
+from django.core.paginator import Paginator
+from django.shortcuts import render
+
+from .models import SearchDocument
+from .query import search, snippet
+
+MAX_QUERY_LENGTH = 200
+
+
+def search_results(request):
+    """Ranked full-text search across courses, content, assignments and forum posts"""
+    query = request.GET.get('q', '').strip()[:MAX_QUERY_LENGTH]
+    kind = request.GET.get('kind', '')
+    kinds = [kind] if kind in dict(SearchDocument.KIND_CHOICES) else None
+    
+    page = None
+    if query:
+        results = search(request.user, query, kinds=kinds).select_related('course')
+        page = Paginator(results, 20).get_page(request.GET.get('page'))
+        for document in page:
+            document.snippet = snippet(document.body, query)
+    
+    context = {
+        'query': query,
+        'kind': kind if kinds else '',
+        'kind_choices': SearchDocument.KIND_CHOICES,
+        'page': page,
+    }
+    
+    return render(request, 'search/results.html', context)
@@ -59,6 +59,7 @@ INSTALLED_APPS = [
     'forums',
     'messaging',
     'ai_assistant',
+    'search',
 ]
 
 MIDDLEWARE = [
@@ -149,6 +150,76 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Content and submission files are served by permission-checked views. Set
+# MEDIA_SENDFILE_BACKEND to 'xsendfile' (Apache, lighttpd) or 'xaccel' (nginx)
+# to let the front-end server stream the bytes; for nginx, map
+# MEDIA_ACCEL_REDIRECT_PREFIX to MEDIA_ROOT in an `internal` location.
+MEDIA_SENDFILE_BACKEND = os.environ.get('MEDIA_SENDFILE_BACKEND', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+# Seconds between flushes of in-process write-behind buffers (content views);
+# 0 writes every event immediately
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.environ.get('WRITE_BEHIND_FLUSH_INTERVAL', 5))
+
+# Threads that resize uploaded course images into WebP/JPEG variants;
+# 0 resizes them inline
+IMAGE_VARIANT_WORKERS = int(os.environ.get('IMAGE_VARIANT_WORKERS', 2))
+
+# Threads that fan out notifications (e.g. to topic subscribers) in bulk;
+# 0 creates them inline in the request
+NOTIFICATION_DISPATCH_WORKERS = int(os.environ.get('NOTIFICATION_DISPATCH_WORKERS', 1))
+
+# Default mode of new forum subscriptions: 'notify' writes a Notification per
+# subscriber per post, 'feed' records each post once and builds feeds on read
+FORUM_SUBSCRIPTION_MODE = os.environ.get('FORUM_SUBSCRIPTION_MODE', 'notify')
+
+# Real-time message/notification push. Empty delivers within one process;
+# with several ASGI workers set e.g. unix:/tmp/smartproject-events.sock and
+# run `manage.py run_event_broker` alongside them
+REALTIME_BROKER_URL = os.environ.get('REALTIME_BROKER_URL', '')
+# Seconds before an event stream ends and the browser reconnects
+REALTIME_STREAM_TIMEOUT = int(os.environ.get('REALTIME_STREAM_TIMEOUT', 300))
+
+# Cache
+# Cross-request caches (course membership and outlines) are only used with a
+# cache shared by all workers; the per-process LocMemCache default turns them
+# off. Point CACHE_BACKEND/CACHE_LOCATION at Redis or Memcached in production.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Seconds a user's enrolled course IDs stay cached between requests
+COURSE_ACCESS_CACHE_TIMEOUT = int(os.environ.get('COURSE_ACCESS_CACHE_TIMEOUT', 300))
+
+# Seconds a course-outline snapshot may live; edits invalidate it immediately
+COURSE_OUTLINE_CACHE_TIMEOUT = int(os.environ.get('COURSE_OUTLINE_CACHE_TIMEOUT', 60 * 60 * 24))
+
+# Resumable chunked uploads: staging area (kept outside MEDIA_ROOT so partial
+# uploads are never served), chunk size and maximum file size in bytes
+CHUNKED_UPLOAD_DIR = os.environ.get('CHUNKED_UPLOAD_DIR', str(BASE_DIR / 'upload_staging'))
+CHUNKED_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = 20 * 1024 * 1024 * 1024
+
+# Hash uploads while they stream so content-addressed storage can spot
+# duplicates without reading the file again
+FILE_UPLOAD_HANDLERS = [
+    'courses.storage.HashingMemoryFileUploadHandler',
+    'courses.storage.HashingTemporaryFileUploadHandler',
+]
+
+# Hours before an assignment's due date at which students who have not
+# submitted are sent a reminder (see `manage.py send_deadline_reminders`)
+ASSIGNMENT_REMINDER_OFFSETS = [
+    int(hours) for hours in os.environ.get('ASSIGNMENT_REMINDER_OFFSETS', '48,2').split(',') if hours.strip()
+]
+
+# Submission similarity: LSH buckets shared by more submissions than this are
+# not expanded into pairs (the report lists them as crowded groups instead)
+SUBMISSION_SIMILARITY_MAX_BUCKET_SIZE = int(os.environ.get('SUBMISSION_SIMILARITY_MAX_BUCKET_SIZE', 100))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
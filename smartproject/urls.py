@@ -1,6 +1,8 @@
 """
 URL configuration for smartproject project.
 """
+import os
+
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
@@ -14,9 +16,11 @@ urlpatterns = [
     path('forums/', include('forums.urls')),
     path('messages/', include('messaging.urls')),
     path('ai-assistant/', include('ai_assistant.urls')),
+    path('search/', include('search.urls')),
     path('', include('core.urls')),
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # Only public media; content and submission files go through courses.views
+    urlpatterns += static(settings.MEDIA_URL + 'course_images/', document_root=os.path.join(settings.MEDIA_ROOT, 'course_images'))
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
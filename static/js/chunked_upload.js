@@ -0,0 +1,151 @@
+// Resumable chunked uploads for large submission and content files.
+//
+// Any file input with a data-chunked-upload="submission|content" attribute is
+// uploaded in checksummed chunks before its form is submitted. The session ID
+// is remembered in localStorage, so re-selecting the same file after a dropped
+// connection resumes from the chunks the server already has.
+
+(function() {
+    const PARALLEL_CHUNKS = 3;
+
+    function getCookie(name) {
+        const match = document.cookie.match(new RegExp('(^|;\\s*)' + name + '=([^;]*)'));
+        return match ? decodeURIComponent(match[2]) : null;
+    }
+
+    async function request(method, url, body, headers) {
+        const response = await fetch(url, {
+            method: method,
+            body: body,
+            credentials: 'same-origin',
+            headers: Object.assign({'X-CSRFToken': getCookie('csrftoken')}, headers || {}),
+        });
+        const data = await response.json();
+        if (!response.ok || data.status === 'error') {
+            throw new Error(data.message || 'Upload failed');
+        }
+        return data;
+    }
+
+    async function sha256Hex(buffer) {
+        const digest = await crypto.subtle.digest('SHA-256', buffer);
+        return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+    }
+
+    function resumeKey(target, objectId, file) {
+        return ['chunked-upload', target, objectId, file.name, file.size, file.lastModified].join(':');
+    }
+
+    async function openSession(baseUrl, target, objectId, file) {
+        const key = resumeKey(target, objectId, file);
+        const existing = localStorage.getItem(key);
+        if (existing) {
+            try {
+                const state = await request('GET', baseUrl + existing + '/');
+                if (!state.complete) {
+                    return state;
+                }
+            } catch (e) {
+                // Session expired or was aborted; start a new one
+            }
+            localStorage.removeItem(key);
+        }
+
+        const state = await request('POST', baseUrl, JSON.stringify({
+            target: target,
+            object_id: objectId,
+            filename: file.name,
+            size: file.size,
+        }), {'Content-Type': 'application/json'});
+        localStorage.setItem(key, state.id);
+        return state;
+    }
+
+    async function uploadFile(baseUrl, target, objectId, file, onProgress) {
+        const state = await openSession(baseUrl, target, objectId, file);
+        const received = new Set(state.received);
+        const pending = [];
+        for (let index = 0; index < state.chunk_count; index++) {
+            if (!received.has(index)) {
+                pending.push(index);
+            }
+        }
+
+        let done = received.size;
+        onProgress(done, state.chunk_count);
+
+        async function worker() {
+            while (pending.length) {
+                const index = pending.shift();
+                const start = index * state.chunk_size;
+                const buffer = await file.slice(start, start + state.chunk_size).arrayBuffer();
+                await request('PUT', baseUrl + state.id + '/chunks/' + index + '/', buffer, {
+                    'Content-Type': 'application/octet-stream',
+                    'X-Chunk-Checksum': await sha256Hex(buffer),
+                });
+                done++;
+                onProgress(done, state.chunk_count);
+            }
+        }
+
+        await Promise.all(Array.from({length: PARALLEL_CHUNKS}, worker));
+        return {state: state, key: resumeKey(target, objectId, file)};
+    }
+
+    function initializeChunkedUpload(input) {
+        const form = input.form;
+        if (!form || !window.crypto || !crypto.subtle) {
+            return;
+        }
+
+        const progress = document.createElement('div');
+        progress.className = 'progress mt-2 d-none';
+        progress.innerHTML = '<div class="progress-bar" role="progressbar" style="width: 0%"></div>';
+        input.insertAdjacentElement('afterend', progress);
+        const bar = progress.querySelector('.progress-bar');
+
+        form.addEventListener('submit', async function(event) {
+            if (!input.files.length) {
+                return;
+            }
+            event.preventDefault();
+
+            const target = input.dataset.chunkedUpload;
+            const objectId = input.dataset.uploadObject || form.dataset.uploadObject;
+            const baseUrl = input.dataset.uploadUrl;
+            const submitButtons = form.querySelectorAll('[type="submit"]');
+            submitButtons.forEach(button => button.disabled = true);
+            progress.classList.remove('d-none');
+
+            try {
+                const result = await uploadFile(baseUrl, target, objectId, input.files[0], function(done, total) {
+                    bar.style.width = Math.round(done / total * 100) + '%';
+                });
+
+                const body = {};
+                const text = form.querySelector('[name="text"]');
+                if (text) {
+                    body.text = text.value;
+                }
+                const completed = await request('POST', baseUrl + result.state.id + '/complete/',
+                    JSON.stringify(body), {'Content-Type': 'application/json'});
+                localStorage.removeItem(result.key);
+
+                if (target === 'content') {
+                    // The file is attached; save the rest of the form normally
+                    input.value = '';
+                    form.submit();
+                } else {
+                    window.location.href = completed.redirect;
+                }
+            } catch (error) {
+                alert('Upload failed: ' + error.message + '\nSubmit again to resume.');
+                submitButtons.forEach(button => button.disabled = false);
+            }
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function() {
+        document.querySelectorAll('input[type="file"][data-chunked-upload]').forEach(initializeChunkedUpload);
+    });
+})();
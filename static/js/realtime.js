@@ -0,0 +1,59 @@
+// Real-time messages and notifications over server-sent events.
+//
+// Loaded on every page for signed-in users (see base.html). Each event from
+// the stream is re-dispatched on document as "realtime:new-message" or
+// "realtime:notification" with the payload as event.detail, so pages can
+// react without opening streams of their own. Two defaults are built in:
+// new messages are appended to a [data-conversation-messages="<id>"] list,
+// and [data-notification-count] badges are incremented.
+
+(function() {
+    const script = document.currentScript;
+    const url = script && script.dataset.eventsUrl;
+    if (!url || !('EventSource' in window)) {
+        return;
+    }
+
+    function appendMessage(message) {
+        const list = document.querySelector('[data-conversation-messages="' + message.conversation + '"]');
+        if (!list || document.getElementById('message-' + message.id)) {
+            return;
+        }
+        const item = document.createElement('div');
+        item.id = 'message-' + message.id;
+        item.className = 'message mb-3';
+        const meta = document.createElement('div');
+        meta.className = 'small text-muted';
+        meta.textContent = message.sender + ' · ' + new Date(message.created_at).toLocaleTimeString();
+        const body = document.createElement('div');
+        body.style.whiteSpace = 'pre-line';
+        body.textContent = message.content;
+        item.append(meta, body);
+        list.appendChild(item);
+        list.scrollTop = list.scrollHeight;
+    }
+
+    function bumpNotificationCount() {
+        document.querySelectorAll('[data-notification-count]').forEach(function(badge) {
+            const count = (parseInt(badge.textContent, 10) || 0) + 1;
+            badge.textContent = count;
+            badge.hidden = false;
+        });
+    }
+
+    const source = new EventSource(url);
+    ['new-message', 'notification'].forEach(function(type) {
+        source.addEventListener(type, function(event) {
+            const detail = JSON.parse(event.data);
+            if (type === 'new-message') {
+                appendMessage(detail);
+            } else {
+                bumpNotificationCount();
+            }
+            document.dispatchEvent(new CustomEvent('realtime:' + type, {detail: detail}));
+        });
+    });
+    window.addEventListener('pagehide', function() {
+        source.close();
+    });
+})();
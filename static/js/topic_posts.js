@@ -0,0 +1,96 @@
+// Infinite scrolling for long forum topics.
+//
+// A post list with data-topic-posts and data-more-url="<topic_posts URL with
+// ?after= cursor>" loads the following pages from the JSON endpoint as the
+// reader nears the end of the list, instead of following the "next page" link.
+// The server pages by cursor, so later pages load as fast as the first.
+
+(function() {
+    function renderPost(post) {
+        const card = document.createElement('div');
+        card.className = 'card mb-3';
+        card.id = 'post-' + post.id;
+
+        const header = document.createElement('div');
+        header.className = 'card-header d-flex justify-content-between';
+        const author = document.createElement('strong');
+        author.textContent = post.author;
+        const meta = document.createElement('a');
+        meta.className = 'text-muted small';
+        meta.href = post.url;
+        meta.textContent = new Date(post.created_at).toLocaleString() + (post.is_edited ? ' (edited)' : '');
+        header.append(author, meta);
+
+        const body = document.createElement('div');
+        body.className = 'card-body';
+        post.content.split(/\n{2,}/).forEach(function(paragraph) {
+            const p = document.createElement('p');
+            p.style.whiteSpace = 'pre-line';
+            p.textContent = paragraph;
+            body.appendChild(p);
+        });
+
+        card.append(header, body);
+        return card;
+    }
+
+    function init(list) {
+        let nextUrl = list.dataset.moreUrl;
+        let loading = false;
+        if (!nextUrl || !('IntersectionObserver' in window)) {
+            return;
+        }
+
+        const sentinel = document.createElement('div');
+        sentinel.className = 'text-center text-muted py-3';
+        list.after(sentinel);
+
+        // Plain page links stay as the fallback for readers without scripts
+        const pager = document.querySelector('[data-topic-pager]');
+        if (pager) {
+            pager.hidden = true;
+        }
+
+        async function loadMore() {
+            if (loading || !nextUrl) {
+                return;
+            }
+            loading = true;
+            sentinel.textContent = 'Loading more posts…';
+            try {
+                const response = await fetch(nextUrl, {credentials: 'same-origin'});
+                const data = await response.json();
+                if (!response.ok || data.status === 'error') {
+                    throw new Error(data.message || 'Could not load posts');
+                }
+                data.posts.forEach(function(post) {
+                    list.appendChild(renderPost(post));
+                });
+                nextUrl = data.next;
+                sentinel.textContent = '';
+            } catch (e) {
+                sentinel.textContent = e.message;
+                if (pager) {
+                    pager.hidden = false;
+                }
+                nextUrl = null;
+            } finally {
+                loading = false;
+            }
+            if (!nextUrl) {
+                observer.disconnect();
+            }
+        }
+
+        const observer = new IntersectionObserver(function(entries) {
+            if (entries.some(entry => entry.isIntersecting)) {
+                loadMore();
+            }
+        }, {rootMargin: '800px 0px'});
+        observer.observe(sentinel);
+    }
+
+    document.addEventListener('DOMContentLoaded', function() {
+        document.querySelectorAll('[data-topic-posts]').forEach(init);
+    });
+})();